@@ -1,13 +1,31 @@
 # app/api/endpoints/fact_check.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+import asyncio
+import json
 import logging
-from typing import Dict, Any
+import math
+from typing import Dict, Any, List
 
-from app.api.models.schemas import FactCheckRequest, FactCheckResponse, HealthCheckResponse
-from app.services.fact_check_pipeline import FactCheckPipeline
+from app.api.models.schemas import (
+    BatchFactCheckItem,
+    BatchFactCheckRequest,
+    BatchFactCheckResponse,
+    FactCheckJobResponse,
+    FactCheckRequest,
+    FactCheckResponse,
+    HealthCheckResponse
+)
+from app.core.config import settings
+from app.services.fact_check_pipeline import FactCheckPipeline, normalize_claim
+from app.services.job_queue import JobQueue
 from app.core.exceptions import (
     APIKeyNotFoundError, 
+    JobQueueFullError,
+    LLMRateLimitError,
     LLMRequestError, 
+    PipelineTimeoutError,
     SearchRequestError,
     FactCheckHTTPException
 )
@@ -20,18 +38,31 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_fact_check_pipeline():
-    """Dependency to get fact check pipeline instance."""
-    try:
-        return FactCheckPipeline()
-    except APIKeyNotFoundError as e:
-        raise FactCheckHTTPException.api_key_error(str(e))
-    except Exception as e:
-        logger.error(f"Error initializing fact check pipeline: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error initializing fact check service: {str(e)}"
+def get_fact_check_pipeline(request: Request) -> FactCheckPipeline:
+    """Dependency to get the shared fact check pipeline created at application startup."""
+    pipeline = getattr(request.app.state, "fact_check_pipeline", None)
+    if pipeline is None:
+        detail = getattr(request.app.state, "fact_check_pipeline_error", None)
+        raise FactCheckHTTPException.api_key_error(
+            detail or "Error initializing fact check service: pipeline is not available"
+        )
+    return pipeline
+
+
+def get_batch_semaphore(request: Request) -> asyncio.Semaphore:
+    """Dependency to get the concurrency budget shared by all batch requests."""
+    return request.app.state.batch_semaphore
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Dependency to get the job queue started at application startup."""
+    job_queue = getattr(request.app.state, "job_queue", None)
+    if job_queue is None:
+        detail = getattr(request.app.state, "fact_check_pipeline_error", None)
+        raise FactCheckHTTPException.api_key_error(
+            detail or "Error initializing fact check service: job queue is not available"
         )
+    return job_queue
 
 
 @router.get("/health", response_model=HealthCheckResponse, tags=["Health"])
@@ -45,9 +76,21 @@ async def health_check():
     return HealthCheckResponse(status="ok", version="1.0.0")
 
 
+@router.get("/cache/stats", response_model=Dict[str, Dict[str, int]], tags=["Health"])
+async def cache_stats(pipeline: FactCheckPipeline = Depends(get_fact_check_pipeline)):
+    """
+    Hit and miss counters for the result cache and each per-stage cache.
+    
+    Returns:
+        Mapping of cache layer name to its counters
+    """
+    return pipeline.cache_stats()
+
+
 @router.post("/fact-check", response_model=FactCheckResponse, tags=["Fact Check"])
 async def fact_check(
     request: FactCheckRequest,
+    response: Response,
     pipeline: FactCheckPipeline = Depends(get_fact_check_pipeline)
 ):
     """
@@ -55,6 +98,7 @@ async def fact_check(
     
     Args:
         request: The fact check request containing the claim
+        response: Outgoing response, used to set the X-Cache header
         pipeline: FactCheckPipeline instance (injected by dependency)
         
     Returns:
@@ -64,36 +108,264 @@ async def fact_check(
         HTTPException: If there's an error during the fact-checking process
     """
     try:
-        # Run the fact-checking pipeline
-        result, enhanced_papers = await pipeline.fact_check(request.claim)
+        # Run the fact-checking pipeline, reusing cached results for repeated claims
+        result, enhanced_papers, cache_hit = await pipeline.fact_check_cached(request.claim)
+        response.headers["X-Cache"] = "HIT" if cache_hit else "MISS"
+        
+        return _build_fact_check_response(pipeline, result, enhanced_papers)
+    
+    except Exception as e:
+        raise _to_http_exception(e)
+
+
+@router.post("/fact-check/stream", tags=["Fact Check"])
+async def fact_check_stream(
+    request: FactCheckRequest,
+    pipeline: FactCheckPipeline = Depends(get_fact_check_pipeline)
+):
+    """
+    Fact check a claim, streaming progress as Server-Sent Events.
+    
+    Events are emitted in order: "start", "keywords", one "paper" per paper
+    found, one "findings" per paper as its analysis arrives, "analysis", and
+    finally "result" with the full FactCheckResponse. Failures end the stream
+    with an "error" event carrying the status code and detail.
+    
+    Args:
+        request: The fact check request containing the claim
+        pipeline: FactCheckPipeline instance (injected by dependency)
         
-        # Generate human-friendly response
-        human_friendly = pipeline.generate_human_friendly_response(result, enhanced_papers)
+    Returns:
+        StreamingResponse: text/event-stream of pipeline events
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def on_event(event: str, data: Dict[str, Any]) -> None:
+        # Serialize right away: papers keep being updated after they are announced
+        await queue.put(_format_sse(event, data))
+    
+    async def run_pipeline() -> None:
+        try:
+            result, enhanced_papers, cache_hit = await pipeline.fact_check_cached(request.claim, on_event=on_event)
+            fact_check_response = _build_fact_check_response(pipeline, result, enhanced_papers)
+            await queue.put(_format_sse("result", fact_check_response.model_dump(mode="json")))
+        except Exception as e:
+            http_error = _to_http_exception(e)
+            await queue.put(_format_sse("error", {"status_code": http_error.status_code, "detail": http_error.detail}))
+        finally:
+            await queue.put(None)
+    
+    async def event_stream():
+        yield _format_sse("start", {"claim": request.claim})
+        task = asyncio.create_task(run_pipeline())
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            # Client went away: stop spending Gemini and SERP API calls on it
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/fact-check/batch", response_model=BatchFactCheckResponse, tags=["Fact Check"])
+async def fact_check_batch(
+    request: BatchFactCheckRequest,
+    pipeline: FactCheckPipeline = Depends(get_fact_check_pipeline),
+    batch_semaphore: asyncio.Semaphore = Depends(get_batch_semaphore)
+):
+    """
+    Fact check many claims concurrently.
+    
+    Duplicate claims (after normalization) are checked once and reported once.
+    All batch requests share a global concurrency budget so large batches
+    cannot starve single-claim requests.
+    
+    Args:
+        request: The batch request containing the claims
+        pipeline: FactCheckPipeline instance (injected by dependency)
+        batch_semaphore: Concurrency budget shared by all batch requests (injected by dependency)
+        
+    Returns:
+        BatchFactCheckResponse: One result or error per unique claim
         
-        # Prepare response
-        response = FactCheckResponse(
-            claim=result["claim"],
-            assessment=result["assessment"],
-            explanation=result["explanation"],
-            paper_analyses=result["paper_analyses"],
-            references=result["references"],
-            papers=enhanced_papers,
-            human_friendly_response=human_friendly
+    Raises:
+        HTTPException: If the batch has more claims than allowed
+    """
+    if len(request.claims) > settings.BATCH_MAX_CLAIMS:
+        raise FactCheckHTTPException.validation_error(
+            f"Batch contains {len(request.claims)} claims; the maximum is {settings.BATCH_MAX_CLAIMS}"
         )
+    
+    unique_claims: Dict[str, str] = {}
+    for claim in request.claims:
+        unique_claims.setdefault(normalize_claim(claim), claim)
+    
+    async def check_claim(claim: str) -> BatchFactCheckItem:
+        try:
+            FactCheckRequest(claim=claim)
+        except ValidationError as e:
+            return BatchFactCheckItem(
+                claim=claim,
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                error=str(e.errors()[0]["msg"])
+            )
         
-        return response
+        try:
+            async with batch_semaphore:
+                result, enhanced_papers, cache_hit = await pipeline.fact_check_cached(claim)
+            return BatchFactCheckItem(
+                claim=claim,
+                status_code=status.HTTP_200_OK,
+                cached=cache_hit,
+                result=_build_fact_check_response(pipeline, result, enhanced_papers)
+            )
+        except Exception as e:
+            http_error = _to_http_exception(e)
+            return BatchFactCheckItem(claim=claim, status_code=http_error.status_code, error=http_error.detail)
+    
+    items = await asyncio.gather(*(check_claim(claim) for claim in unique_claims.values()))
+    succeeded = sum(1 for item in items if item.result is not None)
     
-    except LLMRequestError as e:
-        logger.error(f"LLM service error: {str(e)}")
-        raise FactCheckHTTPException.llm_request_error(str(e))
+    return BatchFactCheckResponse(
+        results=list(items),
+        total=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded
+    )
+
+
+@router.post(
+    "/fact-check/jobs",
+    response_model=FactCheckJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Fact Check"]
+)
+async def submit_fact_check_job(
+    request: FactCheckRequest,
+    response: Response,
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    Queue a claim for fact-checking and return immediately.
     
-    except SearchRequestError as e:
-        logger.error(f"Search service error: {str(e)}")
-        raise FactCheckHTTPException.search_request_error(str(e))
+    Poll the URL in the Location header until the job has succeeded or failed.
     
-    except Exception as e:
-        logger.error(f"Unexpected error during fact-checking: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error during fact-checking: {str(e)}"
-        )
\ No newline at end of file
+    Args:
+        request: The fact check request containing the claim
+        response: Outgoing response, used to set the Location header
+        job_queue: JobQueue instance (injected by dependency)
+        
+    Returns:
+        FactCheckJobResponse: The queued job
+        
+    Raises:
+        HTTPException: 503 with Retry-After if the queue is full
+    """
+    try:
+        job = await job_queue.submit(request.claim)
+    except JobQueueFullError as e:
+        raise FactCheckHTTPException.queue_full_error(str(e))
+    
+    response.headers["Location"] = f"{settings.API_V1_STR}/fact-check/jobs/{job['job_id']}"
+    return _build_job_response(job_queue.pipeline, job)
+
+
+@router.get("/fact-check/jobs/{job_id}", response_model=FactCheckJobResponse, tags=["Fact Check"])
+async def get_fact_check_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    """
+    Get the status of a fact-check job, including its result once it has succeeded.
+    
+    Args:
+        job_id: Identifier returned when the job was submitted
+        job_queue: JobQueue instance (injected by dependency)
+        
+    Returns:
+        FactCheckJobResponse: The job's status and result
+        
+    Raises:
+        HTTPException: 404 if the job is unknown or its result has expired
+    """
+    job = await job_queue.store.get(job_id)
+    if job is None:
+        raise FactCheckHTTPException.not_found_error(f"Fact-check job {job_id} not found")
+    
+    return _build_job_response(job_queue.pipeline, job)
+
+
+def _build_job_response(pipeline: FactCheckPipeline, job: Dict[str, Any]) -> FactCheckJobResponse:
+    """Convert a stored job record into the API response."""
+    result = None
+    if job["result"] is not None:
+        result = _build_fact_check_response(pipeline, job["result"], job["papers"])
+    
+    return FactCheckJobResponse(
+        job_id=job["job_id"],
+        claim=job["claim"],
+        status=job["status"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        result=result,
+        error=job["error"]
+    )
+
+
+def _build_fact_check_response(
+    pipeline: FactCheckPipeline, result: Dict[str, Any], enhanced_papers: List[Dict[str, Any]]
+) -> FactCheckResponse:
+    """Assemble the API response, including the human-friendly report, from a pipeline result."""
+    # Generate human-friendly response
+    human_friendly = pipeline.generate_human_friendly_response(result, enhanced_papers)
+    
+    return FactCheckResponse(
+        claim=result["claim"],
+        assessment=result["assessment"],
+        explanation=result["explanation"],
+        paper_analyses=result["paper_analyses"],
+        references=result["references"],
+        papers=enhanced_papers,
+        human_friendly_response=human_friendly,
+        degraded_stages=result.get("degraded_stages", [])
+    )
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _to_http_exception(error: Exception) -> HTTPException:
+    """Map an error raised while fact-checking to the HTTP error returned to the client."""
+    if isinstance(error, HTTPException):
+        return error
+    
+    if isinstance(error, LLMRateLimitError):
+        logger.error(f"LLM service rate limited: {str(error)}")
+        return FactCheckHTTPException.rate_limit_error(str(error), math.ceil(error.retry_after or 30))
+    
+    if isinstance(error, LLMRequestError):
+        logger.error(f"LLM service error: {str(error)}")
+        return FactCheckHTTPException.llm_request_error(str(error))
+    
+    if isinstance(error, SearchRequestError):
+        logger.error(f"Search service error: {str(error)}")
+        return FactCheckHTTPException.search_request_error(str(error))
+    
+    if isinstance(error, PipelineTimeoutError):
+        logger.error(f"Fact-check timed out: {str(error)}")
+        return FactCheckHTTPException.timeout_error(str(error))
+    
+    logger.error(f"Unexpected error during fact-checking: {str(error)}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Error during fact-checking: {str(error)}"
+    )
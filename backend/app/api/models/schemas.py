@@ -1,4 +1,5 @@
 # app/api/models/schemas.py
+from datetime import datetime
 from enum import Enum
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
@@ -27,6 +28,14 @@ class PositionType(str, Enum):
     NOT_ASSESSED = "Not assessed"
 
 
+class JobStatusType(str, Enum):
+    """Lifecycle state of an asynchronous fact-check job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class FactCheckRequest(BaseModel):
     """Request model for fact-checking."""
     claim: str = Field(..., description="The claim to fact-check", min_length=10, max_length=500)
@@ -72,6 +81,43 @@ class FactCheckResponse(BaseModel):
     references: List[Reference] = Field(default_factory=list, description="References")
     papers: List[Paper] = Field(default_factory=list, description="Detailed information about papers")
     human_friendly_response: str = Field("", description="Formatted human-readable response")
+    degraded_stages: List[str] = Field(
+        default_factory=list, description="Pipeline stages that failed or ran out of time and were degraded"
+    )
+
+
+class BatchFactCheckRequest(BaseModel):
+    """Request model for fact-checking several claims at once."""
+    claims: List[str] = Field(..., description="The claims to fact-check", min_length=1)
+
+
+class BatchFactCheckItem(BaseModel):
+    """Outcome of one claim in a batch request."""
+    claim: str = Field(..., description="The claim that was fact-checked")
+    status_code: int = Field(..., description="HTTP status the claim would have received on its own")
+    cached: bool = Field(False, description="Whether the result was served from the result cache")
+    result: Optional[FactCheckResponse] = Field(None, description="Fact check result, if successful")
+    error: Optional[str] = Field(None, description="Error detail, if the claim failed")
+
+
+class BatchFactCheckResponse(BaseModel):
+    """Response model for batch fact-checking."""
+    results: List[BatchFactCheckItem] = Field(default_factory=list, description="One entry per unique claim")
+    total: int = Field(0, description="Number of unique claims processed")
+    succeeded: int = Field(0, description="Number of claims checked successfully")
+    failed: int = Field(0, description="Number of claims that failed")
+
+
+class FactCheckJobResponse(BaseModel):
+    """Status, and once finished the result, of an asynchronous fact-check job."""
+    job_id: str = Field(..., description="Job identifier")
+    claim: str = Field(..., description="The claim being fact-checked")
+    status: JobStatusType = Field(..., description="Current job state")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    started_at: Optional[datetime] = Field(None, description="When a worker picked up the job")
+    finished_at: Optional[datetime] = Field(None, description="When the job finished")
+    result: Optional[FactCheckResponse] = Field(None, description="Fact check result, once succeeded")
+    error: Optional[str] = Field(None, description="Error detail, if the job failed")
 
 
 class HealthCheckResponse(BaseModel):
@@ -0,0 +1,258 @@
+# app/core/cassette.py
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Query parameters carrying credentials: Gemini's "key" and SerpAPI's "api_key"
+SECRET_PARAMS = frozenset(["key", "api_key"])
+
+# Response headers not worth replaying
+SKIPPED_RESPONSE_HEADERS = frozenset(["set-cookie", "date", "alt-svc", "server-timing"])
+
+
+class CassetteMissError(httpx.TransportError):
+    """
+    A replayed request has no recording.
+    
+    Raised as a transport error so the services report it the same way as an
+    unreachable API. It is deterministic, so `send_with_retries` neither
+    retries it nor counts it against the provider's circuit breaker.
+    """
+
+
+def sanitized_url(url: httpx.URL) -> str:
+    """URL with credential query parameters removed."""
+    params = [(name, value) for name, value in url.params.multi_items() if name not in SECRET_PARAMS]
+    return str(url.copy_with(params=params))
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    Identity of a request in the cassette store.
+    
+    Hashes the method, the URL without credentials and the body, so a cassette
+    recorded with one API key replays with any other.
+    
+    Args:
+        request: Outgoing request, with its body already read
+        
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b"\0")
+    digest.update(sanitized_url(request.url).encode())
+    digest.update(b"\0")
+    digest.update(request.content)
+    return digest.hexdigest()
+
+
+class CassetteStore:
+    """
+    Recorded responses in a SQLite file, with zlib-compressed bodies.
+    
+    One row per distinct request; recording the same request again keeps the
+    latest response. Safe to share between clients and threads.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the store, creating the database file if needed.
+        
+        Args:
+            path: Database file path
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cassette ("
+            "key TEXT PRIMARY KEY, method TEXT NOT NULL, url TEXT NOT NULL, status INTEGER NOT NULL, "
+            "headers TEXT NOT NULL, body BLOB NOT NULL, latency REAL NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Tuple[int, List[Tuple[str, str]], bytes, float]]:
+        """
+        Look up a recording.
+        
+        Args:
+            key: Request key from `request_key`
+            
+        Returns:
+            Tuple of (status, headers, raw body, recorded latency in seconds), or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, latency FROM cassette WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        status, headers, body, latency = row
+        return status, [tuple(header) for header in json.loads(headers)], zlib.decompress(body), latency
+    
+    def put(
+        self,
+        key: str,
+        request: httpx.Request,
+        status: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        latency: float,
+    ) -> None:
+        """
+        Record a response.
+        
+        Args:
+            key: Request key from `request_key`
+            request: The request that was sent; stored without credentials for inspection
+            status: Response status code
+            headers: Response headers
+            body: Raw (still content-encoded) response body
+            latency: Seconds until the response headers arrived
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cassette (key, method, url, status, headers, body, latency, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    request.method,
+                    sanitized_url(request.url),
+                    status,
+                    json.dumps(headers),
+                    zlib.compress(body, 6),
+                    latency,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Replay counters since startup.
+        
+        Returns:
+            Dictionary with "hits", "misses" and "recordings"
+        """
+        with self._lock:
+            (recordings,) = self._conn.execute("SELECT COUNT(*) FROM cassette").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "recordings": recordings}
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that records responses to, or replays them from, a cassette store.
+    
+    In "record" mode requests go out through the wrapped transport and every
+    response is stored. In "replay" mode nothing leaves the process: responses
+    come from the store, optionally after a delay proportional to the latency
+    seen when they were recorded, and unrecorded requests fail with
+    CassetteMissError.
+    """
+    
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        store: CassetteStore,
+        mode: str,
+        latency_scale: float = 0.0,
+    ):
+        """
+        Initialize the transport.
+        
+        Args:
+            transport: Transport used to send requests while recording
+            store: Where recordings are kept
+            mode: "record" or "replay"
+            latency_scale: Replay delay as a multiple of the recorded latency; 0 replays instantly
+            
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self._transport = transport
+        self.store = store
+        self.mode = mode
+        self.latency_scale = latency_scale
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = request_key(request)
+        
+        if self.mode == "replay":
+            recording = self.store.get(key)
+            if recording is None:
+                raise CassetteMissError(
+                    f"No recording for {request.method} {sanitized_url(request.url)}", request=request
+                )
+            status, headers, body, latency = recording
+            if self.latency_scale > 0:
+                await asyncio.sleep(latency * self.latency_scale)
+            return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body))
+        
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        latency = time.perf_counter() - started
+        try:
+            body = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        
+        headers = [
+            (name, value) for name, value in response.headers.multi_items() if name.lower() not in SKIPPED_RESPONSE_HEADERS
+        ]
+        self.store.put(key, request, response.status_code, headers, body, latency)
+        return httpx.Response(
+            response.status_code, headers=response.headers, stream=httpx.ByteStream(body), extensions=response.extensions
+        )
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Stores shared by every client, keyed by path
+_stores: Dict[str, CassetteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_cassette_store(path: str) -> CassetteStore:
+    """
+    Shared cassette store for a path, opened on first use.
+    
+    Args:
+        path: Database file path
+        
+    Returns:
+        The store
+    """
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = CassetteStore(path)
+            _stores[path] = store
+            logger.info(f"Opened cassette store {path}")
+        return store
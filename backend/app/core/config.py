@@ -19,6 +19,118 @@ class Settings(BaseSettings):
     
     # Service settings
     PAPER_SEARCH_LIMIT: int = 5
+    FINDINGS_CONCURRENCY: int = 5  # Max concurrent per-paper findings calls
+    KEYWORD_STRATEGY: str = "llm"  # "llm", "local" or "hybrid" (local unless low confidence)
+    KEYWORD_LOCAL_MIN_CONFIDENCE: float = 0.6  # Below this, hybrid asks the LLM
+    SPECULATIVE_SEARCH_ENABLED: bool = False  # Search with local keywords while the LLM extracts its own; costs a second search when they differ
+    SPECULATIVE_SEARCH_MIN_OVERLAP: float = 0.5  # Term overlap below which the LLM keywords are searched too
+    FINDINGS_STRATEGY: str = "per_paper"  # "per_paper" or "batched" (one call for all papers)
+    SEARCH_MULTI_QUERY: bool = True  # Run every query variant concurrently and fuse the results
+    SEARCH_FUSION_RRF_K: int = 60  # Reciprocal rank fusion constant
+    SEARCH_FUSION_CITATION_WEIGHT: float = 0.01  # Weight of the log-scaled citation bonus
+    SEARCH_PROVIDER: str = "serpapi"  # "serpapi", "fixture" or "paper_store"
+    SEARCH_HEDGE_PROVIDER: str = ""  # Provider also asked when the first is slow; empty disables hedging
+    SEARCH_HEDGE_DELAY: float = 3.0  # seconds, roughly the primary provider's p95 latency
+    SEARCH_FIXTURE_PATH: str = "search_fixtures.json"  # Used by the fixture provider
+    ANALYSIS_CONTEXT_TOKEN_BUDGET: int = 3000  # Estimated tokens of paper evidence in the analysis prompt; 0 = unlimited
+    ANALYSIS_MIN_ABSTRACT_TOKENS: int = 30  # Abstracts that would be cut shorter than this are left out
+    
+    # Pipeline deadline settings (seconds)
+    PIPELINE_DEADLINE: float = 60.0  # Whole fact-check
+    STAGE_KEYWORDS_TIMEOUT: float = 10.0
+    STAGE_SEARCH_TIMEOUT: float = 20.0
+    STAGE_ENRICH_TIMEOUT: float = 8.0
+    STAGE_FINDINGS_TIMEOUT: float = 25.0
+    STAGE_ANALYSIS_TIMEOUT: float = 30.0
+    PIPELINE_ANALYSIS_RESERVE: float = 10.0  # Deadline time findings leave for the analysis
+    REQUEST_TIMEOUT_MIN: float = 5.0  # Floor applied to a client's X-Request-Timeout header
+    
+    # Gemini quota settings
+    LLM_RATE_LIMIT_ENABLED: bool = True
+    LLM_REQUESTS_PER_MINUTE: int = 2000  # Set to the project's Gemini quota; 0 means unlimited
+    LLM_TOKENS_PER_MINUTE: int = 4000000  # 0 means unlimited
+    LLM_OUTPUT_TOKENS_ESTIMATE: int = 400  # Response tokens reserved per call until usage is reported
+    LLM_RATE_MIN_FRACTION: float = 0.05  # Backoff never lowers the rate below this fraction of the quota
+    LLM_RATE_INCREASE: float = 0.02  # Fraction of the quota restored per successful call
+    LLM_RATE_DECREASE: float = 0.5  # Rate multiplier applied on a 429/503
+    
+    # Retry and circuit breaker settings for Gemini and SerpAPI calls
+    RETRY_MAX_ATTEMPTS: int = 3  # Attempts per call, including the first
+    RETRY_BASE_DELAY: float = 0.5  # seconds; the backoff ceiling doubles per attempt
+    RETRY_MAX_DELAY: float = 8.0  # seconds
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open a provider's circuit
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds open before a trial call is let through
+    
+    # HTTP client settings
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    HTTP_CONNECT_TIMEOUT: float = 5.0  # seconds
+    LLM_TIMEOUT: float = 30.0  # seconds
+    SEARCH_TIMEOUT: float = 30.0  # seconds
+    PAPER_FETCH_TIMEOUT: float = 5.0  # seconds
+    
+    # Record/replay settings for outbound HTTP
+    CASSETTE_MODE: str = "off"  # "off", "record" (store every response) or "replay" (serve only stored responses)
+    CASSETTE_PATH: str = "cassettes.sqlite3"
+    CASSETTE_REPLAY_LATENCY_SCALE: float = 0.0  # Replay delay as a multiple of the recorded latency; 0 is instant
+    
+    # Abstract enrichment settings
+    ENRICH_DEADLINE: float = 6.0  # seconds for all abstract fetches of one search
+    ENRICH_PER_HOST_CONCURRENCY: int = 2
+    ABSTRACT_MAX_BYTES: int = 262144  # Stop reading a paper page after this many bytes
+    ABSTRACT_CACHE_ENABLED: bool = True
+    ABSTRACT_CACHE_BACKEND: str = "sqlite"  # "memory" or "sqlite"
+    ABSTRACT_CACHE_TTL: int = 2592000  # seconds
+    ABSTRACT_CACHE_MAX_ENTRIES: int = 50000
+    ABSTRACT_CACHE_PATH: str = "paper_abstracts.sqlite3"
+    
+    # Local paper store settings
+    PAPER_STORE_ENABLED: bool = True
+    PAPER_STORE_PATH: str = "paper_store.jsonl"
+    LOCAL_SEARCH_MIN_RESULTS: int = 5  # Local matches needed to skip SERP API
+    LOCAL_SEARCH_MIN_COVERAGE: float = 0.6  # Fraction of query terms a local match must contain
+    
+    # Result cache settings
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    RESULT_CACHE_TTL: int = 86400  # seconds
+    RESULT_CACHE_MAX_ENTRIES: int = 1000
+    RESULT_CACHE_PATH: str = "fact_check_cache.sqlite3"  # Used by the sqlite backend
+    
+    # Per-stage cache settings (sqlite tables share RESULT_CACHE_PATH)
+    STAGE_CACHE_ENABLED: bool = True
+    STAGE_CACHE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    KEYWORD_CACHE_TTL: int = 604800  # seconds
+    KEYWORD_CACHE_MAX_ENTRIES: int = 5000
+    SEARCH_CACHE_TTL: int = 86400  # seconds
+    SEARCH_CACHE_MAX_ENTRIES: int = 2000
+    FINDINGS_CACHE_TTL: int = 604800  # seconds
+    FINDINGS_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Semantic claim cache settings
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_EMBEDDER: str = "hashed"  # "hashed" or "sentence-transformers"
+    SEMANTIC_CACHE_MODEL: str = "all-MiniLM-L6-v2"  # Used by the sentence-transformers embedder
+    SEMANTIC_CACHE_DIM: int = 1024  # Hash buckets, used by the hashed embedder
+    SEMANTIC_CACHE_PATH: str = "claim_index"  # Writes claim_index.vec and claim_index.jsonl
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 50000  # Oldest claims are evicted beyond this; 0 means unlimited
+    SEMANTIC_CACHE_RESULT_THRESHOLD: float = 0.9  # Similarity needed to reuse a result; the hashed embedder also needs the same content words
+    SEMANTIC_CACHE_EVIDENCE_THRESHOLD: float = 0.7  # Similarity needed to reuse keywords and papers
+    
+    # Request coalescing (single-flight) settings
+    CLAIM_SINGLE_FLIGHT_ENABLED: bool = True
+    LLM_SINGLE_FLIGHT_ENABLED: bool = False  # Also coalesce identical in-flight Gemini prompts
+    
+    # Batch endpoint settings
+    BATCH_MAX_CLAIMS: int = 50
+    BATCH_CONCURRENCY: int = 4  # Claims processed concurrently across all batch requests
+    
+    # Async job queue settings
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_MAX_SIZE: int = 100  # Jobs waiting beyond this are rejected with 503
+    JOB_RESULT_TTL: int = 3600  # seconds a finished job stays retrievable
+    JOB_STORE_MAX_JOBS: int = 10000
     
     class Config:
         env_file = ".env"
@@ -1,4 +1,6 @@
 # app/core/exceptions.py
+from typing import Optional
+
 from fastapi import HTTPException, status
 
 
@@ -12,11 +14,34 @@ class LLMRequestError(Exception):
     pass
 
 
+class LLMRateLimitError(LLMRequestError):
+    """Raised when the LLM provider throttles a request (429/503)."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class SearchRequestError(Exception):
     """Raised when there's an issue with search request."""
     pass
 
 
+class JobQueueFullError(Exception):
+    """Raised when the fact-check job queue cannot accept more jobs."""
+    pass
+
+
+class PipelineTimeoutError(Exception):
+    """Raised when a required pipeline stage runs out of time."""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """Raised when calls to a failing provider are rejected by its circuit breaker."""
+    pass
+
+
 # HTTP exceptions
 class FactCheckHTTPException:
     """HTTP exception factory for the application."""
@@ -35,6 +60,14 @@ class FactCheckHTTPException:
             detail=detail
         )
     
+    @staticmethod
+    def rate_limit_error(detail: str = "LLM service is rate limiting requests", retry_after: int = 30) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+    
     @staticmethod
     def search_request_error(detail: str = "Error calling search service") -> HTTPException:
         return HTTPException(
@@ -42,6 +75,28 @@ class FactCheckHTTPException:
             detail=detail
         )
     
+    @staticmethod
+    def timeout_error(detail: str = "Fact-check timed out") -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=detail
+        )
+    
+    @staticmethod
+    def queue_full_error(detail: str = "Job queue is full", retry_after: int = 5) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    @staticmethod
+    def not_found_error(detail: str = "Not found") -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail
+        )
+    
     @staticmethod
     def validation_error(detail: str = "Validation error") -> HTTPException:
         return HTTPException(
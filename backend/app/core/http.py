@@ -0,0 +1,56 @@
+# app/core/http.py
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.cassette import CassetteTransport, get_cassette_store
+from app.core.config import settings
+from app.core.metrics import InstrumentedTransport
+
+
+def create_async_client(timeout: float) -> httpx.AsyncClient:
+    """
+    Create a pooled async HTTP client configured from settings.
+    
+    Args:
+        timeout: Default read/write/pool timeout in seconds
+        
+    Returns:
+        An httpx.AsyncClient that keeps connections alive between requests and
+        records per-service request metrics. With CASSETTE_MODE "record" or
+        "replay", responses are also recorded to, or served from, the cassette store.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(limits=limits)
+    if settings.CASSETTE_MODE != "off":
+        transport = CassetteTransport(
+            transport,
+            get_cassette_store(settings.CASSETTE_PATH),
+            settings.CASSETTE_MODE,
+            latency_scale=settings.CASSETTE_REPLAY_LATENCY_SCALE,
+        )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+        transport=InstrumentedTransport(transport),
+    )
+
+
+def create_session() -> requests.Session:
+    """
+    Create a pooled requests session configured from settings.
+    
+    Returns:
+        A requests.Session that reuses connections for the blocking code paths
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        pool_maxsize=settings.HTTP_MAX_CONNECTIONS,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,239 @@
+# app/core/metrics.py
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterator
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+# Latency buckets in seconds, from a cached lookup up to a slow LLM call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Prompt size buckets in estimated tokens
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 12000, 16000, 32000)
+
+STAGE_LATENCY = Histogram(
+    "factcheck_stage_duration_seconds",
+    "Time spent in each fact-check step",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+PIPELINE_STAGE_LATENCY = Histogram(
+    "factcheck_pipeline_stage_duration_seconds",
+    "Time spent in each stage of the fact-check stage graph, fallback included",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+PIPELINE_STAGE_DEGRADED = Counter(
+    "factcheck_pipeline_stage_degraded",
+    "Stage graph stages that failed or timed out and used their fallback",
+    ["stage"],
+)
+EXTERNAL_LATENCY = Histogram(
+    "factcheck_external_request_duration_seconds",
+    "Time until response headers arrive from an external service",
+    ["service"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_REQUESTS = Counter(
+    "factcheck_external_requests",
+    "Requests made to external services, by response status code ('error' when no response arrived)",
+    ["service", "status"],
+)
+EXTERNAL_BYTES = Counter(
+    "factcheck_external_bytes",
+    "Bytes exchanged with external services",
+    ["service", "direction"],
+)
+EXTERNAL_RETRIES = Counter(
+    "factcheck_external_retries",
+    "Retries of failed external calls",
+    ["service"],
+)
+CIRCUIT_STATE = Gauge(
+    "factcheck_circuit_state",
+    "Circuit breaker state per provider: 0 closed, 1 half-open, 2 open",
+    ["service"],
+)
+LLM_RATE_LIMITER_WAIT = Histogram(
+    "factcheck_llm_rate_limiter_wait_seconds",
+    "Time LLM calls spent queued for quota in the client-side rate limiter",
+    ["lane"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_JSON_FALLBACKS = Counter(
+    "factcheck_llm_json_fallbacks",
+    "LLM responses that were not valid JSON and needed a fallback",
+    ["kind"],
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "factcheck_llm_prompt_tokens",
+    "Estimated prompt tokens per LLM call",
+    ["operation"],
+    buckets=TOKEN_BUCKETS,
+)
+ANALYSIS_PAPERS_TRIMMED = Counter(
+    "factcheck_analysis_papers_trimmed",
+    "Papers cut to fit the analysis prompt's token budget",
+    ["action"],
+)
+
+
+def observe_latency(stage: str) -> Callable:
+    """
+    Decorator recording a function's duration in the stage latency histogram.
+    
+    Works on both plain and coroutine functions; failed calls are recorded too.
+    
+    Args:
+        stage: Value of the "stage" label
+        
+    Returns:
+        The decorator
+    """
+    histogram = STAGE_LATENCY.labels(stage)
+    
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    
+    return decorator
+
+
+def service_for_host(host: str) -> str:
+    """
+    Name of the external service behind a host, used as a metric label.
+    
+    Paper pages come from arbitrary publisher hosts, so they share one label
+    to keep the number of series bounded.
+    
+    Args:
+        host: Request host name
+        
+    Returns:
+        "gemini", "serpapi" or "paper_page"
+    """
+    host = host.lower()
+    if host.endswith("googleapis.com"):
+        return "gemini"
+    if host.endswith("serpapi.com"):
+        return "serpapi"
+    return "paper_page"
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body stream that counts the bytes read from it."""
+    
+    def __init__(self, stream: httpx.AsyncByteStream, service: str):
+        self._stream = stream
+        self._counter = EXTERNAL_BYTES.labels(service, "received")
+    
+    async def __aiter__(self) -> Iterator[bytes]:
+        async for chunk in self._stream:
+            self._counter.inc(len(chunk))
+            yield chunk
+    
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport recording request counts, status codes, latency and bytes.
+    
+    Wraps another transport, so it sits below the client's connection pool
+    and sees every request the shared clients make.
+    """
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        """
+        Initialize the transport.
+        
+        Args:
+            transport: Transport that actually sends the requests
+        """
+        self._transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        service = service_for_host(request.url.host)
+        EXTERNAL_BYTES.labels(service, "sent").inc(int(request.headers.get("content-length", 0)))
+        
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            EXTERNAL_REQUESTS.labels(service, "error").inc()
+            raise
+        finally:
+            EXTERNAL_LATENCY.labels(service).observe(time.perf_counter() - started)
+        
+        EXTERNAL_REQUESTS.labels(service, str(response.status_code)).inc()
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CountingStream(response.stream, service),
+            extensions=response.extensions,
+        )
+    
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class CacheStatsCollector:
+    """
+    Exposes the pipeline's cache counters as Prometheus metrics.
+    
+    The caches keep their own hit/miss counters (also served by the
+    /cache/stats endpoint); this reads them at scrape time rather than
+    duplicating the bookkeeping.
+    """
+    
+    # Counter fields of a cache layer's stats, and the "result" label each maps to
+    RESULT_FIELDS = {"hits": "hit", "evidence_hits": "evidence_hit", "misses": "miss"}
+    
+    def __init__(self, get_stats: Callable[[], Dict[str, Dict[str, int]]]):
+        """
+        Initialize the collector.
+        
+        Args:
+            get_stats: Returns the mapping of cache layer name to its counters
+        """
+        self._get_stats = get_stats
+    
+    def collect(self) -> Iterator[Any]:
+        lookups = CounterMetricFamily(
+            "factcheck_cache_lookups", "Cache lookups by layer and result", labels=["layer", "result"]
+        )
+        entries = GaugeMetricFamily(
+            "factcheck_cache_entries",
+            "Items held by cache layers that report a size, by what they hold (papers, claims, ...)",
+            labels=["layer", "kind"],
+        )
+        for layer, stats in self._get_stats().items():
+            for field, result in self.RESULT_FIELDS.items():
+                if field in stats:
+                    lookups.add_metric([layer, result], stats[field])
+            for field, value in stats.items():
+                if field not in self.RESULT_FIELDS:
+                    entries.add_metric([layer, field], value)
+        yield lookups
+        yield entries
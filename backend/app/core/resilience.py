@@ -0,0 +1,347 @@
+# app/core/resilience.py
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Union
+
+import httpx
+
+from app.core.cassette import CassetteMissError
+from app.core.config import settings
+from app.core.exceptions import CircuitOpenError, PipelineTimeoutError
+from app.core.metrics import CIRCUIT_STATE, EXTERNAL_RETRIES
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Statuses worth another attempt: timeouts, throttling and transient server errors.
+# Anything else (bad request, auth, not found) would fail the same way again.
+RETRYABLE_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+
+# Monotonic time by which the current request must be answered, if any. Set
+# per request and per pipeline stage; asyncio tasks inherit it.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+# A timeout that fires with less than this left before the deadline was cut short by it
+DEADLINE_SLACK = 0.05
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Limit the calls made inside the block to the given time budget.
+    
+    Nested scopes can only shorten the deadline, never extend it.
+    
+    Args:
+        seconds: Time budget from now, or None to keep the current deadline
+    """
+    expires_at = _deadline.get()
+    if seconds is not None:
+        new_deadline = time.monotonic() + max(0.0, seconds)
+        expires_at = new_deadline if expires_at is None else min(expires_at, new_deadline)
+    token = _deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """Run the block without a deadline, e.g. work shared by callers whose deadlines differ."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None when there is none."""
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def bounded_timeout(timeout: httpx.Timeout, remaining: Optional[float]) -> httpx.Timeout:
+    """
+    Shorten a client timeout so a single attempt cannot outlive the deadline.
+    
+    Args:
+        timeout: Timeout configured on the client
+        remaining: Seconds left before the deadline, if any
+        
+    Returns:
+        Timeout whose every phase is at most `remaining`
+    """
+    if remaining is None:
+        return timeout
+    
+    def bound(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+    
+    return httpx.Timeout(
+        connect=bound(timeout.connect), read=bound(timeout.read), write=bound(timeout.write), pool=bound(timeout.pool)
+    )
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a provider fast while it keeps failing.
+    
+    After `failure_threshold` consecutive retryable failures the circuit
+    opens and calls are rejected without touching the network. Once
+    `reset_timeout` has passed, one trial call is let through (half-open): its
+    success closes the circuit, its failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize a closed circuit.
+        
+        Args:
+            name: Provider name, used in errors, logs and metrics
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._set_state(self.CLOSED)
+    
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(self.STATE_VALUES[state])
+    
+    def before_call(self) -> None:
+        """
+        Check that a call may go out.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its trial call already running
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+                if retry_in > 0:
+                    raise CircuitOpenError(f"Circuit for {self.name} is open; retrying in {retry_in:.0f}s")
+                self._set_state(self.HALF_OPEN)
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                raise CircuitOpenError(f"Circuit for {self.name} is half-open; a trial call is in flight")
+            self._trial_in_flight = True
+    
+    def record_success(self) -> None:
+        """The provider answered; close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+                self._set_state(self.CLOSED)
+    
+    def release(self) -> None:
+        """A call ended without telling us anything about the provider (e.g. it was cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """The provider failed in a way that suggests it is unhealthy."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit for {self.name} opened after {self._failures} consecutive failures")
+                self._set_state(self.OPEN)
+                self._opened_at = time.monotonic()
+
+
+# Circuit breakers shared by every client, keyed by provider name
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Shared circuit breaker for a provider, created from settings on first use.
+    
+    Args:
+        name: Provider name, e.g. "gemini" or "serpapi"
+        
+    Returns:
+        The breaker
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name, settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD, settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff before the next attempt.
+    
+    Args:
+        attempt: Number of attempts made so far (1 after the first failure)
+        retry_after: Minimum wait the provider asked for, if any
+        
+    Returns:
+        Seconds to wait
+    """
+    ceiling = min(settings.RETRY_MAX_DELAY, settings.RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    delay = random.uniform(0, ceiling)
+    return max(delay, retry_after or 0.0)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, if present."""
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+# Client timeout phase each httpx timeout error belongs to
+TIMEOUT_PHASES = (
+    (httpx.ConnectTimeout, "connect"),
+    (httpx.ReadTimeout, "read"),
+    (httpx.WriteTimeout, "write"),
+    (httpx.PoolTimeout, "pool"),
+)
+
+
+def _cut_short_by_deadline(error: httpx.TransportError, timeout: Optional[httpx.Timeout]) -> bool:
+    """
+    Whether an attempt timed out because of the caller's deadline rather than the provider's timeout.
+    
+    True when the deadline has (all but) run out, or when the phase that timed
+    out was given less time than the client is configured for, which only
+    `bounded_timeout` does.
+    """
+    if not isinstance(error, httpx.TimeoutException) or remaining_time() is None:
+        return False
+    if remaining_time() <= DEADLINE_SLACK:
+        return True
+    phase = next((name for error_type, name in TIMEOUT_PHASES if isinstance(error, error_type)), None)
+    if phase is None or timeout is None:
+        return False
+    try:
+        effective = error.request.extensions.get("timeout", {}).get(phase)
+    except RuntimeError:
+        # No request attached to the error
+        return False
+    configured = getattr(timeout, phase)
+    return effective is not None and (configured is None or effective < configured)
+
+
+async def send_with_retries(
+    provider: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    max_attempts: Optional[int] = None,
+    timeout: Optional[httpx.Timeout] = None,
+) -> httpx.Response:
+    """
+    Send a request with bounded retries behind the provider's circuit breaker.
+    
+    Transport errors and RETRYABLE_STATUSES are retried with jittered
+    exponential backoff (at least any Retry-After the provider sent), and
+    all but 429 count as provider failures. Other statuses are returned at
+    once, and cassette replay misses are raised at once. No attempt starts,
+    and no backoff is slept, past the current deadline. An attempt that timed
+    out only because the caller's deadline shortened its timeout is not held
+    against the provider and is not retried.
+    
+    Args:
+        provider: Provider name, selecting the circuit breaker
+        send: Sends one attempt; should bound its timeout with
+            `bounded_timeout(..., remaining_time())`
+        max_attempts: Attempts including the first; defaults to RETRY_MAX_ATTEMPTS
+        timeout: Timeout configured on the client, to tell provider timeouts
+            from ones the deadline imposed
+        
+    Returns:
+        The last response received
+        
+    Raises:
+        CircuitOpenError: If the provider's circuit is open
+        PipelineTimeoutError: If the deadline passed before an attempt could
+            start or while one was in flight
+        httpx.HTTPError: If the last attempt failed without a response
+    """
+    breaker = get_circuit_breaker(provider)
+    attempts = max(1, max_attempts or settings.RETRY_MAX_ATTEMPTS)
+    
+    for attempt in range(1, attempts + 1):
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise PipelineTimeoutError(f"Deadline passed before calling {provider}")
+        breaker.before_call()
+        
+        failure: Union[httpx.Response, httpx.TransportError]
+        try:
+            response = await send()
+        except CassetteMissError:
+            # Replaying a request that was never recorded fails the same way every time
+            breaker.release()
+            raise
+        except httpx.TransportError as e:
+            if _cut_short_by_deadline(e, timeout):
+                # The caller ran out of time; the provider may be perfectly healthy
+                breaker.release()
+                raise PipelineTimeoutError(f"Deadline passed while calling {provider}") from e
+            breaker.record_failure()
+            failure = e
+        except BaseException:
+            # Cancelled or failed on our side, which says nothing about the provider
+            breaker.release()
+            raise
+        else:
+            if response.status_code not in RETRYABLE_STATUSES:
+                breaker.record_success()
+                return response
+            if response.status_code == 429:
+                # Over quota is our doing, not a sign the provider is down
+                breaker.release()
+            else:
+                breaker.record_failure()
+            failure = response
+        
+        retry_after = _retry_after(failure) if isinstance(failure, httpx.Response) else None
+        delay = backoff_delay(attempt, retry_after)
+        remaining = remaining_time()
+        if attempt == attempts or (remaining is not None and delay >= remaining):
+            # Out of attempts, or the retry could not finish in time: report what we have
+            if isinstance(failure, httpx.Response):
+                return failure
+            raise failure
+        
+        EXTERNAL_RETRIES.labels(provider).inc()
+        reason = failure.status_code if isinstance(failure, httpx.Response) else type(failure).__name__
+        logger.warning(f"Retrying {provider} in {delay:.2f}s after {reason} (attempt {attempt}/{attempts})")
+        if isinstance(failure, httpx.Response):
+            await failure.aclose()
+        await asyncio.sleep(delay)
+    
+    raise AssertionError("unreachable")
@@ -1,14 +1,28 @@
 # app/main.py
+import asyncio
 import logging
+import math
 import time
-from fastapi import FastAPI, Request, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 import uvicorn
 
 from app.api.endpoints import fact_check
 from app.core.config import settings
-from app.core.exceptions import APIKeyNotFoundError, LLMRequestError, SearchRequestError
+from app.core.exceptions import (
+    APIKeyNotFoundError,
+    LLMRateLimitError,
+    LLMRequestError,
+    PipelineTimeoutError,
+    SearchRequestError,
+)
+from app.core.metrics import CacheStatsCollector
+from app.core.resilience import deadline_scope
+from app.services.fact_check_pipeline import FactCheckPipeline
+from app.services.job_queue import InMemoryJobStore, JobQueue
 
 
 # Configure logging
@@ -22,6 +36,43 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared fact-check pipeline and job workers on startup and close them on shutdown."""
+    app.state.fact_check_pipeline = None
+    app.state.fact_check_pipeline_error = None
+    app.state.job_queue = None
+    # Global budget of claims processed concurrently on behalf of batch requests
+    app.state.batch_semaphore = asyncio.Semaphore(max(1, settings.BATCH_CONCURRENCY))
+    cache_collector = None
+    try:
+        app.state.fact_check_pipeline = FactCheckPipeline()
+    except APIKeyNotFoundError as e:
+        logger.error(f"Error initializing fact check pipeline: {str(e)}")
+        app.state.fact_check_pipeline_error = str(e)
+    
+    if app.state.fact_check_pipeline is not None:
+        cache_collector = CacheStatsCollector(app.state.fact_check_pipeline.cache_stats)
+        REGISTRY.register(cache_collector)
+        app.state.job_queue = JobQueue(
+            app.state.fact_check_pipeline,
+            InMemoryJobStore(settings.JOB_RESULT_TTL, settings.JOB_STORE_MAX_JOBS),
+            workers=settings.JOB_WORKERS,
+            max_size=settings.JOB_QUEUE_MAX_SIZE,
+        )
+        app.state.job_queue.start()
+    
+    yield
+    
+    if cache_collector is not None:
+        REGISTRY.unregister(cache_collector)
+    if app.state.job_queue is not None:
+        await app.state.job_queue.stop()
+    if app.state.fact_check_pipeline is not None:
+        await app.state.fact_check_pipeline.aclose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -29,6 +80,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -47,9 +99,23 @@ app.include_router(fact_check.router, prefix=settings.API_V1_STR)
 # Add request processing time middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    """Add X-Process-Time header to responses showing processing time."""
+    """
+    Add X-Process-Time header to responses showing processing time.
+    
+    A client that will stop waiting after some time can say so with an
+    X-Request-Timeout header (seconds); outbound calls and retries made for the
+    request then give up by that deadline.
+    """
     start_time = time.time()
-    response = await call_next(request)
+    try:
+        client_timeout = float(request.headers.get("X-Request-Timeout", ""))
+    except ValueError:
+        client_timeout = None
+    if client_timeout is not None:
+        # Too short a budget would only produce timeouts; ignore values that are not numbers of seconds
+        client_timeout = max(client_timeout, settings.REQUEST_TIMEOUT_MIN) if math.isfinite(client_timeout) else None
+    with deadline_scope(client_timeout):
+        response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
     return response
@@ -74,6 +140,16 @@ async def llm_request_error_handler(request: Request, exc: LLMRequestError):
     )
 
 
+@app.exception_handler(LLMRateLimitError)
+async def llm_rate_limit_error_handler(request: Request, exc: LLMRateLimitError):
+    """Handle LLM throttling, telling the client when to retry."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after or 30))}
+    )
+
+
 @app.exception_handler(SearchRequestError)
 async def search_request_error_handler(request: Request, exc: SearchRequestError):
     """Handle search request errors."""
@@ -83,6 +159,15 @@ async def search_request_error_handler(request: Request, exc: SearchRequestError
     )
 
 
+@app.exception_handler(PipelineTimeoutError)
+async def pipeline_timeout_error_handler(request: Request, exc: PipelineTimeoutError):
+    """Handle fact-check deadline errors."""
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": str(exc)}
+    )
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -94,6 +179,12 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: stage latencies, external calls, cache and LLM parse counters."""
+    return Response(content=generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
@@ -0,0 +1,165 @@
+# app/services/abstract_extractor.py
+import json
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+
+# Meta tags carrying an abstract, best first. Values are (priority, definitive);
+# a definitive source is a real abstract, so parsing can stop once it is seen.
+META_ABSTRACT_SOURCES = {
+    "citation_abstract": (0, True),
+    "dcterms.abstract": (1, True),
+    "dc.description": (3, False),
+    "og:description": (4, False),
+    "twitter:description": (5, False),
+    "description": (6, False),
+}
+JSON_LD_ABSTRACT_PRIORITY = 2
+JSON_LD_DESCRIPTION_PRIORITY = 7
+TEXT_MARKER_PRIORITY = 8
+
+# Headings after which the page text is likely the abstract
+TEXT_MARKERS = ("abstract", "summary", "overview")
+
+# Elements whose text is never part of the visible page content
+SKIPPED_TAGS = frozenset(["script", "style", "noscript", "template", "svg", "head", "nav", "footer"])
+
+MIN_ABSTRACT_LENGTH = 100
+MAX_ABSTRACT_LENGTH = 1500
+MAX_VISIBLE_TEXT = 20000
+
+
+class AbstractExtractor(HTMLParser):
+    """
+    Incremental HTML parser that finds a paper abstract.
+    
+    Feed it the page in chunks; `done` turns true as soon as a definitive
+    abstract (citation_abstract, dcterms.abstract or a JSON-LD "abstract")
+    has been seen, so the caller can stop downloading. Otherwise `abstract()`
+    falls back to descriptive meta tags and finally to the visible text
+    following an "Abstract"/"Summary"/"Overview" marker.
+    """
+    
+    def __init__(self):
+        """Initialize an empty extractor."""
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self._candidates: Dict[int, str] = {}
+        self._skip_depth = 0
+        self._in_json_ld = False
+        self._json_ld_parts: List[str] = []
+        self._text_parts: List[str] = []
+        self._text_length = 0
+    
+    def handle_starttag(self, tag: str, attrs: List[Any]) -> None:
+        attributes = {name.lower(): (value or "") for name, value in attrs}
+        
+        if tag == "meta":
+            name = (attributes.get("name") or attributes.get("property") or "").lower()
+            source = META_ABSTRACT_SOURCES.get(name)
+            if source is not None:
+                priority, definitive = source
+                self._add_candidate(priority, attributes.get("content", ""), definitive)
+            return
+        
+        if tag == "script" and attributes.get("type", "").lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._json_ld_parts = []
+        
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+    
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+            self._parse_json_ld("".join(self._json_ld_parts))
+        
+        if tag in SKIPPED_TAGS and self._skip_depth > 0:
+            self._skip_depth -= 1
+    
+    def handle_data(self, data: str) -> None:
+        if self._in_json_ld:
+            self._json_ld_parts.append(data)
+            return
+        
+        if self._skip_depth == 0 and self._text_length < MAX_VISIBLE_TEXT:
+            self._text_parts.append(data)
+            self._text_length += len(data)
+    
+    def abstract(self) -> str:
+        """
+        Best abstract found so far.
+        
+        Returns:
+            Cleaned abstract text, or an empty string if nothing substantial was found
+        """
+        if not self._candidates:
+            text_abstract = self._abstract_from_text()
+            if text_abstract:
+                self._candidates[TEXT_MARKER_PRIORITY] = text_abstract
+        
+        return self._candidates[min(self._candidates)] if self._candidates else ""
+    
+    def _add_candidate(self, priority: int, text: str, definitive: bool = False) -> None:
+        """Record an abstract candidate if it is substantial and better than what we have."""
+        cleaned = _clean_text(text)
+        if len(cleaned) < MIN_ABSTRACT_LENGTH or priority in self._candidates:
+            return
+        self._candidates[priority] = cleaned[:MAX_ABSTRACT_LENGTH]
+        if definitive:
+            self.done = True
+    
+    def _parse_json_ld(self, raw: str) -> None:
+        """Look for "abstract" and "description" fields in a JSON-LD block."""
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                if isinstance(node.get("abstract"), str):
+                    self._add_candidate(JSON_LD_ABSTRACT_PRIORITY, node["abstract"], definitive=True)
+                if isinstance(node.get("description"), str):
+                    self._add_candidate(JSON_LD_DESCRIPTION_PRIORITY, node["description"])
+                stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    
+    def _abstract_from_text(self) -> str:
+        """Take the visible text following the first abstract marker."""
+        text = _clean_text(" ".join(self._text_parts))
+        lowered = text.lower()
+        for marker in TEXT_MARKERS:
+            match = re.search(rf"\b{marker}\b[\s:.\-]*", lowered)
+            if match:
+                candidate = text[match.end():match.end() + MAX_ABSTRACT_LENGTH]
+                if len(candidate) >= MIN_ABSTRACT_LENGTH:
+                    return candidate
+        return ""
+
+
+def _clean_text(text: str) -> str:
+    """Strip leftover tags and collapse whitespace."""
+    text = re.sub(r"<[^>]+>", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    """
+    Whether a Content-Type header denotes a page worth parsing.
+    
+    Args:
+        content_type: Raw Content-Type header value, if any
+        
+    Returns:
+        True for HTML/XHTML or a missing header, False for PDFs and other types
+    """
+    if not content_type:
+        return True
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type in ("text/html", "application/xhtml+xml")
+
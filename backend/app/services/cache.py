@@ -0,0 +1,278 @@
+# app/services/cache.py
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from arbitrary JSON-serializable parts.
+    
+    Args:
+        parts: Values that together identify the cached item
+        
+    Returns:
+        Hex SHA-256 digest of the parts
+    """
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend:
+    """Interface for key/value caches with a TTL and a maximum entry count."""
+    
+    hits: int = 0
+    misses: int = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        raise NotImplementedError
+    
+    def _record(self, value: Optional[Any]) -> Optional[Any]:
+        """Count a lookup as a hit or a miss and pass the value through."""
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit and miss counters since startup.
+        
+        Returns:
+            Dictionary with "hits" and "misses"
+        """
+        return {"hits": self.hits, "misses": self.misses}
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+        """
+        raise NotImplementedError
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Look up a value from async code.
+        
+        Backends that do blocking I/O run the lookup off the event loop.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        return self.get(key)
+    
+    async def aset(self, key: str, value: Any) -> None:
+        """
+        Store a value from async code.
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value to store
+        """
+        self.set(key, value)
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class InMemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry expiry."""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Initialize the in-memory cache.
+        
+        Args:
+            max_entries: Maximum number of entries kept before LRU eviction
+            ttl: Time-to-live of each entry in seconds
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return self._record(None)
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return self._record(None)
+            self._entries.move_to_end(key)
+        # Callers may mutate what they get back, so never hand out the stored object
+        return self._record(copy.deepcopy(value))
+    
+    def set(self, key: str, value: Any) -> None:
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Persistent LRU cache stored in a SQLite table, surviving restarts.
+    
+    Lookups only read: hits note their access time in memory, and the times
+    are written in one transaction by the next `set`, by `close`, or once
+    they are ACCESS_FLUSH_INTERVAL seconds old, so a hit does not wait for a
+    commit. Expired rows are removed by `set`. Async code should use `aget`
+    and `aset`, which run the queries in a worker thread.
+    """
+    
+    ACCESS_FLUSH_INTERVAL = 60.0
+    ACCESS_FLUSH_MAX = 1000
+    
+    def __init__(self, path: str, max_entries: int, ttl: float, table: str = "cache"):
+        """
+        Initialize the SQLite cache.
+        
+        Args:
+            path: Database file path
+            max_entries: Maximum number of entries kept before LRU eviction
+            ttl: Time-to-live of each entry in seconds
+            table: Table name, so several caches can share one database file
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+        self._last_flush = time.time()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+        self._conn.commit()
+    
+    def _write_access_times(self) -> None:
+        """Write buffered access times; the caller holds the lock and commits."""
+        if self._pending_access:
+            self._conn.executemany(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+        self._last_flush = time.time()
+    
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                return self._record(None)
+            self._pending_access[key] = now
+            if (
+                len(self._pending_access) >= self.ACCESS_FLUSH_MAX
+                or now - self._last_flush >= self.ACCESS_FLUSH_INTERVAL
+            ):
+                self._write_access_times()
+                self._conn.commit()
+        return self._record(json.loads(row[0]))
+    
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        serialized = json.dumps(value)
+        with self._lock:
+            # Eviction below must see recent hits
+            self._write_access_times()
+            self._pending_access.pop(key, None)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, serialized, now + self.ttl, now),
+            )
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        # Reads and the occasional access-time flush hit the database file
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, value: Any) -> None:
+        # The insert, evictions and commit would otherwise stall the event loop
+        await asyncio.to_thread(self.set, key, value)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._write_access_times()
+            self._conn.commit()
+            self._conn.close()
+
+
+def create_cache(backend: str, max_entries: int, ttl: float, path: str = "", table: str = "cache") -> CacheBackend:
+    """
+    Create a cache backend by name.
+    
+    Args:
+        backend: "memory" for an in-process cache or "sqlite" for a persistent one
+        max_entries: Maximum number of entries kept before LRU eviction
+        ttl: Time-to-live of each entry in seconds
+        path: Database file path, used by the sqlite backend
+        table: Table name, used by the sqlite backend
+        
+    Returns:
+        The cache backend
+        
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if backend == "memory":
+        return InMemoryCache(max_entries, ttl)
+    if backend == "sqlite":
+        return SQLiteCache(path, max_entries, ttl, table=table)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,187 @@
+# app/services/context_packer.py
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.services.rate_limiter import CHARS_PER_TOKEN, estimate_tokens
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# How much of the abstract budget a paper earns, by the relevance its findings were given
+RELEVANCE_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+UNASSESSED_WEIGHT = 1.5
+
+MAX_LISTED_AUTHORS = 3
+TRUNCATION_MARK = "..."
+
+
+def compact(text: Any) -> str:
+    """Collapse all runs of whitespace in a value to single spaces."""
+    return " ".join(str(text).split())
+
+
+def relevance_weight(paper: Dict[str, Any]) -> float:
+    """Budget weight of a paper from its assessed relevance."""
+    return RELEVANCE_WEIGHTS.get(str(paper.get("relevance", "")).strip().lower(), UNASSESSED_WEIGHT)
+
+
+def _author_names(authors: Any) -> List[str]:
+    """Readable author names from the list formats search providers return."""
+    if isinstance(authors, str):
+        return [authors] if authors else []
+    names = []
+    for author in authors or []:
+        if isinstance(author, dict):
+            names.append(str(author.get("name") or next(iter(author.values()), "Unknown")))
+        else:
+            names.append(str(author))
+    return names
+
+
+def _truncate(text: str, tokens: int) -> str:
+    """Cut text to about `tokens` tokens at a word boundary."""
+    if len(text) <= tokens * CHARS_PER_TOKEN:
+        return text
+    cut = text[:max(0, tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARK))].rsplit(" ", 1)[0]
+    return cut + TRUNCATION_MARK
+
+
+class ContextPacker:
+    """
+    Fits the paper evidence for the analysis prompt into a token budget.
+    
+    Each paper gets a compact header (number, title, authors, year, assessed
+    relevance and position) and its key findings, which are always kept for
+    every paper that is included. The rest of the budget goes to abstracts,
+    shared in proportion to relevance: an abstract shorter than its share
+    leaves the remainder to the others, a longer one is truncated, and one
+    whose share is too small to be useful is left out. When even the headers
+    do not fit, the least relevant papers are dropped. Papers keep their
+    original numbers, so the model's per-paper analyses still line up.
+    """
+    
+    def __init__(self, budget_tokens: int, min_abstract_tokens: int = 30, ignored_findings: Iterable[str] = ()):
+        """
+        Initialize the packer.
+        
+        Args:
+            budget_tokens: Token budget for the evidence section; 0 or less means unlimited
+            min_abstract_tokens: Abstracts that would be cut below this are left out
+            ignored_findings: Placeholder findings text that carries no evidence
+        """
+        self.budget_tokens = budget_tokens
+        self.min_abstract_tokens = min_abstract_tokens
+        self.ignored_findings = frozenset(ignored_findings)
+    
+    def _header(self, number: int, paper: Dict[str, Any]) -> str:
+        """Paper block without its abstract."""
+        names = _author_names(paper.get("authors"))
+        authors = ", ".join(names[:MAX_LISTED_AUTHORS]) + (" et al." if len(names) > MAX_LISTED_AUTHORS else "")
+        details = "; ".join(part for part in (compact(authors), compact(paper.get("year", ""))) if part)
+        title = compact(paper.get("title") or f"Paper {number}")
+        lines = [
+            f"PAPER {number}: {title}" + (f" ({details})" if details else ""),
+            f"Relevance: {compact(paper.get('relevance') or 'Not assessed')}; "
+            f"Position: {compact(paper.get('position') or 'Not assessed')}",
+        ]
+        findings = compact(paper.get("key_findings", ""))
+        if findings and findings not in self.ignored_findings:
+            lines.append(f"Findings: {findings}")
+        return "\n".join(lines)
+    
+    def pack(self, papers: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the evidence section for a list of papers.
+        
+        Args:
+            papers: Papers with findings, in the order they are numbered
+            
+        Returns:
+            Tuple of (evidence text, report) where the report holds "papers",
+            "included", "dropped" and "truncated" paper numbers, "tokens" used
+            and the "budget"
+        """
+        headers = {number: self._header(number, paper) for number, paper in enumerate(papers, 1)}
+        abstracts = {number: compact(paper.get("snippet", "")) for number, paper in enumerate(papers, 1)}
+        weights = {number: relevance_weight(paper) for number, paper in enumerate(papers, 1)}
+        unlimited = self.budget_tokens <= 0
+        
+        # Admit papers, most relevant first, while their headers fit
+        by_relevance = sorted(headers, key=lambda number: (-weights[number], number))
+        included: List[int] = []
+        used = 0
+        for number in by_relevance:
+            # One token for the blank line between papers
+            cost = estimate_tokens(headers[number]) + 1
+            if unlimited or used + cost <= self.budget_tokens:
+                included.append(number)
+                used += cost
+        dropped = sorted(set(headers) - set(included))
+        
+        # Share what is left among the abstracts, by relevance
+        allowances = self._allocate_abstracts(
+            {number: estimate_tokens(abstracts[number]) + 3 for number in included if abstracts[number]},
+            weights,
+            None if unlimited else self.budget_tokens - used,
+        )
+        
+        blocks = []
+        truncated = []
+        for number in sorted(included):
+            block = headers[number]
+            allowance = allowances.get(number, 0)
+            if abstracts[number] and allowance >= min(self.min_abstract_tokens, estimate_tokens(abstracts[number]) + 3):
+                abstract = _truncate(abstracts[number], allowance - 3)
+                if abstract != abstracts[number]:
+                    truncated.append(number)
+                block += f"\nAbstract: {abstract}"
+            elif abstracts[number]:
+                truncated.append(number)
+            blocks.append(block)
+        
+        text = "\n\n".join(blocks)
+        report = {
+            "papers": len(papers),
+            "included": len(included),
+            "dropped": dropped,
+            "truncated": truncated,
+            "tokens": estimate_tokens(text),
+            "budget": self.budget_tokens,
+        }
+        return text, report
+    
+    @staticmethod
+    def _allocate_abstracts(needs: Dict[int, int], weights: Dict[int, float], budget: Any) -> Dict[int, int]:
+        """
+        Split a token budget among abstracts in proportion to paper weight.
+        
+        Abstracts needing less than their share get exactly what they need and
+        the surplus is shared again among the rest.
+        
+        Args:
+            needs: Tokens each abstract needs in full, by paper number
+            weights: Weight of each paper
+            budget: Tokens available, or None for no limit
+            
+        Returns:
+            Tokens granted to each abstract
+        """
+        if budget is None:
+            return dict(needs)
+        
+        granted: Dict[int, int] = {}
+        pending = dict(needs)
+        remaining = max(0, budget)
+        while pending:
+            total_weight = sum(weights[number] for number in pending)
+            shares = {number: remaining * weights[number] / total_weight for number in pending}
+            satisfied = [number for number in pending if pending[number] <= shares[number]]
+            if not satisfied:
+                for number in pending:
+                    granted[number] = int(shares[number])
+                break
+            for number in satisfied:
+                granted[number] = pending.pop(number)
+                remaining -= granted[number]
+        return granted
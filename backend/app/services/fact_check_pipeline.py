@@ -1,33 +1,173 @@
 # app/services/fact_check_pipeline.py
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any, Tuple
+import re
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Tuple
 
+from app.services.cache import CacheBackend, create_cache, make_cache_key
+from app.services.context_packer import ContextPacker
+from app.services.keyword_extractor import STOPWORDS, LocalKeywordExtractor
 from app.services.llm_service import LLMService
+from app.services.rate_limiter import PRIORITY_ANALYSIS, PRIORITY_FINDINGS, estimate_tokens
 from app.services.search_service import SearchService
-from app.core.exceptions import APIKeyNotFoundError, LLMRequestError, SearchRequestError
+from app.services.semantic_cache import SemanticClaimCache, VectorIndex, create_embedder
+from app.services.single_flight import SingleFlight
+from app.services.stage_graph import Stage, StageGraph
+from app.core.exceptions import APIKeyNotFoundError, LLMRateLimitError, LLMRequestError, SearchRequestError
 from app.core.config import settings
+from app.core.metrics import ANALYSIS_PAPERS_TRIMMED, LLM_PROMPT_TOKENS, observe_latency
 
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Callback receiving (event name, payload) as pipeline stages complete
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Explanation used when the final analysis could not be produced
+ANALYSIS_FALLBACK_EXPLANATION = "Unable to properly analyze the evidence due to technical issues."
+
+# Placeholder findings for papers that could not be analysed; never cached
+FINDINGS_SHORT_ABSTRACT = "Abstract too short to extract meaningful findings."
+FINDINGS_PARSE_FAILED = "Unable to extract findings from paper abstract."
+FINDINGS_ERROR = "Error processing paper."
+
+
+def normalize_claim(claim: str) -> str:
+    """
+    Normalize claim text so trivially different spellings share cache entries.
+    
+    Args:
+        claim: The claim as submitted
+        
+    Returns:
+        Lower-cased claim with collapsed whitespace and no trailing punctuation
+    """
+    return re.sub(r"\s+", " ", claim).strip().rstrip(".!?;:").strip().lower()
+
 
 class FactCheckPipeline:
     """Pipeline for fact-checking claims using academic research."""
     
-    def __init__(self):
-        """Initialize the fact-check pipeline."""
+    def __init__(
+        self,
+        llm_service: Optional[LLMService] = None,
+        search_service: Optional[SearchService] = None,
+        result_cache: Optional[CacheBackend] = None,
+        semantic_cache: Optional[SemanticClaimCache] = None,
+    ):
+        """
+        Initialize the fact-check pipeline.
+        
+        The pipeline is meant to be long-lived: the services keep pooled
+        keep-alive connections that are released by `aclose`.
+        
+        Args:
+            llm_service: Optional LLM service to use instead of a new one
+            search_service: Optional search service to use instead of a new one
+            result_cache: Optional claim-level result cache; by default one is
+                created from the RESULT_CACHE_* settings
+            semantic_cache: Optional index of previously checked claims used to
+                serve paraphrases; by default one is created from the
+                SEMANTIC_CACHE_* settings
+        """
         try:
-            self.llm_service = LLMService()
-            self.search_service = SearchService()
+            self.llm_service = llm_service or LLMService()
+            self.search_service = search_service or SearchService()
         except Exception as e:
             logger.error(f"Error initializing fact-check pipeline: {str(e)}")
             raise APIKeyNotFoundError(f"Failed to initialize services: {str(e)}")
+        
+        if result_cache is None and settings.RESULT_CACHE_ENABLED:
+            result_cache = create_cache(
+                settings.RESULT_CACHE_BACKEND,
+                settings.RESULT_CACHE_MAX_ENTRIES,
+                settings.RESULT_CACHE_TTL,
+                path=settings.RESULT_CACHE_PATH,
+                table="fact_check_results",
+            )
+        self.result_cache = result_cache
+        
+        # Per-stage memoization so different claims can share keywords, searches and findings
+        self.keyword_cache = self._create_stage_cache(
+            settings.KEYWORD_CACHE_MAX_ENTRIES, settings.KEYWORD_CACHE_TTL, "keyword_cache"
+        )
+        self.search_cache = self._create_stage_cache(
+            settings.SEARCH_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_TTL, "search_cache"
+        )
+        self.findings_cache = self._create_stage_cache(
+            settings.FINDINGS_CACHE_MAX_ENTRIES, settings.FINDINGS_CACHE_TTL, "findings_cache"
+        )
+        
+        if semantic_cache is None and settings.SEMANTIC_CACHE_ENABLED:
+            embedder = create_embedder(
+                settings.SEMANTIC_CACHE_EMBEDDER, settings.SEMANTIC_CACHE_DIM, settings.SEMANTIC_CACHE_MODEL
+            )
+            semantic_cache = SemanticClaimCache(
+                embedder,
+                VectorIndex(
+                    embedder.dim, embedder.name, settings.SEMANTIC_CACHE_PATH, settings.SEMANTIC_CACHE_MAX_ENTRIES
+                ),
+                settings.SEMANTIC_CACHE_RESULT_THRESHOLD,
+                settings.SEMANTIC_CACHE_EVIDENCE_THRESHOLD,
+            )
+        self.semantic_cache = semantic_cache
+        
+        self.keyword_extractor = LocalKeywordExtractor()
+        
+        self.context_packer = ContextPacker(
+            settings.ANALYSIS_CONTEXT_TOKEN_BUDGET,
+            settings.ANALYSIS_MIN_ABSTRACT_TOKENS,
+            ignored_findings=(FINDINGS_SHORT_ABSTRACT, FINDINGS_PARSE_FAILED, FINDINGS_ERROR),
+        )
+        
+        # Identical claims in flight at the same time share one pipeline run
+        self.claim_flights = SingleFlight(settings.PIPELINE_DEADLINE) if settings.CLAIM_SINGLE_FLIGHT_ENABLED else None
+    
+    def _create_stage_cache(self, max_entries: int, ttl: int, table: str) -> Optional[CacheBackend]:
+        """Create a per-stage cache from settings, or None when stage caching is disabled."""
+        if not settings.STAGE_CACHE_ENABLED:
+            return None
+        return create_cache(
+            settings.STAGE_CACHE_BACKEND, max_entries, ttl, path=settings.RESULT_CACHE_PATH, table=table
+        )
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Hit and miss counters for every enabled cache layer.
+        
+        Returns:
+            Mapping of cache layer name to its counters
+        """
+        layers = {
+            "result": self.result_cache,
+            "keywords": self.keyword_cache,
+            "search": self.search_cache,
+            "findings": self.findings_cache,
+            "abstracts": self.search_service.abstract_cache,
+            "paper_store": self.search_service.paper_store,
+            "semantic": self.semantic_cache,
+        }
+        return {name: cache.stats() for name, cache in layers.items() if cache is not None}
+    
+    async def aclose(self) -> None:
+        """Release the HTTP connection pools and caches held by the pipeline."""
+        await self.llm_service.aclose()
+        await self.search_service.aclose()
+        for cache in (self.result_cache, self.keyword_cache, self.search_cache, self.findings_cache, self.semantic_cache):
+            if cache is not None:
+                cache.close()
     
-    def extract_keywords(self, claim: str) -> List[str]:
+    @observe_latency("extract_keywords")
+    async def extract_keywords(self, claim: str) -> List[str]:
         """
-        Extract key research terms from the claim using LLM.
+        Extract key research terms from the claim.
+        
+        With KEYWORD_STRATEGY "llm" Gemini is always asked; with "local" the
+        deterministic extractor is always used; with "hybrid" Gemini is only
+        asked when the local extractor's confidence is below
+        KEYWORD_LOCAL_MIN_CONFIDENCE.
         
         Args:
             claim: The claim to extract keywords from
@@ -38,6 +178,16 @@ class FactCheckPipeline:
         Raises:
             LLMRequestError: If there's an issue with the LLM API request
         """
+        if settings.KEYWORD_STRATEGY != "llm":
+            keywords, confidence = self.keyword_extractor.extract(claim)
+            if keywords and (
+                settings.KEYWORD_STRATEGY == "local" or confidence >= settings.KEYWORD_LOCAL_MIN_CONFIDENCE
+            ):
+                logger.info(f"Using local keywords (confidence {confidence})")
+                return keywords
+            if settings.KEYWORD_STRATEGY == "local":
+                return self._fallback_keyword_extraction(claim)
+        
         prompt = f"""
         I need to research the following claim: "{claim}"
         
@@ -48,10 +198,18 @@ class FactCheckPipeline:
         Return only the keywords separated by commas, with no additional text.
         """
         
+        cache_key = make_cache_key("keywords", normalize_claim(claim), settings.GEMINI_MODEL)
+        if self.keyword_cache is not None:
+            cached = await self.keyword_cache.aget(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            content = self.llm_service.call_gemini_api(prompt)
-            keywords = content.split(',')
-            return [k.strip() for k in keywords]
+            content = await self.llm_service.call_gemini_api_async(prompt)
+            keywords = [k.strip() for k in content.split(',')]
+            if self.keyword_cache is not None:
+                await self.keyword_cache.aset(cache_key, keywords)
+            return keywords
         except LLMRequestError as e:
             logger.error(f"Error extracting keywords with LLM: {str(e)}")
             # Fallback to simple keywords if API fails
@@ -70,8 +228,7 @@ class FactCheckPipeline:
         """
         words = claim.lower().split()
         # Remove common words
-        stopwords = ['a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what', 'when', 'where', 'how', 'why', 'which', 'who', 'whom', 'this', 'that', 'these', 'those', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'for', 'of', 'on', 'to', 'with', 'by', 'about', 'against', 'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't', 'can', 'will', 'just', 'don', 'should', 'now', 'causes']
-        keywords = [word for word in words if word not in stopwords]
+        keywords = [word for word in words if word not in STOPWORDS]
         if 'causes' in words:
             # Make sure we include what's being caused
             causes_index = words.index('causes')
@@ -88,13 +245,19 @@ class FactCheckPipeline:
         # Ensure we have at least the main content words
         return keywords[:5]  # Limit to 5 keywords
     
-    def extract_paper_findings(self, papers: List[Dict[str, Any]], claim: str) -> List[Dict[str, Any]]:
+    async def extract_paper_findings(
+        self, papers: List[Dict[str, Any]], claim: str, on_event: Optional[EventCallback] = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract key findings from each paper relevant to the claim.
         
+        Uses one Gemini call per paper, or a single batched call for all papers
+        when FINDINGS_STRATEGY is "batched".
+        
         Args:
             papers: List of paper dictionaries
             claim: The claim being fact-checked
+            on_event: Optional callback notified with a "findings" event as each paper completes
             
         Returns:
             Enhanced papers with findings and relevance assessment
@@ -102,175 +265,346 @@ class FactCheckPipeline:
         if not papers:
             return []
         
-        enhanced_papers = []
+        # Reuse findings for papers already assessed against the same claim
+        uncached = list(enumerate(papers))
+        if self.findings_cache is not None:
+            uncached = []
+            for i, paper in enumerate(papers):
+                cached = await self.findings_cache.aget(self._findings_cache_key(claim, paper))
+                if cached is not None:
+                    paper.update(cached)
+                    await self._emit(on_event, "findings", {"index": i, "paper": paper})
+                else:
+                    uncached.append((i, paper))
         
-        for i, paper in enumerate(papers):
-            try:
-                title = paper.get('title', f'Paper {i+1}')
-                snippet = paper.get('snippet', 'No abstract available')
-                
-                # Skip if snippet is too short
-                if len(snippet) < 50:
-                    paper['relevance'] = 'Low'
-                    paper['key_findings'] = 'Abstract too short to extract meaningful findings.'
-                    enhanced_papers.append(paper)
-                    continue
-                
-                prompt = f"""
-                CLAIM: "{claim}"
-                
-                PAPER TITLE: {title}
-                
-                PAPER ABSTRACT:
-                {snippet}
-                
-                Based solely on the abstract above, answer these questions:
-                
-                1. How relevant is this paper to evaluating the claim (High/Medium/Low)?
-                2. What are the key findings or conclusions from this paper that relate to the claim?
-                3. Does this paper support, refute, or provide neutral evidence regarding the claim?
-                
-                Format your response ONLY as a strict JSON object with this structure:
+        if uncached:
+            if settings.FINDINGS_STRATEGY == "batched":
+                await self._extract_findings_batched(uncached, claim, on_event)
+            else:
+                await self._extract_findings_per_paper(uncached, claim, on_event)
+            
+            if self.findings_cache is not None:
+                for _, paper in uncached:
+                    if paper.get('key_findings') not in (FINDINGS_SHORT_ABSTRACT, FINDINGS_PARSE_FAILED, FINDINGS_ERROR):
+                        findings = {
+                            'relevance': paper.get('relevance'),
+                            'key_findings': paper.get('key_findings'),
+                            'position': paper.get('position'),
+                        }
+                        await self.findings_cache.aset(self._findings_cache_key(claim, paper), findings)
+        
+        return papers
+    
+    def _findings_cache_key(self, claim: str, paper: Dict[str, Any]) -> str:
+        """Cache key for a paper's findings with respect to a claim."""
+        return make_cache_key(
+            "findings", normalize_claim(claim), paper.get('url', ''), paper.get('title', ''), settings.GEMINI_MODEL
+        )
+    
+    @observe_latency("search_papers")
+    async def search_papers(self, keywords: List[str], limit: int) -> List[Dict[str, Any]]:
+        """
+        Search for papers, reusing earlier results for the same keyword set.
+        
+        Snippets are returned as found; abstracts are fetched by `enrich_papers`.
+        
+        Args:
+            keywords: List of keywords to search for
+            limit: Maximum number of papers to return
+            
+        Returns:
+            List of papers as dictionaries
+            
+        Raises:
+            SearchRequestError: If there's an issue with the search API request
+        """
+        cache_key = make_cache_key("search", [k.strip().lower() for k in keywords], limit)
+        if self.search_cache is not None:
+            cached = await self.search_cache.aget(cache_key)
+            if cached is not None:
+                return cached
+        
+        papers = await self.search_service.search_papers_async(keywords, limit, enrich=False)
+        if self.search_cache is not None:
+            await self.search_cache.aset(cache_key, papers)
+        return papers
+    
+    async def enrich_papers(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fetch abstracts for papers with short snippets and add them to the local paper store.
+        
+        Args:
+            papers: Papers returned by `search_papers`, updated in place
+            
+        Returns:
+            The same papers
+        """
+        papers = await self.search_service.enrich_papers(papers)
+        await self.search_service.remember_papers(papers)
+        return papers
+    
+    @staticmethod
+    def _keywords_differ(first: List[str], second: List[str]) -> bool:
+        """Whether two keyword lists share too few terms to expect the same search results."""
+        first_terms = {word for keyword in first for word in keyword.lower().split() if word not in STOPWORDS}
+        second_terms = {word for keyword in second for word in keyword.lower().split() if word not in STOPWORDS}
+        if not first_terms or not second_terms:
+            return first_terms != second_terms
+        overlap = len(first_terms & second_terms) / len(first_terms | second_terms)
+        return overlap < settings.SPECULATIVE_SEARCH_MIN_OVERLAP
+    
+    async def _extract_findings_per_paper(
+        self,
+        indexed_papers: List[Tuple[int, Dict[str, Any]]],
+        claim: str,
+        on_event: Optional[EventCallback] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract findings with one concurrent Gemini call per paper.
+        
+        Args:
+            indexed_papers: (index, paper) pairs, index being the paper's position in the results
+            claim: The claim being fact-checked
+            on_event: Optional callback notified as each paper completes
+            
+        Returns:
+            Enhanced papers, in the same order as `indexed_papers`
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.FINDINGS_CONCURRENCY))
+        
+        async def extract_bounded(index: int, paper: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                enhanced = await self._extract_single_paper_findings(index, paper, claim)
+            await self._emit(on_event, "findings", {"index": index, "paper": enhanced})
+            return enhanced
+        
+        # gather returns results in input order, whatever order the calls finish in
+        enhanced_papers = await asyncio.gather(
+            *(extract_bounded(i, paper) for i, paper in indexed_papers)
+        )
+        return list(enhanced_papers)
+    
+    async def _extract_findings_batched(
+        self,
+        indexed_papers: List[Tuple[int, Dict[str, Any]]],
+        claim: str,
+        on_event: Optional[EventCallback] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract findings for all papers with a single Gemini call.
+        
+        Papers missing from the batched response, or all papers if the batched
+        call fails, fall back to per-paper extraction.
+        
+        Args:
+            indexed_papers: (index, paper) pairs, index being the paper's position in the results
+            claim: The claim being fact-checked
+            on_event: Optional callback notified as each paper completes
+            
+        Returns:
+            Enhanced papers with findings and relevance assessment
+        """
+        # Papers with short abstracts are handled locally, exactly as in per-paper mode
+        batch = [(i, paper) for i, paper in indexed_papers if len(paper.get('snippet', 'No abstract available')) >= 50]
+        batch_indices = {i for i, _ in batch}
+        pending = [(i, paper) for i, paper in indexed_papers if i not in batch_indices]
+        
+        if batch:
+            paper_sections = []
+            for i, paper in batch:
+                paper_sections.append(
+                    f"PAPER {i+1}:\n"
+                    f"Title: {paper.get('title', f'Paper {i+1}')}\n"
+                    f"Abstract: {paper.get('snippet', 'No abstract available')}"
+                )
+            all_papers = '\n\n'.join(paper_sections)
+            
+            prompt = f"""
+            CLAIM: "{claim}"
+            
+            PAPERS:
+            {all_papers}
+            
+            Based solely on each paper's abstract above, answer these questions for every paper:
+            
+            1. How relevant is this paper to evaluating the claim (High/Medium/Low)?
+            2. What are the key findings or conclusions from this paper that relate to the claim?
+            3. Does this paper support, refute, or provide neutral evidence regarding the claim?
+            
+            Format your response ONLY as a strict JSON array with one object per paper:
+            [
                 {{
+                    "paper_number": <the number after PAPER>,
                     "relevance": "High|Medium|Low",
                     "key_findings": "2-3 sentence summary of findings relevant to the claim",
                     "position": "Supports|Refutes|Neutral"
                 }}
-                
-                Return ONLY valid JSON without any additional text, comments, or explanations.
-                """
-                
-                content = self.llm_service.call_gemini_api(prompt)
-                
-                # Try to parse the JSON response
-                try:
-                    findings = self.llm_service.parse_json_response(content)
-                    # Add findings to the paper dict
-                    paper.update(findings)
-                except json.JSONDecodeError:
-                    # Set defaults if parsing fails
-                    paper['relevance'] = 'Low'
-                    paper['key_findings'] = 'Unable to extract findings from paper abstract.'
-                    paper['position'] = 'Neutral'
-            
-            except Exception as e:
-                logger.error(f"Error processing paper {i+1}: {str(e)}")
-                paper['relevance'] = 'Unknown'
-                paper['key_findings'] = 'Error processing paper.'
-                paper['position'] = 'Neutral'
+            ]
+            
+            Return ONLY valid JSON without any additional text, comments, or explanations.
+            """
+            
+            findings_by_number: Dict[int, Dict[str, Any]] = {}
+            try:
+                content = await self.llm_service.call_gemini_api_async(prompt, priority=PRIORITY_FINDINGS)
+                for item in self.llm_service.parse_json_array_response(content):
+                    try:
+                        findings_by_number[int(item["paper_number"])] = item
+                    except (KeyError, TypeError, ValueError):
+                        continue
+            except LLMRequestError as e:
+                logger.error(f"Error extracting batched paper findings: {str(e)}")
             
-            enhanced_papers.append(paper)
+            for i, paper in batch:
+                findings = findings_by_number.get(i + 1)
+                if findings and findings.get("key_findings"):
+                    paper['relevance'] = findings.get("relevance", "Unknown")
+                    paper['key_findings'] = findings["key_findings"]
+                    paper['position'] = findings.get("position", "Neutral")
+                    await self._emit(on_event, "findings", {"index": i, "paper": paper})
+                else:
+                    pending.append((i, paper))
+        
+        if pending:
+            if batch:
+                logger.info(f"Falling back to per-paper findings for {len(pending)} paper(s)")
+            await self._extract_findings_per_paper(pending, claim, on_event)
         
-        return enhanced_papers
+        return [paper for _, paper in indexed_papers]
     
-    def analyze_with_llm(self, claim: str, papers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @observe_latency("extract_paper_findings")
+    async def _extract_single_paper_findings(self, index: int, paper: Dict[str, Any], claim: str) -> Dict[str, Any]:
         """
-        Analyze the claim against the papers using LLM.
+        Extract key findings from a single paper relevant to the claim.
         
         Args:
+            index: Zero-based position of the paper in the search results
+            paper: Paper dictionary, updated in place
             claim: The claim being fact-checked
-            papers: List of paper dictionaries with findings
             
         Returns:
-            Analysis result as a dictionary
+            The paper with findings and relevance assessment
         """
-        # Format papers for analysis
-        paper_contexts = []
-        for i, paper in enumerate(papers, 1):
+        try:
+            title = paper.get('title', f'Paper {index+1}')
             snippet = paper.get('snippet', 'No abstract available')
-            title = paper.get('title', f'Paper {i}')
             
-            # Handle authors - ensure it's a string
-            authors = paper.get('authors', [])
-            string_authors = []
-            for author in authors:
-                if isinstance(author, dict):
-                    # If author is a dictionary, extract a readable value
-                    if 'name' in author:
-                        string_authors.append(author['name'])
-                    else:
-                        # Use first value or stringified dict
-                        val = next(iter(author.values())) if author else "Unknown"
-                        string_authors.append(str(val))
-                else:
-                    # If already a string or other type, just convert to string
-                    string_authors.append(str(author))
+            # Skip if snippet is too short
+            if len(snippet) < 50:
+                paper['relevance'] = 'Low'
+                paper['key_findings'] = FINDINGS_SHORT_ABSTRACT
+                return paper
             
-            # Now join the string authors
-            authors_text = ', '.join(string_authors) if string_authors else 'Unknown'
-                
-            year = paper.get('year', 'Unknown year')
+            prompt = f"""
+            CLAIM: "{claim}"
             
-            # Include key findings and position if available
-            key_findings = paper.get('key_findings', '')
-            position = paper.get('position', 'Not assessed')
-            relevance = paper.get('relevance', 'Not assessed')
+            PAPER TITLE: {title}
+            
+            PAPER ABSTRACT:
+            {snippet}
+            
+            Based solely on the abstract above, answer these questions:
             
-            paper_context = f"""
-            PAPER {i}:
-            Title: {title}
-            Authors: {authors_text}
-            Year: {year}
-            Relevance: {relevance}
-            Position: {position}
-            Abstract/Snippet: {snippet}
-            Key Findings: {key_findings}
+            1. How relevant is this paper to evaluating the claim (High/Medium/Low)?
+            2. What are the key findings or conclusions from this paper that relate to the claim?
+            3. Does this paper support, refute, or provide neutral evidence regarding the claim?
+            
+            Format your response ONLY as a strict JSON object with this structure:
+            {{
+                "relevance": "High|Medium|Low",
+                "key_findings": "2-3 sentence summary of findings relevant to the claim",
+                "position": "Supports|Refutes|Neutral"
+            }}
+            
+            Return ONLY valid JSON without any additional text, comments, or explanations.
             """
-            paper_contexts.append(paper_context)
-        
-        all_context = '\n\n'.join(paper_contexts)
-        
-        prompt = f"""
-        CLAIM TO FACT-CHECK: "{claim}"
-        
-        RESEARCH EVIDENCE:
-        {all_context}
-        
-        Based ONLY on the research evidence provided above, provide a comprehensive fact-check analysis:
+            
+            content = await self.llm_service.call_gemini_api_async(prompt, priority=PRIORITY_FINDINGS)
+            
+            # Try to parse the JSON response
+            try:
+                findings = self.llm_service.parse_json_response(content)
+                # Add findings to the paper dict
+                paper.update(findings)
+            except json.JSONDecodeError:
+                # Set defaults if parsing fails
+                paper['relevance'] = 'Low'
+                paper['key_findings'] = FINDINGS_PARSE_FAILED
+                paper['position'] = 'Neutral'
         
-        1. Assess whether the claim is "Supported", "Refuted", or "Lacks Sufficient Evidence".
-        2. Provide a detailed explanation (5-7 sentences) summarizing the evidence and reasoning behind your assessment.
-        3. For each paper, briefly describe how it relates to the claim and what specific evidence it provides.
+        except Exception as e:
+            logger.error(f"Error processing paper {index+1}: {str(e)}")
+            paper['relevance'] = 'Unknown'
+            paper['key_findings'] = FINDINGS_ERROR
+            paper['position'] = 'Neutral'
         
-        Format your response as a strict JSON object with the following structure:
-        {{
-            "assessment": "Supported|Refuted|Lacks Sufficient Evidence",
-            "explanation": "Your detailed explanation here.",
-            "paper_analyses": [
-                {{
-                    "paper_number": 1, 
-                    "relation_to_claim": "Brief description of how this paper relates to the claim"
-                }},
-                ...
-            ]
-        }}
+        return paper
+    
+    @observe_latency("analyze_with_llm")
+    async def analyze_with_llm(self, claim: str, papers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Analyze the claim against the papers using LLM.
         
-        IMPORTANT: Return ONLY valid JSON without any additional text, comments, or formatting. 
-        Ensure that all quotes are properly escaped and there are no trailing commas.
+        Args:
+            claim: The claim being fact-checked
+            papers: List of paper dictionaries with findings
+            
+        Returns:
+            Analysis result as a dictionary
         """
+        # Fit the evidence into the prompt budget, most relevant papers first
+        all_context, packing = self.context_packer.pack(papers)
+        
+        prompt = f"""CLAIM TO FACT-CHECK: "{claim}"
+
+RESEARCH EVIDENCE:
+{all_context}
+
+Based ONLY on the research evidence above, fact-check the claim:
+1. Assess whether the claim is "Supported", "Refuted", or "Lacks Sufficient Evidence".
+2. Explain the evidence and reasoning behind your assessment in 5-7 sentences.
+3. For each paper, briefly describe how it relates to the claim and what specific evidence it provides.
+
+Respond with a strict JSON object:
+{{"assessment": "Supported|Refuted|Lacks Sufficient Evidence", "explanation": "...", "paper_analyses": [{{"paper_number": 1, "relation_to_claim": "..."}}, ...]}}
+
+Return ONLY valid JSON with properly escaped quotes and no trailing commas, comments or other text."""
+        
+        prompt_tokens = estimate_tokens(prompt)
+        LLM_PROMPT_TOKENS.labels("analysis").observe(prompt_tokens)
+        ANALYSIS_PAPERS_TRIMMED.labels("dropped").inc(len(packing["dropped"]))
+        ANALYSIS_PAPERS_TRIMMED.labels("truncated").inc(len(packing["truncated"]))
+        logger.info(
+            f"Analysis prompt: ~{prompt_tokens} tokens, evidence ~{packing['tokens']}/{packing['budget'] or 'unlimited'} "
+            f"from {packing['included']}/{packing['papers']} papers "
+            f"(dropped {packing['dropped'] or 'none'}, abstracts cut {packing['truncated'] or 'none'})"
+        )
         
         try:
-            content = self.llm_service.call_gemini_api(prompt)
+            content = await self.llm_service.call_gemini_api_async(prompt, priority=PRIORITY_ANALYSIS)
             logger.debug(f"Raw LLM response: {content}")
             
             # Try to parse the JSON response
             try:
-                return self.llm_service.parse_json_response(content)
+                return self.llm_service.parse_json_response(content, kind="analysis")
             except json.JSONDecodeError as e:
                 logger.error(f"JSON decode error: {str(e)}")
                 # Return a fallback assessment with manual extraction
                 return {
                     "assessment": "Lacks Sufficient Evidence",
-                    "explanation": "Unable to properly analyze the evidence due to technical issues.",
+                    "explanation": ANALYSIS_FALLBACK_EXPLANATION,
                     "paper_analyses": []
                 }
                 
+        except LLMRateLimitError:
+            # Throttling says nothing about the evidence; let the caller retry later
+            raise
         except LLMRequestError as e:
             logger.error(f"Error with LLM API for analysis: {str(e)}")
             # Return a fallback assessment
             return {
                 "assessment": "Lacks Sufficient Evidence",
-                "explanation": "Unable to properly analyze the evidence due to technical issues.",
+                "explanation": ANALYSIS_FALLBACK_EXPLANATION,
                 "paper_analyses": []
             }
     
@@ -288,6 +622,7 @@ class FactCheckPipeline:
         claim = result.get
 
 
+    @observe_latency("generate_human_friendly_response")
     def generate_human_friendly_response(self, result: Dict[str, Any], papers: List[Dict[str, Any]]) -> str:
         """
         Create a formatted, user-friendly response from the fact-checking results.
@@ -365,59 +700,324 @@ This fact check was conducted using scientific research papers and academic sour
         
         return response
     
-    async def fact_check(self, claim: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    def _result_cache_key(self, claim: str) -> str:
+        """Cache key for a claim under the current model and search settings."""
+        return make_cache_key(
+            "fact_check", normalize_claim(claim), settings.GEMINI_MODEL, settings.PAPER_SEARCH_LIMIT
+        )
+    
+    async def fact_check_cached(
+        self, claim: str, on_event: Optional[EventCallback] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        """
+        Run the fact-checking pipeline, serving repeated claims from the result cache.
+        
+        Claims that miss the exact-match cache are looked up in the semantic
+        cache: a close paraphrase of a checked claim reuses its result, and a
+        looser match reuses its keywords (and so its cached search results)
+        while the findings and analysis are redone for the new wording.
+        
+        Concurrent requests for the same normalized claim share a single
+        pipeline run instead of each calling Gemini and SERP API. Callers that
+        want progress events get their own run, since events are per caller.
+        
+        Args:
+            claim: The claim to fact-check
+            on_event: Optional callback notified as each pipeline stage completes
+            
+        Returns:
+            Tuple of (fact check result, enhanced papers, whether it was a cache hit)
+        """
+        key = self._result_cache_key(claim)
+        
+        if self.result_cache is not None:
+            cached = await self.result_cache.aget(key)
+            if cached is not None:
+                logger.info(f"Result cache hit for claim: '{claim}'")
+                return await self._serve_cached(claim, cached, on_event)
+        
+        keywords = None
+        if self.semantic_cache is not None:
+            cached, match = await self.semantic_cache.match(normalize_claim(claim), self._load_result)
+            if cached is not None:
+                return await self._serve_cached(claim, cached, on_event)
+            if match is not None:
+                keywords = match["keywords"]
+        
+        if self.claim_flights is None or on_event is not None:
+            result, enhanced_papers = await self._fact_check_and_store(claim, key, on_event, keywords)
+            return result, enhanced_papers, False
+        
+        result, enhanced_papers = await self.claim_flights.do(
+            key, lambda: self._fact_check_and_store(claim, key, keywords=keywords)
+        )
+        # Coalesced callers share the leader's result; keep each caller's own claim text
+        return dict(result, claim=claim), enhanced_papers, False
+    
+    async def _load_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result and papers stored under a result cache key, if still there."""
+        if self.result_cache is None:
+            return None
+        return await self.result_cache.aget(key)
+    
+    async def _serve_cached(
+        self, claim: str, cached: Dict[str, Any], on_event: Optional[EventCallback]
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        """Return a cached result under the caller's claim text, replaying its events."""
+        result = cached["result"]
+        result["claim"] = claim
+        enhanced_papers = cached["papers"]
+        if on_event is not None:
+            for i, paper in enumerate(enhanced_papers):
+                await on_event("paper", {"index": i, "paper": paper})
+                await on_event("findings", {"index": i, "paper": paper})
+            await on_event("analysis", self._analysis_event(result))
+        return result, enhanced_papers, True
+    
+    async def _fact_check_and_store(
+        self,
+        claim: str,
+        key: str,
+        on_event: Optional[EventCallback] = None,
+        keywords: Optional[List[str]] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run the pipeline and store the result in the result and semantic caches."""
+        used_keywords: List[str] = []
+        
+        async def record_keywords(event: str, data: Dict[str, Any]) -> None:
+            if event == "keywords":
+                used_keywords[:] = data["keywords"]
+            await self._emit(on_event, event, data)
+        
+        result, enhanced_papers = await self.fact_check(claim, record_keywords, keywords)
+        
+        # Don't pin a degraded answer caused by a transient LLM failure or a missed deadline
+        if result.get("explanation") != ANALYSIS_FALLBACK_EXPLANATION and not result.get("degraded_stages"):
+            if self.result_cache is not None:
+                await self.result_cache.aset(key, {"result": result, "papers": enhanced_papers})
+            if self.semantic_cache is not None:
+                await self.semantic_cache.aadd(normalize_claim(claim), {"key": key, "keywords": used_keywords})
+        
+        return result, enhanced_papers
+    
+    @staticmethod
+    async def _emit(on_event: Optional[EventCallback], event: str, data: Dict[str, Any]) -> None:
+        """Notify the progress callback, if any."""
+        if on_event is not None:
+            await on_event(event, data)
+    
+    @staticmethod
+    def _analysis_event(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload of the "analysis" progress event."""
+        return {
+            "assessment": result.get("assessment"),
+            "explanation": result.get("explanation"),
+            "paper_analyses": result.get("paper_analyses", []),
+        }
+    
+    async def fact_check(
+        self, claim: str, on_event: Optional[EventCallback] = None, keywords: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Run the complete fact-checking pipeline on a claim.
         
+        The pipeline runs as a stage graph under PIPELINE_DEADLINE, each stage
+        also bounded by its own timeout. Slow or failing stages degrade rather
+        than fail where possible: keywords fall back to local extraction,
+        enrichment keeps the search snippets, findings that have not finished
+        are left out of the analysis, and a failed analysis returns the
+        fallback assessment. Only a search that fails or times out ends the run.
+        
+        When `on_event` is given it is awaited as stages complete with the
+        events "keywords", "paper" (once per paper found), "findings" (once
+        per paper, as each finishes) and "analysis".
+        
         Args:
             claim: The claim to fact-check
+            on_event: Optional callback notified as each pipeline stage completes
+            keywords: Optional search keywords to use instead of extracting them,
+                e.g. those of a closely related claim
             
         Returns:
-            Tuple of (fact check result, enhanced papers)
+            Tuple of (fact check result, enhanced papers); the result's
+            "degraded_stages" lists the stages that fell back
             
         Raises:
-            Various exceptions depending on what part of the pipeline fails
+            SearchRequestError: If the search fails
+            PipelineTimeoutError: If the search does not finish in time
         """
         logger.info(f"Starting fact-check for claim: '{claim}'")
+        graph = self._build_stage_graph(claim, on_event, keywords)
+        results = await graph.run(settings.PIPELINE_DEADLINE)
+        
+        result, enhanced_papers = results["render"]
+        # Falling back from the speculative search is normal, not a degraded answer
+        result["degraded_stages"] = [name for name in graph.degraded if name != "speculative_search"]
+        return result, enhanced_papers
+    
+    def _build_stage_graph(
+        self, claim: str, on_event: Optional[EventCallback], keywords: Optional[List[str]]
+    ) -> StageGraph:
+        """
+        Build the stage graph for one claim.
+        
+        keywords -> search -> enrich -> findings -> analysis -> render, plus a
+        speculative search with locally extracted keywords that runs alongside
+        the keyword LLM call when SPECULATIVE_SEARCH_ENABLED is set.
+        """
+        limit = settings.PAPER_SEARCH_LIMIT
+        speculate = (
+            keywords is None and settings.SPECULATIVE_SEARCH_ENABLED and settings.KEYWORD_STRATEGY != "local"
+        )
         
         # Step 1: Extract keywords
-        keywords = self.extract_keywords(claim)
-        logger.info(f"Extracted keywords: {keywords}")
+        async def extract_keywords(_: Dict[str, Any]) -> List[str]:
+            if keywords is not None:
+                logger.info(f"Reusing keywords: {keywords}")
+                found = keywords
+            else:
+                found = await self.extract_keywords(claim)
+                logger.info(f"Extracted keywords: {found}")
+            await self._emit(on_event, "keywords", {"keywords": found})
+            return found
+        
+        async def fallback_keywords(_: Dict[str, Any], error: Exception) -> List[str]:
+            found = self._fallback_keyword_extraction(claim)
+            await self._emit(on_event, "keywords", {"keywords": found})
+            return found
+        
+        # Search with local keywords while the LLM extracts its own
+        async def speculative_search(_: Dict[str, Any]) -> Dict[str, Any]:
+            local_keywords, _ = self.keyword_extractor.extract(claim)
+            local_keywords = local_keywords or self._fallback_keyword_extraction(claim)
+            return {"keywords": local_keywords, "papers": await self.search_papers(local_keywords, limit)}
         
         # Step 2: Search for relevant papers
-        papers = self.search_service.search_papers(keywords, settings.PAPER_SEARCH_LIMIT)
-        logger.info(f"Found {len(papers)} relevant papers")
+        async def search(inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            found = inputs["keywords"]
+            speculative = inputs.get("speculative_search")
+            if speculative is not None and not self._keywords_differ(speculative["keywords"], found):
+                return speculative["papers"]
+            
+            papers = await self.search_papers(found, limit)
+            if speculative is not None:
+                logger.info(f"Keywords {found} differ from speculative keywords {speculative['keywords']}, fusing searches")
+                # Final keywords first, so their ranking wins ties in the fusion
+                papers = self.search_service.fuse_results([papers, speculative["papers"]], limit)
+            return papers
+        
+        def fallback_search(inputs: Dict[str, Any], error: Exception) -> List[Dict[str, Any]]:
+            speculative = inputs.get("speculative_search")
+            if speculative is None:
+                raise error
+            return speculative["papers"]
+        
+        # Fetch abstracts for short snippets
+        async def enrich(inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            papers = await self.enrich_papers(inputs["search"])
+            await announce_papers(papers)
+            return papers
+        
+        async def fallback_enrich(inputs: Dict[str, Any], error: Exception) -> List[Dict[str, Any]]:
+            await announce_papers(inputs["search"])
+            return inputs["search"]
+        
+        async def announce_papers(papers: List[Dict[str, Any]]) -> None:
+            logger.info(f"Found {len(papers)} relevant papers")
+            for i, paper in enumerate(papers):
+                await self._emit(on_event, "paper", {"index": i, "paper": paper})
         
         # Step 3: Extract findings from each paper
-        if papers:
-            enhanced_papers = self.extract_paper_findings(papers, claim)
+        async def extract_findings(inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            papers = inputs["enrich"]
+            if not papers:
+                return []
+            enhanced_papers = await self.extract_paper_findings(papers, claim, on_event)
             logger.info("Extracted findings from papers")
-        else:
-            enhanced_papers = []
+            return enhanced_papers
+        
+        def partial_findings(inputs: Dict[str, Any], error: Exception) -> List[Dict[str, Any]]:
+            # Findings are written into the paper dictionaries as each one completes
+            papers = inputs["enrich"]
+            finished = [paper for paper in papers if "key_findings" in paper]
+            logger.info(f"Analysing the {len(finished)} of {len(papers)} papers whose findings finished")
+            return finished or papers
         
         # Step 4: Analyze with LLM
-        if enhanced_papers:
-            analysis = self.analyze_with_llm(claim, enhanced_papers)
-        else:
-            analysis = {
+        async def analyze(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            if inputs["findings"]:
+                return await self.analyze_with_llm(claim, inputs["findings"])
+            return {
                 "assessment": "Lacks Sufficient Evidence",
                 "explanation": "No relevant research papers were found to evaluate this claim.",
                 "paper_analyses": []
             }
         
-        # Step 5: Prepare final response
-        references = []
-        for paper in enhanced_papers:
-            title = paper.get('title', 'Untitled')
-            url = paper.get('url', '#')
-            references.append({"title": title, "url": url})
-        
-        result = {
-            "claim": claim,
-            "assessment": analysis.get("assessment"),
-            "explanation": analysis.get("explanation"),
-            "paper_analyses": analysis.get("paper_analyses", []),
-            "references": references
-        }
+        def fallback_analysis(inputs: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+            if isinstance(error, LLMRateLimitError):
+                raise error
+            return {
+                "assessment": "Lacks Sufficient Evidence",
+                "explanation": ANALYSIS_FALLBACK_EXPLANATION,
+                "paper_analyses": []
+            }
         
-        return result, enhanced_papers
\ No newline at end of file
+        # Step 5: Prepare final response
+        async def render(inputs: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+            enhanced_papers = inputs["findings"]
+            analysis = inputs["analysis"]
+            
+            references = []
+            for paper in enhanced_papers:
+                title = paper.get('title', 'Untitled')
+                url = paper.get('url', '#')
+                references.append({"title": title, "url": url})
+            
+            result = {
+                "claim": claim,
+                "assessment": analysis.get("assessment"),
+                "explanation": analysis.get("explanation"),
+                "paper_analyses": analysis.get("paper_analyses", []),
+                "references": references
+            }
+            await self._emit(on_event, "analysis", self._analysis_event(result))
+            return result, enhanced_papers
+        
+        stages = [
+            Stage("keywords", extract_keywords, timeout=settings.STAGE_KEYWORDS_TIMEOUT, fallback=fallback_keywords),
+            Stage(
+                "search",
+                search,
+                depends_on=["keywords", "speculative_search"] if speculate else ["keywords"],
+                timeout=settings.STAGE_SEARCH_TIMEOUT,
+                fallback=fallback_search,
+            ),
+            Stage(
+                "enrich", enrich, depends_on=["search"], timeout=settings.STAGE_ENRICH_TIMEOUT, fallback=fallback_enrich
+            ),
+            Stage(
+                "findings",
+                extract_findings,
+                depends_on=["enrich"],
+                timeout=settings.STAGE_FINDINGS_TIMEOUT,
+                reserve=settings.PIPELINE_ANALYSIS_RESERVE,
+                fallback=partial_findings,
+            ),
+            Stage(
+                "analysis",
+                analyze,
+                depends_on=["findings"],
+                timeout=settings.STAGE_ANALYSIS_TIMEOUT,
+                fallback=fallback_analysis,
+            ),
+            Stage("render", render, depends_on=["findings", "analysis"]),
+        ]
+        if speculate:
+            # A failed speculative search just means the final keywords are searched alone
+            stages.append(Stage(
+                "speculative_search",
+                speculative_search,
+                timeout=settings.STAGE_SEARCH_TIMEOUT,
+                fallback=lambda inputs, error: None,
+            ))
+        return StageGraph(stages)
@@ -0,0 +1,214 @@
+# app/services/job_queue.py
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.exceptions import JobQueueFullError
+from app.services.fact_check_pipeline import FactCheckPipeline
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+QUEUE_FULL_MESSAGE = "Fact-check job queue is full, retry later"
+
+
+class JobStore:
+    """Interface for storing fact-check jobs and their results."""
+    
+    async def save(self, job: Dict[str, Any]) -> None:
+        """
+        Create or replace a job record.
+        
+        Args:
+            job: Job dictionary, identified by its "job_id"
+        """
+        raise NotImplementedError
+    
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            The job dictionary, or None if it is unknown or has expired
+        """
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store that forgets finished jobs after a TTL."""
+    
+    def __init__(self, result_ttl: float, max_jobs: int):
+        """
+        Initialize the in-memory job store.
+        
+        Args:
+            result_ttl: Seconds a finished job stays retrievable
+            max_jobs: Maximum number of job records kept; oldest finished jobs go first
+        """
+        self.result_ttl = result_ttl
+        self.max_jobs = max(1, max_jobs)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished_at: Dict[str, float] = {}
+    
+    async def save(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        self._jobs[job_id] = job
+        if job["status"] in (JOB_SUCCEEDED, JOB_FAILED):
+            self._finished_at[job_id] = time.monotonic()
+        self._evict()
+    
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._evict()
+        return self._jobs.get(job_id)
+    
+    def _evict(self) -> None:
+        """Drop expired finished jobs, then the oldest finished jobs while over capacity."""
+        now = time.monotonic()
+        for job_id, finished_at in list(self._finished_at.items()):
+            if now - finished_at > self.result_ttl:
+                self._forget(job_id)
+        
+        # Dicts keep insertion order, so this walks finished jobs oldest first
+        for job_id in list(self._finished_at):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            self._forget(job_id)
+    
+    def _forget(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._finished_at.pop(job_id, None)
+
+
+class JobQueue:
+    """Bounded queue of fact-check jobs processed by a pool of background workers."""
+    
+    def __init__(self, pipeline: FactCheckPipeline, store: JobStore, workers: int, max_size: int):
+        """
+        Initialize the job queue.
+        
+        Args:
+            pipeline: Pipeline used to run the jobs
+            store: Where job state and results are kept
+            workers: Number of concurrent worker tasks
+            max_size: Maximum number of jobs waiting to run before submissions are rejected
+        """
+        self.pipeline = pipeline
+        self.store = store
+        self.worker_count = max(1, workers)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_size))
+        self._workers: List[asyncio.Task] = []
+    
+    def start(self) -> None:
+        """Start the worker tasks."""
+        for i in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._work(), name=f"fact-check-worker-{i}"))
+        logger.info(f"Started {self.worker_count} fact-check job workers")
+    
+    async def stop(self) -> None:
+        """Cancel the worker tasks, fail the jobs they leave unfinished and close the store."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        
+        # Jobs that never reached a worker would otherwise stay "queued" forever
+        while not self._queue.empty():
+            job = await self.store.get(self._queue.get_nowait())
+            if job is not None:
+                await self._fail(job, "Fact-check service shut down before the job ran")
+        await self.store.close()
+    
+    async def submit(self, claim: str) -> Dict[str, Any]:
+        """
+        Queue a claim for fact-checking.
+        
+        Args:
+            claim: The claim to fact-check
+            
+        Returns:
+            The new job record
+            
+        Raises:
+            JobQueueFullError: If the queue is at capacity
+        """
+        if self._queue.full():
+            raise JobQueueFullError(QUEUE_FULL_MESSAGE)
+        
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "claim": claim,
+            "status": JOB_QUEUED,
+            "created_at": datetime.now(timezone.utc),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "papers": None,
+            "error": None,
+        }
+        await self.store.save(job)
+        try:
+            self._queue.put_nowait(job["job_id"])
+        except asyncio.QueueFull:
+            # Other submissions filled the queue while the job was being saved
+            await self._fail(job, QUEUE_FULL_MESSAGE)
+            raise JobQueueFullError(QUEUE_FULL_MESSAGE)
+        return job
+    
+    def pending(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+    
+    async def _work(self) -> None:
+        """Worker loop: run queued jobs one at a time until cancelled."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected error in fact-check job worker: {str(e)}")
+            finally:
+                self._queue.task_done()
+    
+    async def _run_job(self, job_id: str) -> None:
+        """Run a single job and record its outcome."""
+        job = await self.store.get(job_id)
+        if job is None:
+            return
+        
+        job = dict(job, status=JOB_RUNNING, started_at=datetime.now(timezone.utc))
+        await self.store.save(job)
+        
+        try:
+            result, enhanced_papers, _ = await self.pipeline.fact_check_cached(job["claim"])
+            job.update(status=JOB_SUCCEEDED, result=result, papers=enhanced_papers)
+        except asyncio.CancelledError:
+            await self._fail(job, "Fact-check service shut down while the job was running")
+            raise
+        except Exception as e:
+            logger.error(f"Fact-check job {job_id} failed: {str(e)}")
+            job.update(status=JOB_FAILED, error=str(e))
+        
+        job["finished_at"] = datetime.now(timezone.utc)
+        await self.store.save(job)
+    
+    async def _fail(self, job: Dict[str, Any], error: str) -> None:
+        """Record a job as failed without having produced a result."""
+        await self.store.save(dict(job, status=JOB_FAILED, error=error, finished_at=datetime.now(timezone.utc)))
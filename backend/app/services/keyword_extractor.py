@@ -0,0 +1,177 @@
+# app/services/keyword_extractor.py
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Words never used as search keywords on their own
+STOPWORDS = frozenset([
+    "a", "an", "the", "and", "or", "but", "if", "because", "as", "what", "when", "where", "how",
+    "why", "which", "who", "whom", "this", "that", "these", "those", "is", "are", "was", "were",
+    "be", "been", "being", "have", "has", "had", "do", "does", "did", "for", "of", "on", "to",
+    "with", "by", "about", "against", "between", "into", "through", "during", "before", "after",
+    "above", "below", "from", "up", "down", "in", "out", "off", "over", "under", "again", "further",
+    "then", "once", "here", "there", "all", "any", "both", "each", "few", "more", "most", "other",
+    "some", "such", "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very", "s",
+    "t", "can", "will", "just", "don", "should", "now", "causes",
+    # Pronouns and possessives
+    "i", "me", "my", "mine", "we", "us", "our", "ours", "you", "your", "yours", "he", "him", "his",
+    "she", "her", "hers", "it", "its", "it's", "they", "them", "their", "theirs", "one", "ones",
+    "myself", "ourselves", "yourself", "himself", "herself", "itself", "themselves", "someone", "everyone",
+    # Modals, light verbs and question filler
+    "could", "would", "may", "might", "must", "shall", "cannot", "can't", "don't", "doesn't", "isn't",
+    "aren't", "didn't", "won't", "whether", "true", "false", "fact", "really", "use", "uses", "used",
+    "using", "make", "makes", "made", "get", "gets", "got", "let", "lot", "lots", "thing", "things",
+    "say", "says", "said", "know", "known", "believe", "think", "claim", "claims", "exactly",
+])
+
+# Intensifiers and hedges that end a key phrase without adding search value
+FILLER_WORDS = frozenset([
+    "completely", "totally", "entirely", "fully", "always", "never", "really", "actually",
+    "directly", "definitely", "significantly", "greatly", "highly", "strongly", "slightly",
+    "often", "usually", "generally", "likely", "probably", "also", "even", "every",
+    "help", "helps", "helped", "helping",
+])
+
+# Verbs linking a cause to an effect in claims like "X causes Y"
+CAUSAL_VERBS = frozenset([
+    "causes", "cause", "caused", "prevents", "prevent", "prevented", "reduces", "reduce", "reduced",
+    "increases", "increase", "increased", "improves", "improve", "cures", "cure", "treats", "treat",
+    "leads", "lead", "triggers", "trigger", "boosts", "boost", "lowers", "lower", "raises", "raise",
+    "worsens", "worsen", "affects", "affect", "protects", "protect", "kills", "kill",
+    "damages", "damage", "harms", "harm", "stunts", "stunt", "eliminates", "eliminate", "inhibits", "inhibit",
+])
+
+# Words that carry the claim's predicate; a keyword set that loses them searches for something else
+NEGATION_WORDS = frozenset([
+    "no", "not", "nor", "never", "without", "cannot", "can't", "don't", "doesn't", "isn't", "aren't",
+    "didn't", "won't",
+])
+PREDICATE_WORDS = CAUSAL_VERBS | NEGATION_WORDS
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-']*")
+PHRASE_BOUNDARY_PATTERN = re.compile(r"[,.;:!?()\[\]\"]")
+
+# Key phrases longer than this are poor search terms
+MAX_PHRASE_WORDS = 4
+
+
+class LocalKeywordExtractor:
+    """
+    Deterministic keyword extraction that needs no LLM call.
+    
+    Candidate phrases are runs of words between stopwords, filler words,
+    causal verbs and punctuation, scored RAKE-style (sum of word degree over
+    word frequency). For "X causes Y" style claims the cause, verb and effect
+    are also combined into one search phrase.
+    """
+    
+    def __init__(self, max_keywords: int = 5):
+        """
+        Initialize the extractor.
+        
+        Args:
+            max_keywords: Maximum number of keywords returned
+        """
+        self.max_keywords = max_keywords
+    
+    def extract(self, claim: str) -> Tuple[List[str], float]:
+        """
+        Extract search keywords from a claim.
+        
+        Args:
+            claim: The claim to extract keywords from
+            
+        Returns:
+            Tuple of (keywords, confidence between 0 and 1 that they are good
+            enough to search with)
+        """
+        words = self._words(claim)
+        phrases, relation = self._candidate_phrases(words)
+        if not phrases:
+            return [], 0.0
+        
+        frequency: Dict[str, int] = {}
+        degree: Dict[str, int] = {}
+        for phrase in phrases:
+            for word in phrase:
+                frequency[word] = frequency.get(word, 0) + 1
+                degree[word] = degree.get(word, 0) + len(phrase)
+        
+        scores: Dict[str, float] = {}
+        for phrase in phrases:
+            scores.setdefault(" ".join(phrase), sum(degree[word] / frequency[word] for word in phrase))
+        # sorted() is stable, so ties keep the order the phrases appear in the claim
+        keywords = sorted(scores, key=scores.get, reverse=True)
+        
+        if relation is not None:
+            cause, verb, effect = relation
+            cause, effect = " ".join(cause), " ".join(effect)
+            keywords = [f"{cause} {verb} {effect}", cause, effect] + [k for k in keywords if k not in (cause, effect)]
+        keywords = keywords[:self.max_keywords]
+        
+        kept = {word for keyword in keywords for word in keyword.split()}
+        dropped = [word for word in words if word in PREDICATE_WORDS and word not in kept]
+        return keywords, self._confidence(phrases, relation is not None, dropped)
+    
+    @staticmethod
+    def _words(claim: str) -> List[str]:
+        """Lower-cased words of a claim, with an empty word at each punctuation boundary."""
+        words: List[str] = []
+        for fragment in PHRASE_BOUNDARY_PATTERN.split(claim.lower()):
+            words.extend(word.strip("-'") for word in WORD_PATTERN.findall(fragment))
+            words.append("")
+        return words
+    
+    def _candidate_phrases(
+        self, words: List[str]
+    ) -> Tuple[List[List[str]], Optional[Tuple[List[str], str, List[str]]]]:
+        """Split a claim's words into candidate phrases and find its (cause, verb, effect), if any."""
+        phrases: List[List[str]] = []
+        current: List[str] = []
+        causal_index = None
+        causal_verb = ""
+        for word in words:
+            if word and word not in STOPWORDS and word not in FILLER_WORDS and word not in CAUSAL_VERBS:
+                current.append(word)
+                continue
+            if current:
+                phrases.append(current)
+                current = []
+            if word in CAUSAL_VERBS and causal_index is None:
+                causal_index = len(phrases)
+                causal_verb = word
+        
+        relation = None
+        if causal_index is not None and 0 < causal_index < len(phrases):
+            relation = (phrases[causal_index - 1], causal_verb, phrases[causal_index])
+        return phrases, relation
+    
+    def _confidence(self, phrases: List[List[str]], has_relation: bool, dropped: List[str]) -> float:
+        """
+        How likely the phrases are to make a good search.
+        
+        Claims with one or two content words are too vague, long rambling
+        claims and overlong phrases make poor queries, and phrases edged by a
+        bare number or a lone letter are usually fragments. Without a
+        recognised cause and effect the phrases may miss what the claim says,
+        and keywords that drop a negation or causal verb search for a
+        different claim.
+        """
+        content_words = sum(len(phrase) for phrase in phrases)
+        confidence = min(1.0, content_words / 3)
+        if content_words > 12:
+            confidence *= 12 / content_words
+        if any(len(phrase) > MAX_PHRASE_WORDS for phrase in phrases):
+            confidence *= 0.7
+        if any(self._is_fragment_edge(phrase[0]) or self._is_fragment_edge(phrase[-1]) for phrase in phrases):
+            confidence *= 0.7
+        if not has_relation:
+            confidence *= 0.75
+        if dropped:
+            confidence *= 0.5
+        return round(confidence, 2)
+    
+    @staticmethod
+    def _is_fragment_edge(word: str) -> bool:
+        """Whether a word at a phrase's edge suggests it was cut out of a larger expression."""
+        return word.isdigit() or len(word) == 1
@@ -1,33 +1,87 @@
 # app/services/llm_service.py
 import json
 import re
+import httpx
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from app.core.config import settings
-from app.core.exceptions import LLMRequestError
+from app.core.http import create_async_client, create_session
+from app.core.metrics import LLM_JSON_FALLBACKS
+from app.core.resilience import bounded_timeout, remaining_time, send_with_retries
+from app.services.cache import make_cache_key
+from app.services.rate_limiter import PRIORITY_KEYWORDS, TokenBucketLimiter, estimate_tokens
+from app.services.single_flight import SingleFlight
+from app.core.exceptions import CircuitOpenError, LLMRateLimitError, LLMRequestError
+
+
+# Statuses Gemini uses to say it is over quota or overloaded
+THROTTLED_STATUSES = (429, 503)
 
 
 class LLMService:
     """Service for interacting with LLM models."""
     
-    def __init__(self):
-        """Initialize the LLM service."""
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, rate_limiter: Optional[TokenBucketLimiter] = None):
+        """
+        Initialize the LLM service.
+        
+        Args:
+            client: Optional shared async HTTP client. When omitted, the service
+                lazily creates and owns its own pooled client.
+            rate_limiter: Optional quota shared with other services; by default
+                one is created from the LLM_* quota settings
+        """
         self.api_key = settings.GEMINI_API_KEY
         self.model_name = settings.GEMINI_MODEL
+        self._client = client
+        self._owns_client = client is None
+        self._session: Optional[requests.Session] = None
+        # Identical prompts in flight at the same time share one Gemini call
+        self._prompt_flights = SingleFlight(settings.PIPELINE_DEADLINE) if settings.LLM_SINGLE_FLIGHT_ENABLED else None
+        
+        if rate_limiter is None and settings.LLM_RATE_LIMIT_ENABLED:
+            rate_limiter = TokenBucketLimiter(
+                settings.LLM_REQUESTS_PER_MINUTE,
+                settings.LLM_TOKENS_PER_MINUTE,
+                min_rate_fraction=settings.LLM_RATE_MIN_FRACTION,
+                increase=settings.LLM_RATE_INCREASE,
+                decrease=settings.LLM_RATE_DECREASE,
+            )
+        self.rate_limiter = rate_limiter
     
-    def call_gemini_api(self, prompt: str) -> str:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled async HTTP client used for Gemini requests."""
+        if self._client is None:
+            self._client = create_async_client(settings.LLM_TIMEOUT)
+        return self._client
+    
+    @property
+    def session(self) -> requests.Session:
+        """Pooled requests session used by the blocking code path."""
+        if self._session is None:
+            self._session = create_session()
+        return self._session
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools owned by this service."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def _build_gemini_request(self, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
         """
-        Call Gemini API with a prompt.
+        Build the URL, headers and payload for a Gemini generateContent request.
         
         Args:
             prompt: The prompt to send to the model
             
         Returns:
-            The text response from the model
-            
-        Raises:
-            LLMRequestError: If there's an issue with the API request
+            Tuple of (url, headers, json payload)
         """
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:generateContent?key={self.api_key}"
         
@@ -45,24 +99,138 @@ class LLMService:
             ]
         }
         
+        return url, headers, data
+    
+    def _extract_response_text(self, result: Dict[str, Any]) -> str:
+        """
+        Extract the generated text from a Gemini API response body.
+        
+        Args:
+            result: Parsed JSON response from Gemini
+            
+        Returns:
+            The text response from the model
+            
+        Raises:
+            LLMRequestError: If the response does not contain any text
+        """
+        if "candidates" in result and result["candidates"] and "content" in result["candidates"][0]:
+            content = result["candidates"][0]["content"]
+            if "parts" in content and content["parts"]:
+                return content["parts"][0]["text"]
+        
+        raise LLMRequestError("Unable to extract text from Gemini API response")
+    
+    def call_gemini_api(self, prompt: str) -> str:
+        """
+        Call Gemini API with a prompt.
+        
+        Blocking variant kept for scripts and synchronous callers; request
+        handlers should use `call_gemini_api_async`.
+        
+        Args:
+            prompt: The prompt to send to the model
+            
+        Returns:
+            The text response from the model
+            
+        Raises:
+            LLMRequestError: If there's an issue with the API request
+        """
+        url, headers, data = self._build_gemini_request(prompt)
+        
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = self.session.post(url, headers=headers, json=data, timeout=settings.LLM_TIMEOUT)
             
             if response.status_code != 200:
                 raise LLMRequestError(f"Gemini API request failed with status code {response.status_code}: {response.text}")
             
-            result = response.json()
-            
             # Extract the text from the response
-            if "candidates" in result and result["candidates"] and "content" in result["candidates"][0]:
-                content = result["candidates"][0]["content"]
-                if "parts" in content and content["parts"]:
-                    return content["parts"][0]["text"]
-            
-            raise LLMRequestError("Unable to extract text from Gemini API response")
+            return self._extract_response_text(response.json())
         except requests.RequestException as e:
             raise LLMRequestError(f"Request to Gemini API failed: {str(e)}")
     
+    async def call_gemini_api_async(self, prompt: str, priority: int = PRIORITY_KEYWORDS) -> str:
+        """
+        Call Gemini API with a prompt without blocking the event loop.
+        
+        The call first waits for quota in the shared rate limiter, if enabled.
+        
+        Args:
+            prompt: The prompt to send to the model
+            priority: Rate limiter lane (see app.services.rate_limiter); lower is served first
+            
+        Returns:
+            The text response from the model
+            
+        Raises:
+            LLMRateLimitError: If Gemini throttled the request
+            LLMRequestError: If there's an issue with the API request
+        """
+        if self._prompt_flights is None:
+            return await self._post_gemini_request(prompt, priority)
+        
+        # Callers in different rate limiter lanes don't share a call
+        key = make_cache_key(self.model_name, prompt, priority)
+        return await self._prompt_flights.do(key, lambda: self._post_gemini_request(prompt, priority))
+    
+    async def _post_gemini_request(self, prompt: str, priority: int) -> str:
+        """Send a single generateContent request and return the response text."""
+        url, headers, data = self._build_gemini_request(prompt)
+        
+        estimated_tokens = estimate_tokens(prompt) + settings.LLM_OUTPUT_TOKENS_ESTIMATE
+        
+        async def send() -> httpx.Response:
+            # Every attempt, retries included, spends quota
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(estimated_tokens, priority)
+            response = await self.client.post(
+                url, headers=headers, json=data, timeout=bounded_timeout(self.client.timeout, remaining_time())
+            )
+            if response.status_code in THROTTLED_STATUSES and self.rate_limiter is not None:
+                self.rate_limiter.on_throttled(self._retry_after(response))
+            return response
+        
+        try:
+            response = await send_with_retries("gemini", send, timeout=self.client.timeout)
+        except CircuitOpenError as e:
+            raise LLMRequestError(f"Gemini API unavailable: {str(e)}")
+        except httpx.HTTPError as e:
+            raise LLMRequestError(f"Request to Gemini API failed: {str(e)}")
+        
+        if response.status_code in THROTTLED_STATUSES:
+            raise LLMRateLimitError(
+                f"Gemini API throttled the request with status code {response.status_code}",
+                retry_after=self._retry_after(response),
+            )
+        
+        if response.status_code != 200:
+            raise LLMRequestError(f"Gemini API request failed with status code {response.status_code}: {response.text}")
+        
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise LLMRequestError(f"Invalid JSON in Gemini API response: {str(e)}")
+        
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_success()
+            used_tokens = result.get("usageMetadata", {}).get("totalTokenCount")
+            if isinstance(used_tokens, int):
+                self.rate_limiter.record_usage(estimated_tokens, used_tokens)
+        
+        return self._extract_response_text(result)
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Seconds Gemini asked us to wait, from Retry-After or the error's retryDelay."""
+        header = response.headers.get("retry-after", "")
+        try:
+            return float(header)
+        except ValueError:
+            pass
+        match = re.search(r'"retryDelay"\s*:\s*"(\d+(?:\.\d+)?)s"', response.text)
+        return float(match.group(1)) if match else None
+    
     def clean_json_text(self, text: str) -> str:
         """
         Clean text for JSON parsing by removing markdown code blocks and trimming.
@@ -91,12 +259,13 @@ class LLMService:
         # Remove any leading/trailing whitespace and special characters
         return cleaned_text.strip()
     
-    def parse_json_response(self, content: str) -> Dict[str, Any]:
+    def parse_json_response(self, content: str, kind: str = "object") -> Dict[str, Any]:
         """
         Parse JSON from LLM response with fallback mechanisms.
         
         Args:
             content: Raw text from LLM that should contain JSON
+            kind: Label counting fallbacks in the LLM JSON fallbacks metric
             
         Returns:
             Parsed JSON as a dictionary
@@ -106,8 +275,41 @@ class LLMService:
             return json.loads(cleaned_content)
         except json.JSONDecodeError:
             # Use extraction methods from the original code if direct parsing fails
+            LLM_JSON_FALLBACKS.labels(kind).inc()
             return self._extract_fallback(content)
     
+    def parse_json_array_response(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Parse a JSON array of objects from LLM response.
+        
+        Args:
+            content: Raw text from LLM that should contain a JSON array
+            
+        Returns:
+            List of parsed objects, or an empty list if nothing could be parsed
+        """
+        code_block_match = re.search(r'```(?:json)?(.*?)```', content, re.DOTALL)
+        cleaned_content = code_block_match.group(1).strip() if code_block_match else content.strip()
+        
+        array_match = re.search(r'\[.*\]', cleaned_content, re.DOTALL)
+        if array_match:
+            cleaned_content = array_match.group(0)
+        
+        try:
+            parsed = json.loads(cleaned_content)
+        except json.JSONDecodeError:
+            LLM_JSON_FALLBACKS.labels("array").inc()
+            return []
+        
+        # Accept a wrapping object such as {"papers": [...]}
+        if isinstance(parsed, dict):
+            parsed = next((value for value in parsed.values() if isinstance(value, list)), [])
+        
+        if not isinstance(parsed, list):
+            return []
+        
+        return [item for item in parsed if isinstance(item, dict)]
+    
     def _extract_fallback(self, content: str) -> Dict[str, Any]:
         """
         Extract structured data when JSON parsing fails.
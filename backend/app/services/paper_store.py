@@ -0,0 +1,248 @@
+# app/services/paper_store.py
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Paper fields kept in the store
+STORED_FIELDS = ("title", "snippet", "url", "authors", "year", "publication", "citation_count")
+
+# Words too common in queries and abstracts to be worth indexing
+INDEX_STOPWORDS = frozenset([
+    "a", "an", "the", "and", "or", "of", "in", "on", "to", "for", "with", "by", "is", "are",
+    "was", "were", "be", "as", "at", "from", "that", "this", "it", "its", "we", "our",
+])
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title terms count this many times, so a match in the title outweighs one in the snippet
+TITLE_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of terms, stopwords removed
+    """
+    return [term for term in re.findall(r"[a-z0-9]+", text.lower()) if term not in INDEX_STOPWORDS and len(term) > 1]
+
+
+class PaperStore:
+    """
+    Local corpus of every paper search has returned, with a BM25 index.
+    
+    Papers are appended to a JSON Lines file as they are added, so inserts are
+    incremental and the store is rebuilt at startup with a single sequential
+    read. A paper is identified by its normalized title (or URL); re-adding it
+    replaces the earlier version.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the paper store, loading any papers already on disk.
+        
+        Args:
+            path: JSON Lines file holding the papers
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._papers: List[Optional[Dict[str, Any]]] = []
+        self._doc_by_key: Dict[str, int] = {}
+        self._doc_lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        self._live_count = 0
+        self._file = None
+        
+        line_count = self._load()
+        # Rewrite the file when replaced papers make up most of it
+        if line_count > 2 * self._live_count:
+            self.compact()
+        self._file = open(self.path, "a", encoding="utf-8")
+    
+    def __len__(self) -> int:
+        return self._live_count
+    
+    def _load(self) -> int:
+        """Read the papers file into the index and return the number of lines read."""
+        if not os.path.exists(self.path):
+            return 0
+        
+        line_count = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line_count += 1
+                try:
+                    paper = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+                self._index(paper)
+        logger.info(f"Loaded {self._live_count} papers from {self.path}")
+        return line_count
+    
+    @staticmethod
+    def paper_key(paper: Dict[str, Any]) -> str:
+        """Identity of a paper: its normalized title, or its URL when untitled."""
+        title = " ".join(re.findall(r"[a-z0-9]+", paper.get("title", "").lower()))
+        if title:
+            return f"title:{title}"
+        url = paper.get("url", "").strip().lower()
+        return f"url:{url}" if url else ""
+    
+    def _index(self, paper: Dict[str, Any]) -> bool:
+        """
+        Add a paper to the in-memory index, replacing any earlier version of it.
+        
+        Returns False if the paper has no identity or is already stored unchanged.
+        """
+        key = self.paper_key(paper)
+        if not key:
+            return False
+        
+        stored = {field: paper.get(field) for field in STORED_FIELDS if field in paper}
+        previous = self._doc_by_key.get(key)
+        if previous is not None:
+            if self._papers[previous] == stored:
+                return False
+            self._unindex(previous)
+        
+        terms = tokenize(paper.get("title", "")) * TITLE_WEIGHT + tokenize(paper.get("snippet", ""))
+        doc_id = len(self._papers)
+        self._papers.append(stored)
+        self._doc_by_key[key] = doc_id
+        self._doc_lengths.append(len(terms))
+        self._total_length += len(terms)
+        self._live_count += 1
+        for term, count in Counter(terms).items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        return True
+    
+    def _unindex(self, doc_id: int) -> None:
+        """Remove a superseded paper from the index."""
+        paper = self._papers[doc_id]
+        terms = set(tokenize(paper.get("title", ""))) | set(tokenize(paper.get("snippet", "")))
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths[doc_id]
+        self._doc_lengths[doc_id] = 0
+        self._papers[doc_id] = None
+        self._live_count -= 1
+    
+    def add(self, papers: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update papers and append them to the papers file.
+        
+        Args:
+            papers: Paper dictionaries as returned by search
+            
+        Returns:
+            Number of new or changed papers stored
+        """
+        stored = 0
+        with self._lock:
+            for paper in papers:
+                if self._index(paper):
+                    self._file.write(json.dumps(self._papers[-1]) + "\n")
+                    stored += 1
+            self._file.flush()
+        return stored
+    
+    def search(
+        self, query: str, limit: int, min_coverage: float = 0.0, min_results: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank stored papers against a query with BM25.
+        
+        The search scans the index under a lock, so async callers should run
+        it in a worker thread.
+        
+        Args:
+            query: Free-text query
+            limit: Maximum number of papers to return
+            min_coverage: Minimum fraction of distinct query terms a paper must contain
+            min_results: Number of papers the search must find to count as a hit
+            
+        Returns:
+            Copies of the best matching papers, best first
+        """
+        with self._lock:
+            scored = self._score(query, min_coverage)
+            scored.sort(key=lambda item: item[0], reverse=True)
+            if len(scored) >= min_results:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return [dict(self._papers[doc_id]) for _, doc_id in scored[:limit]]
+    
+    def _score(self, query: str, min_coverage: float) -> List[Tuple[float, int]]:
+        """BM25 score of every paper matching enough of the query terms."""
+        terms = set(tokenize(query))
+        if not terms or self._live_count == 0:
+            return []
+        
+        average_length = self._total_length / self._live_count or 1.0
+        scores: Dict[int, float] = {}
+        matched_terms: Counter = Counter()
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (self._live_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / average_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                matched_terms[doc_id] += 1
+        
+        required = min_coverage * len(terms)
+        return [(score, doc_id) for doc_id, score in scores.items() if matched_terms[doc_id] >= required]
+    
+    def compact(self) -> None:
+        """Rewrite the papers file with only the current version of each paper."""
+        with self._lock:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for paper in self._papers:
+                    if paper is not None:
+                        f.write(json.dumps(paper) + "\n")
+            os.replace(temp_path, self.path)
+            if self._file is not None:
+                self._file.close()
+                self._file = open(self.path, "a", encoding="utf-8")
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Local search counters since startup.
+        
+        Returns:
+            Dictionary with "hits" (searches answered locally), "misses" and "papers"
+        """
+        return {"hits": self.hits, "misses": self.misses, "papers": self._live_count}
+    
+    def close(self) -> None:
+        """Close the papers file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
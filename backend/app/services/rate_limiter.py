@@ -0,0 +1,190 @@
+# app/services/rate_limiter.py
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import List, Optional, Tuple
+
+from app.core.metrics import LLM_RATE_LIMITER_WAIT
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Priority lanes, most urgent first: the final analysis finishes a request that
+# has already paid for everything else, so it goes ahead of per-paper findings
+PRIORITY_ANALYSIS = 0
+PRIORITY_KEYWORDS = 1
+PRIORITY_FINDINGS = 2
+PRIORITY_NAMES = {PRIORITY_ANALYSIS: "analysis", PRIORITY_KEYWORDS: "keywords", PRIORITY_FINDINGS: "findings"}
+
+# Rough characters per token for English prose and JSON
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text without a tokenizer.
+    
+    Args:
+        text: Prompt or response text
+        
+    Returns:
+        Approximate token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+class TokenBucketLimiter:
+    """
+    Client-side request and token quota shared by all LLM calls.
+    
+    Two token buckets, one counting requests and one counting model tokens,
+    refill continuously at the configured per-minute rates. Callers wait in
+    priority order, FIFO within a priority, until both buckets can cover
+    them, so the provider sees a smooth stream at the quota ceiling instead of
+    bursts that come back as 429s.
+    
+    The refill rate adapts AIMD-style: every throttled response (429/503)
+    halves it and pauses the buckets for any Retry-After the provider sent,
+    and every successful call adds back a small fraction of the quota.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        min_rate_fraction: float = 0.05,
+        increase: float = 0.02,
+        decrease: float = 0.5,
+    ):
+        """
+        Initialize the limiter with full buckets.
+        
+        Args:
+            requests_per_minute: Request quota; 0 or less means unlimited
+            tokens_per_minute: Token quota (prompt plus response); 0 or less means unlimited
+            min_rate_fraction: Lowest fraction of the quota backoff can reduce the rate to
+            increase: Fraction of the quota restored per successful call
+            decrease: Factor the rate is multiplied by on a throttled response
+        """
+        # An unlimited bucket is infinitely deep, so it never makes a caller wait
+        self.request_capacity = float(requests_per_minute) if requests_per_minute > 0 else math.inf
+        self.token_capacity = float(tokens_per_minute) if tokens_per_minute > 0 else math.inf
+        self.min_rate_fraction = min_rate_fraction
+        self.increase = increase
+        self.decrease = decrease
+        
+        self.rate_fraction = 1.0
+        self._requests = self.request_capacity
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = asyncio.Condition()
+    
+    def _refill(self) -> None:
+        """Add the requests and tokens earned since the last update."""
+        now = time.monotonic()
+        elapsed = now - max(self._updated, self._paused_until)
+        self._updated = now
+        if elapsed <= 0:
+            return
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_capacity * self.rate_fraction / 60)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_capacity * self.rate_fraction / 60)
+    
+    def _time_until_available(self, tokens: float) -> float:
+        """Seconds until both buckets can cover a call of the given size."""
+        now = time.monotonic()
+        pause = max(0.0, self._paused_until - now)
+        request_rate = self.request_capacity * self.rate_fraction / 60
+        token_rate = self.token_capacity * self.rate_fraction / 60
+        request_wait = max(0.0, 1 - self._requests) / request_rate
+        token_wait = max(0.0, tokens - self._tokens) / token_rate
+        return pause + max(request_wait, token_wait)
+    
+    async def acquire(self, tokens: int, priority: int = PRIORITY_KEYWORDS) -> float:
+        """
+        Wait until a call of the given size fits the quota, then take it.
+        
+        Args:
+            tokens: Estimated tokens the call will consume
+            priority: Lane; lower values are served first
+            
+        Returns:
+            Seconds spent waiting
+        """
+        # A call larger than the whole bucket may run once the bucket is full
+        tokens = min(float(tokens), self.token_capacity)
+        started = time.monotonic()
+        entry = (priority, next(self._sequence))
+        
+        async with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        timeout = self._time_until_available(tokens)
+                        if timeout <= 0:
+                            heapq.heappop(self._waiters)
+                            self._requests -= 1
+                            self._tokens -= tokens
+                            self._condition.notify_all()
+                            break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._condition.notify_all()
+                raise
+        
+        waited = time.monotonic() - started
+        LLM_RATE_LIMITER_WAIT.labels(PRIORITY_NAMES.get(priority, str(priority))).observe(waited)
+        return waited
+    
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """
+        Correct the token bucket once a call reports how many tokens it really used.
+        
+        Args:
+            estimated: Tokens taken by `acquire`
+            actual: Tokens the provider counted
+        """
+        self._tokens = min(self.token_capacity, self._tokens + min(float(estimated), self.token_capacity) - actual)
+    
+    def on_success(self) -> None:
+        """Additive increase: recover part of the quota after a call went through."""
+        self.rate_fraction = min(1.0, self.rate_fraction + self.increase)
+    
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicative decrease after a 429/503 from the provider.
+        
+        Throttled responses that arrive together are one signal, so the rate is
+        cut at most once per second.
+        
+        Args:
+            retry_after: Seconds the provider asked us to wait, if it said
+        """
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self._last_decrease = now
+            self.rate_fraction = max(self.min_rate_fraction, self.rate_fraction * self.decrease)
+            logger.warning(f"LLM provider throttled us; rate reduced to {self.rate_fraction:.0%} of quota")
+        
+        # Whatever burst triggered this is spent; start refilling from empty
+        self._refill()
+        self._requests = min(self._requests, 0.0)
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
@@ -0,0 +1,316 @@
+# app/services/search_providers.py
+import asyncio
+import json
+import logging
+import httpx
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from app.core.exceptions import CircuitOpenError, SearchRequestError
+from app.core.resilience import bounded_timeout, remaining_time, send_with_retries
+from app.services.paper_store import PaperStore, tokenize
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class SearchProvider:
+    """Interface for backends that turn a search query into ranked papers."""
+    
+    name = "provider"
+    
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Run a single search query.
+        
+        Args:
+            query: Search query
+            limit: Maximum number of papers to return
+            
+        Returns:
+            List of papers as dictionaries, best first
+            
+        Raises:
+            SearchRequestError: If the provider cannot answer the query
+        """
+        raise NotImplementedError
+    
+    async def aclose(self) -> None:
+        """Release any resources held by the provider."""
+
+
+class SerpApiProvider(SearchProvider):
+    """Google Scholar results through SERP API."""
+    
+    name = "serpapi"
+    
+    def __init__(self, api_key: str, get_client: Callable[[], httpx.AsyncClient]):
+        """
+        Initialize the SERP API provider.
+        
+        Args:
+            api_key: SERP API key
+            get_client: Returns the shared async HTTP client; called per request
+                so the owner can create its client lazily
+        """
+        self.api_key = api_key
+        self.get_client = get_client
+    
+    def build_search_url(self, query: str, limit: int) -> str:
+        """Build the SERP API Google Scholar URL for a query."""
+        encoded_query = quote(query)
+        return f"https://serpapi.com/search.json?engine=google_scholar&q={encoded_query}&api_key={self.api_key}&num={limit}"
+    
+    @staticmethod
+    def parse_results(data: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        """
+        Convert SERP API organic results into paper dictionaries.
+        
+        Args:
+            data: Parsed SERP API response
+            limit: Maximum number of papers to return
+            
+        Returns:
+            List of papers as dictionaries
+        """
+        papers = []
+        if "organic_results" in data:
+            for result in data["organic_results"][:limit]:
+                paper = {
+                    "title": result.get("title", ""),
+                    "snippet": result.get("snippet", ""),
+                    "url": result.get("link", ""),
+                    "authors": [],
+                    "year": "",
+                    "publication": "",
+                    "citation_count": result.get("cited_by", {}).get("value", 0)
+                }
+                
+                # Extract publication info if available
+                pub_info = result.get("publication_info", {})
+                if pub_info:
+                    # Handle authors
+                    authors = pub_info.get("authors", [])
+                    if isinstance(authors, list):
+                        # Ensure each author is a string
+                        author_list = []
+                        for author in authors:
+                            if isinstance(author, dict):
+                                # If author is a dictionary, try to get name
+                                if 'name' in author:
+                                    author_list.append(author['name'])
+                                else:
+                                    # Use the first value in the dict or stringify the dict
+                                    author_list.append(str(next(iter(author.values()))) if author else "Unknown")
+                            else:
+                                # If author is already a string or other type, just convert to string
+                                author_list.append(str(author))
+                        paper["authors"] = author_list
+                    elif isinstance(authors, str):
+                        paper["authors"] = [authors]
+                    else:
+                        # Fallback for any other type
+                        paper["authors"] = [str(authors)]
+                    
+                    # Handle year and publication
+                    paper["year"] = pub_info.get("year", "")
+                    paper["publication"] = pub_info.get("summary", "")
+                
+                papers.append(paper)
+        
+        return papers
+    
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        url = self.build_search_url(query, limit)
+        
+        async def send() -> httpx.Response:
+            client = self.get_client()
+            return await client.get(url, timeout=bounded_timeout(client.timeout, remaining_time()))
+        
+        try:
+            response = await send_with_retries("serpapi", send, timeout=self.get_client().timeout)
+        except CircuitOpenError as e:
+            raise SearchRequestError(f"SERP API unavailable: {str(e)}")
+        except httpx.HTTPError as e:
+            raise SearchRequestError(f"Request to SERP API failed: {str(e)}")
+        
+        if response.status_code != 200:
+            raise SearchRequestError(f"SERP API request failed with status code {response.status_code}: {response.text}")
+        
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise SearchRequestError(f"Invalid JSON in SERP API response: {str(e)}")
+        
+        return self.parse_results(data, limit)
+
+
+class LocalFixtureProvider(SearchProvider):
+    """
+    Papers from a local JSON file, for development, tests and offline demos.
+    
+    The file holds a list of paper dictionaries (or a SERP API response with
+    "organic_results"); papers are ranked by how many query terms their title
+    and snippet contain.
+    """
+    
+    name = "fixture"
+    
+    def __init__(self, path: str):
+        """
+        Initialize the fixture provider.
+        
+        Args:
+            path: JSON file holding the papers
+            
+        Raises:
+            SearchRequestError: If the file cannot be read
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise SearchRequestError(f"Could not load search fixtures from {path}: {str(e)}")
+        
+        if isinstance(data, dict):
+            data = SerpApiProvider.parse_results(data, len(data.get("organic_results", [])))
+        
+        self.papers = [
+            {
+                "title": paper.get("title", ""),
+                "snippet": paper.get("snippet", ""),
+                "url": paper.get("url", ""),
+                "authors": paper.get("authors", []),
+                "year": paper.get("year", ""),
+                "publication": paper.get("publication", ""),
+                "citation_count": paper.get("citation_count", 0),
+            }
+            for paper in data
+        ]
+        self._terms = [set(tokenize(f"{paper['title']} {paper['snippet']}")) for paper in self.papers]
+    
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        query_terms = set(tokenize(query))
+        scored = [
+            (len(query_terms & terms), index)
+            for index, terms in enumerate(self._terms)
+            if query_terms & terms
+        ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [dict(self.papers[index]) for _, index in scored[:limit]]
+
+
+class PaperStoreProvider(SearchProvider):
+    """Papers from the local paper store, ranked with BM25."""
+    
+    name = "paper_store"
+    
+    def __init__(self, store: PaperStore):
+        """
+        Initialize the paper store provider.
+        
+        Args:
+            store: Local paper corpus to search
+        """
+        self.store = store
+    
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.search, query, limit)
+
+
+class HedgedSearchProvider(SearchProvider):
+    """
+    Sends each query to a primary provider and, if it has not answered within
+    a delay budget, also to a secondary one; the first successful answer wins.
+    
+    The delay should sit around the primary's p95 latency, so only the slow
+    tail of requests pays for a second call.
+    """
+    
+    name = "hedged"
+    
+    def __init__(self, primary: SearchProvider, secondary: SearchProvider, delay: float):
+        """
+        Initialize the hedged provider.
+        
+        Args:
+            primary: Provider asked first
+            secondary: Provider asked when the primary is slow or fails
+            delay: Seconds to wait for the primary before hedging
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.delay = delay
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        primary = asyncio.ensure_future(self.primary.search(query, limit))
+        secondary: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.delay)
+            if primary in done and primary.exception() is None:
+                return primary.result()
+            
+            self.hedges += 1
+            logger.info(
+                f"Search provider {self.primary.name} "
+                f"{'failed' if primary in done else f'did not answer within {self.delay}s'}, "
+                f"hedging with {self.secondary.name}"
+            )
+            secondary = asyncio.ensure_future(self.secondary.search(query, limit))
+            
+            errors = [primary.exception()] if primary in done else []
+            pending = {secondary} if primary in done else {primary, secondary}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            for task in (primary, secondary):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    async def aclose(self) -> None:
+        await self.primary.aclose()
+        await self.secondary.aclose()
+
+
+def create_search_provider(
+    name: str,
+    api_key: str,
+    get_client: Callable[[], httpx.AsyncClient],
+    paper_store: Optional[PaperStore] = None,
+    fixture_path: str = "",
+) -> SearchProvider:
+    """
+    Create a search provider by name.
+    
+    Args:
+        name: "serpapi", "fixture" or "paper_store"
+        api_key: SERP API key, used by the serpapi provider
+        get_client: Returns the shared async HTTP client, used by the serpapi provider
+        paper_store: Local paper corpus, used by the paper_store provider
+        fixture_path: JSON fixture file, used by the fixture provider
+        
+    Returns:
+        The search provider
+        
+    Raises:
+        ValueError: If the provider name is unknown or its backing store is missing
+    """
+    if name == "serpapi":
+        return SerpApiProvider(api_key, get_client)
+    if name == "fixture":
+        return LocalFixtureProvider(fixture_path)
+    if name == "paper_store":
+        if paper_store is None:
+            raise ValueError("The paper_store search provider requires PAPER_STORE_ENABLED")
+        return PaperStoreProvider(paper_store)
+    raise ValueError(f"Unknown search provider: {name}")
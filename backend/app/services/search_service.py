@@ -1,34 +1,138 @@
 # app/services/search_service.py
+import asyncio
+import codecs
+import logging
+import math
+import re
+import httpx
 import requests
-from typing import List, Dict, Any
-from urllib.parse import quote
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
 
 from app.core.config import settings
+from app.core.http import create_async_client, create_session
 from app.core.exceptions import SearchRequestError
+from app.core.metrics import observe_latency
+from app.services.abstract_extractor import AbstractExtractor, is_html_content_type
+from app.services.cache import CacheBackend, create_cache, make_cache_key
+from app.services.paper_store import PaperStore
+from app.services.search_providers import HedgedSearchProvider, SearchProvider, SerpApiProvider, create_search_provider
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Browser-like User-Agent used when fetching paper pages
+PAPER_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Bytes read per chunk when streaming a paper page
+PAPER_FETCH_CHUNK_SIZE = 8192
 
 
 class SearchService:
     """Service for searching academic papers."""
     
-    def __init__(self):
-        """Initialize the search service."""
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        abstract_cache: Optional[CacheBackend] = None,
+        paper_store: Optional[PaperStore] = None,
+        provider: Optional[SearchProvider] = None,
+    ):
+        """
+        Initialize the search service.
+        
+        Args:
+            client: Optional shared async HTTP client. When omitted, the service
+                lazily creates and owns its own pooled client.
+            abstract_cache: Optional URL to abstract cache; by default one is
+                created from the ABSTRACT_CACHE_* settings
+            paper_store: Optional local paper corpus searched before SERP API;
+                by default one is opened from the PAPER_STORE_* settings
+            provider: Optional search provider; by default one is built from
+                SEARCH_PROVIDER, hedged with SEARCH_HEDGE_PROVIDER if set
+        """
         self.api_key = settings.SERP_API_KEY
+        self._client = client
+        self._owns_client = client is None
+        self._session: Optional[requests.Session] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        if abstract_cache is None and settings.ABSTRACT_CACHE_ENABLED:
+            abstract_cache = create_cache(
+                settings.ABSTRACT_CACHE_BACKEND,
+                settings.ABSTRACT_CACHE_MAX_ENTRIES,
+                settings.ABSTRACT_CACHE_TTL,
+                path=settings.ABSTRACT_CACHE_PATH,
+                table="paper_abstracts",
+            )
+        self.abstract_cache = abstract_cache
+        
+        if paper_store is None and settings.PAPER_STORE_ENABLED:
+            paper_store = PaperStore(settings.PAPER_STORE_PATH)
+        self.paper_store = paper_store
+        
+        self.serp_provider = SerpApiProvider(self.api_key, lambda: self.client)
+        if provider is None:
+            provider = self._create_provider(settings.SEARCH_PROVIDER)
+            if settings.SEARCH_HEDGE_PROVIDER:
+                provider = HedgedSearchProvider(
+                    provider, self._create_provider(settings.SEARCH_HEDGE_PROVIDER), settings.SEARCH_HEDGE_DELAY
+                )
+        self.provider = provider
     
-    def search_papers(self, keywords: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+    def _create_provider(self, name: str) -> SearchProvider:
+        """Build a named search provider sharing this service's client and paper store."""
+        if name == "serpapi":
+            return self.serp_provider
+        return create_search_provider(
+            name,
+            self.api_key,
+            lambda: self.client,
+            paper_store=self.paper_store,
+            fixture_path=settings.SEARCH_FIXTURE_PATH,
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled async HTTP client used for SERP API and paper page requests."""
+        if self._client is None:
+            self._client = create_async_client(settings.SEARCH_TIMEOUT)
+        return self._client
+    
+    @property
+    def session(self) -> requests.Session:
+        """Pooled requests session used by the blocking code path."""
+        if self._session is None:
+            self._session = create_session()
+        return self._session
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools owned by this service."""
+        await self.provider.aclose()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.abstract_cache is not None:
+            self.abstract_cache.close()
+        if self.paper_store is not None:
+            self.paper_store.close()
+    
+    def _build_queries(self, keywords: List[str]) -> List[str]:
         """
-        Search for academic papers using SERP API.
+        Create different search queries for better coverage.
         
         Args:
             keywords: List of keywords to search for
-            limit: Maximum number of papers to return
             
         Returns:
-            List of papers as dictionaries
-            
-        Raises:
-            SearchRequestError: If there's an issue with the search API request
+            List of query strings, most general first
         """
-        # Create different search queries for better coverage
         queries = []
         
         # Basic keyword query
@@ -42,78 +146,220 @@ class SearchService:
         alt_query = " ".join(["effect of" if "cause" in kw else kw for kw in keywords]) + " meta-analysis"
         queries.append(alt_query)
         
-        # Use the first query or pick the best one if we implement a ranking system
-        query = queries[0]
-        encoded_query = quote(query)
+        return queries
+    
+    def _needs_details(self, paper: Dict[str, Any]) -> bool:
+        """Whether the snippet is short enough that the abstract should be fetched."""
+        return len(paper["snippet"]) < 100 and bool(paper["url"])
+    
+    def _abstract_details(self, extractor: AbstractExtractor) -> Dict[str, Any]:
+        """
+        Turn a fed abstract extractor into a paper details dictionary.
+        
+        Args:
+            extractor: Extractor that has been fed (part of) a paper page
+            
+        Returns:
+            Dictionary with the abstract, or an empty dictionary
+        """
+        extractor.close()
+        abstract = extractor.abstract()
+        return {"abstract": abstract} if abstract else {}
+    
+    def search_papers(self, keywords: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search for academic papers using SERP API.
         
-        url = f"https://serpapi.com/search.json?engine=google_scholar&q={encoded_query}&api_key={self.api_key}&num={limit}"
+        Blocking variant kept for scripts and synchronous callers; request
+        handlers should use `search_papers_async`.
+        
+        Args:
+            keywords: List of keywords to search for
+            limit: Maximum number of papers to return
+            
+        Returns:
+            List of papers as dictionaries
+            
+        Raises:
+            SearchRequestError: If there's an issue with the search API request
+        """
+        # Use the first query or pick the best one if we implement a ranking system
+        query = self._build_queries(keywords)[0]
+        url = self.serp_provider.build_search_url(query, limit)
         
         try:
-            response = requests.get(url, timeout=30)
+            response = self.session.get(url, timeout=settings.SEARCH_TIMEOUT)
             if response.status_code != 200:
                 raise SearchRequestError(f"SERP API request failed with status code {response.status_code}: {response.text}")
             
-            data = response.json()
+            papers = self.serp_provider.parse_results(response.json(), limit)
             
-            # Process the results
-            papers = []
-            if "organic_results" in data:
-                for result in data["organic_results"][:limit]:
-                    paper = {
-                        "title": result.get("title", ""),
-                        "snippet": result.get("snippet", ""),
-                        "url": result.get("link", ""),
-                        "authors": [],
-                        "year": "",
-                        "publication": "",
-                        "citation_count": result.get("cited_by", {}).get("value", 0)
-                    }
-                    
-                    # Extract publication info if available
-                    pub_info = result.get("publication_info", {})
-                    if pub_info:
-                        # Handle authors
-                        authors = pub_info.get("authors", [])
-                        if isinstance(authors, list):
-                            # Ensure each author is a string
-                            author_list = []
-                            for author in authors:
-                                if isinstance(author, dict):
-                                    # If author is a dictionary, try to get name
-                                    if 'name' in author:
-                                        author_list.append(author['name'])
-                                    else:
-                                        # Use the first value in the dict or stringify the dict
-                                        author_list.append(str(next(iter(author.values()))) if author else "Unknown")
-                                else:
-                                    # If author is already a string or other type, just convert to string
-                                    author_list.append(str(author))
-                            paper["authors"] = author_list
-                        elif isinstance(authors, str):
-                            paper["authors"] = [authors]
-                        else:
-                            # Fallback for any other type
-                            paper["authors"] = [str(authors)]
-                            
-                        # Handle year and publication
-                        paper["year"] = pub_info.get("year", "")
-                        paper["publication"] = pub_info.get("summary", "")
-                    
-                    papers.append(paper)
-                    
-                    # If snippet is very short, try to fetch abstract from paper URL
-                    if len(paper["snippet"]) < 100 and paper["url"]:
-                        try:
-                            paper_details = self.fetch_paper_details(paper["url"])
-                            if paper_details and "abstract" in paper_details:
-                                paper["snippet"] = paper_details["abstract"]
-                        except Exception:
-                            pass
+            # If snippet is very short, try to fetch abstract from paper URL
+            for paper in papers:
+                if self._needs_details(paper):
+                    try:
+                        paper_details = self.fetch_paper_details(paper["url"])
+                        if paper_details and "abstract" in paper_details:
+                            paper["snippet"] = paper_details["abstract"]
+                    except Exception:
+                        pass
             
             return papers
         except requests.RequestException as e:
             raise SearchRequestError(f"Request to SERP API failed: {str(e)}")
     
+    async def search_papers_async(self, keywords: List[str], limit: int = 5, enrich: bool = True) -> List[Dict[str, Any]]:
+        """
+        Search for academic papers through the configured provider without blocking the event loop.
+        
+        The local paper store is searched first; the search provider (SERP API
+        by default) is only called when the store has fewer than
+        LOCAL_SEARCH_MIN_RESULTS papers covering the keywords. All query
+        variants are then issued concurrently and their results fused into a
+        single ranking, so recall improves at the latency of one search call.
+        Papers returned by the provider are added to the local store.
+        
+        Args:
+            keywords: List of keywords to search for
+            limit: Maximum number of papers to return
+            enrich: Whether to fetch abstracts for short snippets and store the
+                papers; callers passing False should call `enrich_papers` and
+                `remember_papers` themselves
+            
+        Returns:
+            List of papers as dictionaries
+            
+        Raises:
+            SearchRequestError: If every search query fails
+        """
+        local_papers = await self._search_local(keywords, limit)
+        if local_papers is not None:
+            return await self.enrich_papers(local_papers) if enrich else local_papers
+        
+        queries = self._build_queries(keywords)
+        if not settings.SEARCH_MULTI_QUERY:
+            queries = queries[:1]
+        
+        responses = await asyncio.gather(
+            *(self.provider.search(query, limit) for query in queries), return_exceptions=True
+        )
+        result_lists = [response for response in responses if not isinstance(response, BaseException)]
+        errors = [response for response in responses if isinstance(response, BaseException)]
+        
+        if not result_lists:
+            raise errors[0]
+        for error in errors:
+            logger.warning(f"Search query variant failed, using the remaining results: {str(error)}")
+        
+        papers = self.fuse_results(result_lists, limit)
+        
+        # If snippet is very short, try to fetch abstract from paper URL
+        if enrich:
+            papers = await self.enrich_papers(papers)
+            await self.remember_papers(papers)
+        return papers
+    
+    async def remember_papers(self, papers: List[Dict[str, Any]]) -> None:
+        """
+        Add papers to the local paper store, if enabled.
+        
+        Args:
+            papers: Papers returned by search, ideally after enrichment
+        """
+        if self.paper_store is not None:
+            await asyncio.to_thread(self.paper_store.add, papers)
+    
+    async def _search_local(self, keywords: List[str], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a search from the local paper store when it has enough matches.
+        
+        Args:
+            keywords: List of keywords to search for
+            limit: Maximum number of papers to return
+            
+        Returns:
+            List of papers, or None if the search provider should be queried instead
+        """
+        if self.paper_store is None:
+            return None
+        
+        min_results = min(limit, settings.LOCAL_SEARCH_MIN_RESULTS)
+        # The BM25 scan is CPU-bound, so keep it off the event loop
+        papers = await asyncio.to_thread(
+            self.paper_store.search,
+            " ".join(keywords),
+            limit,
+            min_coverage=settings.LOCAL_SEARCH_MIN_COVERAGE,
+            min_results=min_results,
+        )
+        if len(papers) < min_results:
+            return None
+        
+        logger.info(f"Answered search for {keywords} from the local paper store")
+        return papers
+    
+    def fuse_results(self, result_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+        """
+        Merge ranked result lists into one deduplicated ranking.
+        
+        Papers are matched across lists by normalized title or URL. Each paper
+        scores the sum of 1 / (k + rank) over the lists it appears in
+        (reciprocal rank fusion) plus a bonus for log-scaled citation count.
+        
+        Args:
+            result_lists: Result lists, each ordered best first
+            limit: Maximum number of papers to return
+            
+        Returns:
+            The top `limit` papers, best first
+        """
+        groups: List[Dict[str, Any]] = []
+        group_by_key: Dict[str, int] = {}
+        
+        for results in result_lists:
+            for rank, paper in enumerate(results, 1):
+                keys = [key for key in (self._title_key(paper), self._url_key(paper)) if key]
+                group_index = next((group_by_key[key] for key in keys if key in group_by_key), None)
+                
+                if group_index is None:
+                    group_index = len(groups)
+                    groups.append({"paper": dict(paper), "rrf": 0.0})
+                else:
+                    # Keep the richest version of a paper seen in several lists
+                    best = groups[group_index]["paper"]
+                    if len(paper.get("snippet", "")) > len(best.get("snippet", "")):
+                        best["snippet"] = paper["snippet"]
+                    best["citation_count"] = max(best.get("citation_count", 0), paper.get("citation_count", 0))
+                
+                for key in keys:
+                    group_by_key.setdefault(key, group_index)
+                groups[group_index]["rrf"] += 1.0 / (settings.SEARCH_FUSION_RRF_K + rank)
+        
+        max_citations = max((group["paper"].get("citation_count", 0) or 0 for group in groups), default=0)
+        
+        def fusion_score(group: Dict[str, Any]) -> float:
+            citations = group["paper"].get("citation_count", 0) or 0
+            citation_bonus = math.log1p(citations) / math.log1p(max_citations) if max_citations > 0 else 0.0
+            return group["rrf"] + settings.SEARCH_FUSION_CITATION_WEIGHT * citation_bonus
+        
+        # sorted() is stable, so ties keep first-seen order
+        ranked = sorted(groups, key=fusion_score, reverse=True)
+        return [group["paper"] for group in ranked[:limit]]
+    
+    @staticmethod
+    def _title_key(paper: Dict[str, Any]) -> str:
+        """Normalized title used to recognise the same paper across result lists."""
+        return " ".join(re.sub(r"[^a-z0-9]+", " ", paper.get("title", "").lower()).split())
+    
+    @staticmethod
+    def _url_key(paper: Dict[str, Any]) -> str:
+        """Normalized URL used to recognise the same paper across result lists."""
+        url = paper.get("url", "").strip().lower()
+        if not url:
+            return ""
+        url = re.sub(r"^https?://(www\.)?", "", url)
+        return url.split("#")[0].rstrip("/")
+    
     def fetch_paper_details(self, url: str) -> Dict[str, Any]:
         """
         Attempt to fetch additional details about a paper from its URL.
@@ -125,28 +371,128 @@ class SearchService:
             Dictionary with additional details like abstract
         """
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            response = requests.get(url, headers=headers, timeout=5)
-            
-            if response.status_code == 200:
-                text = response.text
+            with self.session.get(
+                url, headers=PAPER_FETCH_HEADERS, timeout=settings.PAPER_FETCH_TIMEOUT, stream=True
+            ) as response:
+                if response.status_code != 200 or not is_html_content_type(response.headers.get("content-type")):
+                    return {}
                 
-                # Try to find abstract
-                abstract = ""
-                abstract_markers = ["abstract", "summary", "overview"]
-                for marker in abstract_markers:
-                    if marker in text.lower():
-                        start_idx = text.lower().find(marker)
-                        # Extract ~500 chars after the marker as a simple heuristic
-                        potential_abstract = text[start_idx:start_idx+500]
-                        if len(potential_abstract) > 100:  # Only use if substantial
-                            abstract = potential_abstract
-                            break
-                
-                return {"abstract": abstract} if abstract else {}
-            
+                extractor = AbstractExtractor()
+                decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+                received = 0
+                for chunk in response.iter_content(chunk_size=PAPER_FETCH_CHUNK_SIZE):
+                    extractor.feed(decoder.decode(chunk))
+                    received += len(chunk)
+                    if extractor.done or received >= settings.ABSTRACT_MAX_BYTES:
+                        break
+                return self._abstract_details(extractor)
+        except Exception:
             return {}
+    
+    async def enrich_papers(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Replace short snippets with abstracts fetched from the paper pages.
+        
+        Fetches run concurrently under one overall deadline (ENRICH_DEADLINE);
+        any that have not finished by then are cancelled and the paper keeps
+        its original snippet.
+        
+        Args:
+            papers: List of paper dictionaries, updated in place
+            
+        Returns:
+            The same papers
+        """
+        targets = [paper for paper in papers if self._needs_details(paper)]
+        if not targets:
+            return papers
+        
+        async def enrich(paper: Dict[str, Any]) -> None:
+            paper_details = await self.fetch_paper_details_async(paper["url"])
+            if paper_details and "abstract" in paper_details:
+                paper["snippet"] = paper_details["abstract"]
+        
+        tasks = [asyncio.create_task(enrich(paper)) for paper in targets]
+        _, pending = await asyncio.wait(tasks, timeout=settings.ENRICH_DEADLINE)
+        if pending:
+            logger.info(f"Skipped {len(pending)} abstract fetch(es) that missed the {settings.ENRICH_DEADLINE}s deadline")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        return papers
+    
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent page fetches to the URL's host."""
+        host = urlsplit(url).hostname or ""
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, settings.ENRICH_PER_HOST_CONCURRENCY))
+            self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    @observe_latency("fetch_paper_details")
+    async def fetch_paper_details_async(self, url: str) -> Dict[str, Any]:
+        """
+        Attempt to fetch additional details about a paper from its URL without blocking.
+        
+        The page is streamed through an incremental parser and the download
+        stops as soon as a definitive abstract has been found or
+        ABSTRACT_MAX_BYTES have been read; non-HTML responses such as PDFs are
+        not downloaded at all.
+        
+        Results are cached per URL, including pages without a usable abstract,
+        so a paper page is only downloaded once. Transient failures are not cached.
+        
+        Args:
+            url: Paper URL
+            
+        Returns:
+            Dictionary with additional details like abstract
+        """
+        cache_key = make_cache_key("abstract", url)
+        if self.abstract_cache is not None:
+            cached = await self.abstract_cache.aget(cache_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            async with self._host_semaphore(url):
+                async with self.client.stream(
+                    "GET", url, headers=PAPER_FETCH_HEADERS, timeout=settings.PAPER_FETCH_TIMEOUT, follow_redirects=True
+                ) as response:
+                    if response.status_code == 200:
+                        paper_details = await self._read_abstract(response)
+                    elif response.status_code in (404, 410):
+                        paper_details = {}
+                    else:
+                        return {}
         except Exception:
-            return {}
\ No newline at end of file
+            return {}
+        
+        if self.abstract_cache is not None:
+            await self.abstract_cache.aset(cache_key, paper_details)
+        return paper_details
+    
+    async def _read_abstract(self, response: httpx.Response) -> Dict[str, Any]:
+        """
+        Stream a paper page into the abstract extractor, stopping early.
+        
+        Args:
+            response: Open streaming response with status 200
+            
+        Returns:
+            Dictionary with the abstract, or an empty dictionary
+        """
+        if not is_html_content_type(response.headers.get("content-type")):
+            return {}
+        
+        extractor = AbstractExtractor()
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+        received = 0
+        async for chunk in response.aiter_bytes(PAPER_FETCH_CHUNK_SIZE):
+            extractor.feed(decoder.decode(chunk))
+            received += len(chunk)
+            if extractor.done or received >= settings.ABSTRACT_MAX_BYTES:
+                break
+        return self._abstract_details(extractor)
@@ -0,0 +1,539 @@
+# app/services/semantic_cache.py
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from array import array
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy only speeds up search
+    np = None
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Function words that say nothing about what a claim is about. Negations are
+# deliberately kept: "X causes Y" and "X does not cause Y" must not look alike.
+EMBEDDING_STOPWORDS = frozenset([
+    "a", "an", "the", "and", "or", "of", "in", "on", "to", "for", "with", "by", "is", "are",
+    "was", "were", "be", "been", "it", "its", "that", "this", "these", "those", "as", "at",
+    "from", "do", "does", "did", "has", "have", "had", "can", "will", "would", "may", "might",
+])
+
+NEGATION_WORDS = frozenset([
+    "not", "no", "never", "none", "nor", "cannot", "without", "neither",
+    "isn", "aren", "wasn", "weren", "doesn", "don", "didn", "won", "can't", "nothing",
+])
+
+# Words that set which way a claim points: "X increases Y" and "X decreases Y"
+# embed almost identically but must never share a verdict
+DIRECTION_ROOTS = (
+    "increase", "decrease", "raise", "reduce", "lower", "improve", "worsen", "prevent", "cause",
+    "protect", "harm", "boost", "damage", "promote", "inhibit", "slow", "speed", "help", "hurt",
+)
+DIRECTION_WORDS = frozenset(
+    [root + suffix for root in DIRECTION_ROOTS for suffix in ("", "s", "d" if root.endswith("e") else "ed")]
+    + [root[:-1] + "ing" if root.endswith("e") else root + "ing" for root in DIRECTION_ROOTS]
+    + ["more", "less", "fewer", "higher", "greater", "better", "worse", "longer", "shorter", "faster", "slower"]
+)
+
+# Weight of adjacent word pairs relative to single words in the hashed embedding
+BIGRAM_WEIGHT = 0.5
+
+
+def _terms(text: str) -> List[str]:
+    """Lower-cased word terms with a light plural strip, stopwords removed."""
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in EMBEDDING_STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def has_negation(text: str) -> bool:
+    """
+    Whether a claim is phrased negatively.
+    
+    Args:
+        text: Claim text
+        
+    Returns:
+        True if the claim contains a negation word or a "n't" contraction
+    """
+    lowered = text.lower()
+    return "n't" in lowered or any(word in NEGATION_WORDS for word in re.findall(r"[a-z']+", lowered))
+
+
+def direction_words(text: str) -> frozenset:
+    """Direction words (increase/decrease, more/less, prevent/cause, ...) used in a claim."""
+    return frozenset(word for word in re.findall(r"[a-z]+", text.lower()) if word in DIRECTION_WORDS)
+
+
+def same_meaning(first: str, second: str, lexical: bool) -> bool:
+    """
+    Whether two similar claims are safe to give the same verdict.
+    
+    Both must agree on negation and on their direction words. With a lexical
+    embedder, whose similarity says little about meaning, they must also use
+    exactly the same content words, so only rewordings such as reordering or
+    different function words qualify.
+    
+    Args:
+        first: Claim text
+        second: Claim text
+        lexical: Whether the similarity came from a bag-of-words embedder
+        
+    Returns:
+        True if a result for one claim may be served for the other
+    """
+    if has_negation(first) != has_negation(second) or direction_words(first) != direction_words(second):
+        return False
+    return not lexical or set(_terms(first)) == set(_terms(second))
+
+
+class ClaimEmbedder:
+    """Interface for turning claim text into unit-length vectors."""
+    
+    name = "embedder"
+    dim = 0
+    # Similarity reflects shared words rather than meaning
+    lexical = False
+    
+    def embed(self, text: str) -> List[float]:
+        """
+        Embed a claim.
+        
+        Args:
+            text: Claim text
+            
+        Returns:
+            Vector of length `dim` with unit L2 norm (all zeros for empty text)
+        """
+        raise NotImplementedError
+
+
+class HashedTermEmbedder(ClaimEmbedder):
+    """
+    Dependency-free embedder using the hashing trick.
+    
+    Words and adjacent word pairs are hashed into a fixed number of signed
+    buckets with sublinear term frequency weights. There is no corpus IDF:
+    vectors must stay comparable as the index grows, and stopword removal
+    already drops the words an IDF would down-weight most.
+    """
+    
+    name = "hashed"
+    lexical = True
+    
+    def __init__(self, dim: int):
+        """
+        Initialize the embedder.
+        
+        Args:
+            dim: Number of hash buckets
+        """
+        self.dim = max(16, dim)
+    
+    def embed(self, text: str) -> List[float]:
+        terms = _terms(text)
+        features = [(term, 1.0) for term in terms]
+        features += [(f"{first} {second}", BIGRAM_WEIGHT) for first, second in zip(terms, terms[1:])]
+        
+        counts: Dict[str, int] = {}
+        for feature, _ in features:
+            counts[feature] = counts.get(feature, 0) + 1
+        
+        vector = [0.0] * self.dim
+        for feature, weight in dict(features).items():
+            # crc32 is stable across processes, unlike hash()
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dim] += sign * weight * (1.0 + math.log(counts[feature]))
+        return _normalize(vector)
+
+
+class SentenceTransformerEmbedder(ClaimEmbedder):
+    """Local CPU embedding model from the optional sentence-transformers package."""
+    
+    name = "sentence-transformers"
+    
+    def __init__(self, model_name: str):
+        """
+        Load the embedding model.
+        
+        Args:
+            model_name: sentence-transformers model name or path
+            
+        Raises:
+            ImportError: If sentence-transformers is not installed
+        """
+        from sentence_transformers import SentenceTransformer
+        
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model_name}"
+    
+    def embed(self, text: str) -> List[float]:
+        return [float(value) for value in self.model.encode(text, normalize_embeddings=True)]
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length, leaving the zero vector alone."""
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm > 0 else vector
+
+
+def create_embedder(name: str, dim: int, model_name: str) -> ClaimEmbedder:
+    """
+    Create a claim embedder by name.
+    
+    Args:
+        name: "hashed" or "sentence-transformers"
+        dim: Number of buckets, used by the hashed embedder
+        model_name: Model to load, used by the sentence-transformers embedder
+        
+    Returns:
+        The embedder; falls back to the hashed embedder if sentence-transformers
+        is requested but not installed
+        
+    Raises:
+        ValueError: If the embedder name is unknown
+    """
+    if name == "hashed":
+        return HashedTermEmbedder(dim)
+    if name == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except ImportError:
+            logger.warning("sentence-transformers is not installed, using the hashed claim embedder")
+            return HashedTermEmbedder(dim)
+    raise ValueError(f"Unknown claim embedder: {name}")
+
+
+class VectorIndex:
+    """
+    Flat nearest-neighbour index over unit vectors, stored in one float32 array.
+    
+    Rows are appended to `<path>.vec` (raw float32) and their metadata to
+    `<path>.jsonl`, so adds are incremental and loading is a single read of
+    each file. Re-adding an id supersedes its earlier row, and beyond
+    `max_entries` the oldest rows are evicted. Once dead rows outnumber live
+    ones the index is compacted and its files rewritten.
+    """
+    
+    def __init__(self, dim: int, embedder_name: str, path: str = "", max_entries: int = 0):
+        """
+        Initialize the index, loading any rows already on disk.
+        
+        Args:
+            dim: Vector length
+            embedder_name: Identity of the embedder; rows written by a
+                different embedder are discarded on load
+            path: File prefix for persistence; empty keeps the index in memory
+            max_entries: Maximum number of rows kept; 0 or less means unlimited
+        """
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self.path = path
+        self.max_entries = max_entries
+        self._vectors = array("f")
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._vector_file = None
+        self._metadata_file = None
+        
+        if path:
+            self._load()
+    
+    def __len__(self) -> int:
+        return len(self._row_by_id)
+    
+    def _load(self) -> None:
+        """Read persisted rows, or start fresh files if they are missing or stale."""
+        vector_path, metadata_path = f"{self.path}.vec", f"{self.path}.jsonl"
+        header = {"embedder": self.embedder_name, "dim": self.dim}
+        
+        lines: List[str] = []
+        if os.path.exists(vector_path) and os.path.exists(metadata_path):
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            try:
+                if not lines or json.loads(lines[0]) != header:
+                    lines = []
+            except ValueError:
+                lines = []
+        
+        if not lines:
+            # Missing or stale files: start over
+            self._open_files("w")
+            return
+        
+        # Metadata line n + 1 describes vector row n; rows keep their place even when a line is unreadable
+        row_bytes = self._vectors.itemsize * self.dim
+        vector_count = os.path.getsize(vector_path) // row_bytes
+        stored = array("f")
+        with open(vector_path, "rb") as f:
+            stored.fromfile(f, vector_count * self.dim)
+        
+        latest: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for row, line in enumerate(lines[1:vector_count + 1]):
+            try:
+                metadata = json.loads(line)
+            except ValueError:
+                # A torn line from an interrupted write
+                continue
+            if isinstance(metadata, dict) and "id" in metadata:
+                latest.pop(metadata["id"], None)
+                latest[metadata["id"]] = (row, metadata)
+        for row, metadata in latest.values():
+            self._vectors.extend(stored[row * self.dim:(row + 1) * self.dim])
+            self._add_row(metadata)
+        self._evict()
+        logger.info(f"Loaded {len(self)} claim vectors from {vector_path}")
+        
+        if len(self) == len(lines) - 1 == vector_count:
+            self._open_files("a")
+        else:
+            # Unreadable, superseded, evicted or unmatched rows: rewrite the files with the rows that survived
+            logger.warning(f"Rewriting {vector_path}: kept {len(self)} of {len(lines) - 1} rows")
+            self._compact()
+    
+    def _open_files(self, mode: str) -> None:
+        """Open the index files for appending ("a") or start them over with just a header ("w")."""
+        vector_path, metadata_path = f"{self.path}.vec", f"{self.path}.jsonl"
+        self._vector_file = open(vector_path, mode + "b")
+        self._metadata_file = open(metadata_path, mode, encoding="utf-8")
+        if mode == "w":
+            self._metadata_file.write(json.dumps({"embedder": self.embedder_name, "dim": self.dim}) + "\n")
+            self._metadata_file.flush()
+    
+    def _add_row(self, metadata: Dict[str, Any]) -> None:
+        """Register the metadata of the newest row, superseding an older row with the same id."""
+        previous = self._row_by_id.pop(metadata["id"], None)
+        if previous is not None:
+            self._metadata[previous] = None
+        # Re-inserting keeps `_row_by_id` ordered oldest first, which eviction relies on
+        self._row_by_id[metadata["id"]] = len(self._metadata)
+        self._metadata.append(metadata)
+    
+    def _evict(self) -> None:
+        """Drop the oldest rows while over `max_entries`."""
+        while self.max_entries > 0 and len(self._row_by_id) > self.max_entries:
+            oldest = next(iter(self._row_by_id))
+            self._metadata[self._row_by_id.pop(oldest)] = None
+    
+    def _compact(self) -> None:
+        """Remove superseded and evicted rows, rewriting the files with the live rows."""
+        vectors = array("f")
+        live = []
+        for row, metadata in enumerate(self._metadata):
+            if metadata is not None:
+                vectors.extend(self._vectors[row * self.dim:(row + 1) * self.dim])
+                live.append(metadata)
+        self._vectors = vectors
+        self._metadata = []
+        self._row_by_id = {}
+        for metadata in live:
+            self._add_row(metadata)
+        
+        if self.path:
+            self.close()
+            self._open_files("w")
+            self._vectors.tofile(self._vector_file)
+            self._vector_file.flush()
+            self._metadata_file.writelines(json.dumps(metadata) + "\n" for metadata in self._metadata)
+            self._metadata_file.flush()
+    
+    def add(self, vector: List[float], metadata: Dict[str, Any]) -> None:
+        """
+        Append a vector.
+        
+        Args:
+            vector: Unit vector of length `dim`
+            metadata: JSON-serializable metadata including a unique "id"
+        """
+        row = array("f", vector)
+        self._vectors.extend(row)
+        self._add_row(metadata)
+        if self._vector_file is not None:
+            row.tofile(self._vector_file)
+            self._vector_file.flush()
+            self._metadata_file.write(json.dumps(metadata) + "\n")
+            self._metadata_file.flush()
+        
+        self._evict()
+        if len(self._metadata) - len(self._row_by_id) > len(self._row_by_id):
+            self._compact()
+    
+    def search(self, vector: List[float], k: int = 1) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find the rows most similar to a vector.
+        
+        Args:
+            vector: Unit query vector of length `dim`
+            k: Number of neighbours to return
+            
+        Returns:
+            (cosine similarity, metadata) pairs, most similar first
+        """
+        if not self._metadata:
+            return []
+        
+        if np is not None:
+            matrix = np.frombuffer(self._vectors, dtype=np.float32).reshape(-1, self.dim)
+            scores = (matrix @ np.asarray(vector, dtype=np.float32)).tolist()
+        else:
+            # Hashed claim vectors are sparse, so only visit the query's non-zero buckets
+            nonzero = [(i, value) for i, value in enumerate(vector) if value]
+            vectors, dim = self._vectors, self.dim
+            scores = [
+                sum(value * vectors[offset + i] for i, value in nonzero)
+                for offset in range(0, len(vectors), dim)
+            ]
+        
+        ranked = sorted(
+            ((score, row) for row, score in enumerate(scores) if self._metadata[row] is not None), reverse=True
+        )
+        return [(score, self._metadata[row]) for score, row in ranked[:k]]
+    
+    def close(self) -> None:
+        """Close the index files."""
+        for f in (self._vector_file, self._metadata_file):
+            if f is not None:
+                f.close()
+        self._vector_file = self._metadata_file = None
+
+
+class SemanticClaimCache:
+    """
+    Finds previously checked claims that are paraphrases of a new one.
+    
+    A neighbour above `result_threshold` that `same_meaning` accepts may
+    reuse the stored result outright; one above `evidence_threshold` may
+    reuse its keywords, and through the search cache its papers, while the
+    analysis is redone for the new wording. With the hashed embedder that
+    means results are only reused for rewordings of the same content words;
+    paraphrases get their evidence reused.
+    
+    Async callers use `match` and `aadd`, which embed and scan the index in a
+    worker thread and keep the hit counters.
+    """
+    
+    def __init__(
+        self, embedder: ClaimEmbedder, index: VectorIndex, result_threshold: float, evidence_threshold: float
+    ):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            embedder: Claim embedder
+            index: Vector index built with the same embedder
+            result_threshold: Minimum similarity to reuse a stored result
+            evidence_threshold: Minimum similarity to reuse keywords and papers
+        """
+        self.embedder = embedder
+        self.index = index
+        self.result_threshold = result_threshold
+        self.evidence_threshold = evidence_threshold
+        self.hits = 0
+        self.evidence_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def lookup(self, claim: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Find the closest stored claim.
+        
+        Args:
+            claim: Normalized claim text
+            
+        Returns:
+            Tuple of (metadata whose result may be reused, metadata whose
+            evidence may be reused); either may be None
+        """
+        vector = self.embedder.embed(claim)
+        with self._lock:
+            neighbours = self.index.search(vector, k=1)
+        if not neighbours:
+            return None, None
+        
+        score, metadata = neighbours[0]
+        if score >= self.result_threshold and same_meaning(claim, metadata["id"], self.embedder.lexical):
+            logger.info(f"Semantic cache match ({score:.2f}) for '{claim}': '{metadata['id']}'")
+            return metadata, metadata
+        if score >= self.evidence_threshold:
+            logger.info(f"Reusing evidence of '{metadata['id']}' ({score:.2f}) for '{claim}'")
+            return None, metadata
+        return None, None
+    
+    async def match(
+        self, claim: str, load_result: Callable[[str], Awaitable[Optional[Any]]]
+    ) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+        """
+        Find a reusable result or reusable evidence for a claim, counting the outcome.
+        
+        Args:
+            claim: Normalized claim text
+            load_result: Loads the stored result for a matched result key;
+                returns None if it is gone
+            
+        Returns:
+            Tuple of (reused result, metadata whose evidence may be reused);
+            when a result is reused the metadata is its match
+        """
+        result_match, evidence_match = await asyncio.to_thread(self.lookup, claim)
+        if result_match is not None:
+            result = await load_result(result_match["key"])
+            if result is not None:
+                self.hits += 1
+                return result, result_match
+        if evidence_match is not None:
+            self.evidence_hits += 1
+            return None, evidence_match
+        self.misses += 1
+        return None, None
+    
+    async def aadd(self, claim: str, metadata: Dict[str, Any]) -> None:
+        """Remember a checked claim from async code, embedding and writing it in a worker thread."""
+        await asyncio.to_thread(self.add, claim, metadata)
+    
+    def add(self, claim: str, metadata: Dict[str, Any]) -> None:
+        """
+        Remember a checked claim.
+        
+        Args:
+            claim: Normalized claim text, used as the row id
+            metadata: JSON-serializable data to return on later matches
+        """
+        vector = self.embedder.embed(claim)
+        with self._lock:
+            self.index.add(vector, dict(metadata, id=claim))
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Match counters since startup.
+        
+        Returns:
+            Dictionary with "hits" (results reused), "evidence_hits", "misses" and "claims"
+        """
+        return {
+            "hits": self.hits,
+            "evidence_hits": self.evidence_hits,
+            "misses": self.misses,
+            "claims": len(self.index),
+        }
+    
+    def close(self) -> None:
+        """Close the index files."""
+        with self._lock:
+            self.index.close()
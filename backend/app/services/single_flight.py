@@ -0,0 +1,92 @@
+# app/services/single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.core.exceptions import PipelineTimeoutError
+from app.core.resilience import deadline_scope, no_deadline, remaining_time
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one in-flight computation.
+    
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result (or exception) instead of repeating it.
+    
+    The work runs without the first caller's deadline, so it cannot impose a
+    short budget on the others; each caller instead stops waiting at its own,
+    and the work is cancelled once no caller is left waiting. It therefore
+    lasts until the latest deadline among its waiters, and never longer than
+    `max_duration`.
+    """
+    
+    def __init__(self, max_duration: Optional[float] = None):
+        """
+        Initialize with no calls in flight.
+        
+        Args:
+            max_duration: Deadline in seconds for each shared call, if any
+        """
+        self.max_duration = max_duration
+        self._calls: Dict[str, "asyncio.Task"] = {}
+        self._waiters: Dict["asyncio.Task", int] = {}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` once for all concurrent callers with the same key.
+        
+        Args:
+            key: Identifies equivalent calls
+            fn: Zero-argument coroutine function producing the result
+            
+        Returns:
+            The shared result of `fn`
+            
+        Raises:
+            PipelineTimeoutError: If the caller's deadline passes before the result is ready
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_shared(fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield so one caller disconnecting or timing out doesn't cancel the work for the others
+            remaining = remaining_time()
+            if remaining is None:
+                return await asyncio.shield(task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), max(0.0, remaining))
+            except asyncio.TimeoutError:
+                raise PipelineTimeoutError("Deadline passed while waiting for a shared call")
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                # Nobody is waiting for the result any more
+                if not task.done():
+                    task.cancel()
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+    
+    async def _run_shared(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run the shared work in its own task, free of the caller's deadline but within `max_duration`."""
+        with no_deadline(), deadline_scope(self.max_duration):
+            return await fn()
+    
+    def _forget(self, key: str, task: "asyncio.Task") -> None:
+        """Drop a finished call so later callers start fresh work."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+    
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
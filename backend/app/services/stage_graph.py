@@ -0,0 +1,172 @@
+# app/services/stage_graph.py
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.exceptions import PipelineTimeoutError
+from app.core.metrics import PIPELINE_STAGE_DEGRADED, PIPELINE_STAGE_LATENCY
+from app.core.resilience import deadline_scope, remaining_time
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Stage body: receives the results of the stages it depends on, keyed by stage name
+StageFunction = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+# Stage fallback: receives the same results and the error, returns (or awaits) a degraded result
+StageFallback = Callable[[Dict[str, Any], Exception], Any]
+
+
+class Stage:
+    """A named pipeline step with dependencies, a timeout and an optional fallback."""
+    
+    def __init__(
+        self,
+        name: str,
+        run: StageFunction,
+        depends_on: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        reserve: float = 0.0,
+        fallback: Optional[StageFallback] = None,
+    ):
+        """
+        Initialize a stage.
+        
+        Args:
+            name: Unique stage name; its result is stored under this key
+            run: Coroutine function computing the stage result
+            depends_on: Names of the stages that must finish first
+            timeout: Maximum seconds the stage may run, if any
+            reserve: Seconds of the overall deadline kept back for later stages
+            fallback: Produces a degraded result when the stage fails or times
+                out, and may itself re-raise; without one, the error ends the
+                whole run. Timeouts are passed to it as PipelineTimeoutError.
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = depends_on or []
+        self.timeout = timeout
+        self.reserve = reserve
+        self.fallback = fallback
+
+
+class StageGraph:
+    """
+    Runs a DAG of stages as early as their dependencies allow, under one deadline.
+    
+    Independent stages run concurrently. Each stage gets the smaller of its
+    own timeout and the time left before the deadline (minus its reserve);
+    when it fails or runs out of time its fallback result is used instead, or
+    the run is aborted if it has none.
+    """
+    
+    def __init__(self, stages: List[Stage]):
+        """
+        Initialize the graph.
+        
+        Args:
+            stages: Stages to run
+            
+        Raises:
+            ValueError: If names are duplicated, a dependency is unknown or the graph has a cycle
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names")
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+        self._check_acyclic()
+        
+        # Names of the stages whose fallback was used in the last run
+        self.degraded: List[str] = []
+    
+    def _check_acyclic(self) -> None:
+        """Raise ValueError if the dependencies form a cycle."""
+        remaining = {name: set(stage.depends_on) for name, stage in self.stages.items()}
+        while remaining:
+            ready = [name for name, dependencies in remaining.items() if not dependencies]
+            if not ready:
+                raise ValueError(f"Stage dependency cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+    
+    async def run(self, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run every stage.
+        
+        Args:
+            deadline: Overall time budget in seconds, if any; a shorter
+                deadline set by the caller's `deadline_scope` wins
+            
+        Returns:
+            Mapping of stage name to result
+            
+        Raises:
+            PipelineTimeoutError: If a stage without a fallback runs out of time
+            Exception: Whatever a stage without a fallback raised
+        """
+        caller_remaining = remaining_time()
+        if caller_remaining is not None:
+            deadline = caller_remaining if deadline is None else min(deadline, caller_remaining)
+        expires_at = time.monotonic() + deadline if deadline is not None else None
+        self.degraded = []
+        results: Dict[str, Any] = {}
+        durations: Dict[str, float] = {}
+        running: Dict[asyncio.Task, str] = {}
+        pending = dict(self.stages)
+        
+        try:
+            while pending or running:
+                for name in [name for name, stage in pending.items() if all(d in results for d in stage.depends_on)]:
+                    stage = pending.pop(name)
+                    task = asyncio.create_task(self._run_stage(stage, results, expires_at, durations))
+                    running[task] = name
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[running.pop(task)] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+        
+        logger.info("Stage timings: " + ", ".join(f"{name}={durations[name]:.2f}s" for name in durations))
+        return results
+    
+    async def _run_stage(
+        self, stage: Stage, results: Dict[str, Any], expires_at: Optional[float], durations: Dict[str, float]
+    ) -> Any:
+        """Run one stage within its time budget, falling back on failure."""
+        started = time.monotonic()
+        timeout = stage.timeout
+        if expires_at is not None:
+            remaining = max(0.0, expires_at - started - stage.reserve)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        
+        inputs = {name: results[name] for name in stage.depends_on}
+        try:
+            try:
+                # Outbound calls inside the stage see its budget as their deadline
+                with deadline_scope(timeout):
+                    return await asyncio.wait_for(stage.run(inputs), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise PipelineTimeoutError(f"Stage '{stage.name}' did not finish within {timeout:.1f}s")
+        except Exception as e:
+            if stage.fallback is None:
+                raise
+            logger.warning(f"Stage '{stage.name}' degraded: {str(e)}")
+            self.degraded.append(stage.name)
+            PIPELINE_STAGE_DEGRADED.labels(stage.name).inc()
+            result = stage.fallback(inputs, e)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            durations[stage.name] = time.monotonic() - started
+            PIPELINE_STAGE_LATENCY.labels(stage.name).observe(durations[stage.name])
@@ -0,0 +1,285 @@
+# benchmarks/run.py
+"""
+Load-test the fact-check API in-process against stubbed Gemini and SerpAPI.
+
+Run from the backend directory, e.g.:
+
+    python -m benchmarks.run --rps 1 5 10 --duration 30
+    python -m benchmarks.run --rps 5 --gemini-error-rate 0.05 --compare benchmarks/results/<earlier>.json
+
+Each RPS level starts a fresh pipeline, offers requests at a fixed rate
+(open loop, so a slow server does not slow the offered load down) and
+reports latency percentiles, throughput, error rate and external calls per
+claim. Results are written as JSON for comparison between commits.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# The stubs never look at the keys, but Settings requires them
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SERP_API_KEY", "benchmark")
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from app.services.fact_check_pipeline import FactCheckPipeline
+from app.services.llm_service import LLMService
+from app.services.search_service import SearchService
+from benchmarks.stubs import LatencyModel, StubService, StubTransport
+
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CLAIMS_FILE = os.path.join(os.path.dirname(BACKEND_DIR), "test_cases.txt")
+DEFAULT_RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Settings pointing at files; redirected to a scratch directory for every level
+PATH_SETTINGS = ("RESULT_CACHE_PATH", "ABSTRACT_CACHE_PATH", "PAPER_STORE_PATH", "SEMANTIC_CACHE_PATH")
+
+# Caches switched off by default so every request exercises the full pipeline
+CACHE_SETTINGS = (
+    "RESULT_CACHE_ENABLED",
+    "STAGE_CACHE_ENABLED",
+    "ABSTRACT_CACHE_ENABLED",
+    "PAPER_STORE_ENABLED",
+    "SEMANTIC_CACHE_ENABLED",
+)
+
+
+def read_claims(path: str) -> List[str]:
+    """Read the "- claim" lines of a test cases file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip()[1:].strip() for line in f if line.strip().startswith("-")]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of the values, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or "unknown" outside a git tree."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def send_claim(client: httpx.AsyncClient, claim: str, timeout: float) -> Dict[str, Any]:
+    """POST one claim and time it."""
+    started = time.perf_counter()
+    try:
+        response = await client.post(f"{settings.API_V1_STR}/fact-check", json={"claim": claim}, timeout=timeout)
+        status = str(response.status_code)
+    except Exception as e:
+        status = type(e).__name__
+    return {"status": status, "latency": time.perf_counter() - started}
+
+
+async def run_level(
+    rps: float, duration: float, claims: List[str], transport: StubTransport, timeout: float
+) -> Dict[str, Any]:
+    """
+    Offer load at one rate against a fresh pipeline.
+    
+    Args:
+        rps: Requests started per second
+        duration: Seconds over which requests are started
+        claims: Claims sent in turn
+        transport: Stub transport shared by the pipeline's clients
+        timeout: Client-side timeout per request in seconds
+        
+    Returns:
+        Summary of the level
+    """
+    llm_client = httpx.AsyncClient(transport=transport, timeout=settings.LLM_TIMEOUT)
+    search_client = httpx.AsyncClient(transport=transport, timeout=settings.SEARCH_TIMEOUT)
+    pipeline = FactCheckPipeline(
+        llm_service=LLMService(client=llm_client), search_service=SearchService(client=search_client)
+    )
+    app.state.fact_check_pipeline = pipeline
+    transport.reset()
+    
+    total = max(1, int(rps * duration))
+    tasks = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            for i in range(total):
+                await asyncio.sleep(max(0.0, started + i / rps - loop.time()))
+                tasks.append(asyncio.create_task(send_claim(client, claims[i % len(claims)], timeout)))
+            outcomes = await asyncio.gather(*tasks)
+            elapsed = loop.time() - started
+    finally:
+        app.state.fact_check_pipeline = None
+        await pipeline.aclose()
+        await llm_client.aclose()
+        await search_client.aclose()
+    
+    latencies = [outcome["latency"] for outcome in outcomes if outcome["status"] == "200"]
+    statuses = Counter(outcome["status"] for outcome in outcomes)
+    return {
+        "rps": rps,
+        "requests": total,
+        "succeeded": len(latencies),
+        "error_rate": round(1 - len(latencies) / total, 4),
+        "statuses": dict(statuses),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency": {
+            name: None if value is None else round(value, 4)
+            for name, value in (
+                ("p50", percentile(latencies, 0.50)),
+                ("p95", percentile(latencies, 0.95)),
+                ("p99", percentile(latencies, 0.99)),
+                ("max", max(latencies) if latencies else None),
+            )
+        },
+        "calls_per_claim": {service: round(count / total, 3) for service, count in sorted(transport.calls.items())},
+        "external_statuses": dict(transport.statuses),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print how each level moved relative to a baseline report."""
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    previous = {level["rps"]: level for level in baseline.get("levels", [])}
+    for level in report["levels"]:
+        before = previous.get(level["rps"])
+        if before is None:
+            print(f"  {level['rps']} rps: no baseline")
+            continue
+        changes = []
+        for name in ("p50", "p95", "p99"):
+            old, new = before["latency"].get(name), level["latency"].get(name)
+            if old and new:
+                changes.append(f"{name} {new - old:+.3f}s ({(new - old) / old:+.0%})")
+        changes.append(f"throughput {level['throughput'] - before['throughput']:+.2f}/s")
+        changes.append(f"error rate {level['error_rate'] - before['error_rate']:+.2%}")
+        calls_before = sum(before["calls_per_claim"].values())
+        calls_now = sum(level["calls_per_claim"].values())
+        changes.append(f"calls/claim {calls_now - calls_before:+.2f}")
+        print(f"  {level['rps']} rps: " + ", ".join(changes))
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    latency = level["latency"]
+    
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.3f}s"
+    
+    calls = ", ".join(f"{service}={count}" for service, count in level["calls_per_claim"].items())
+    print(
+        f"{level['rps']:>6} rps  n={level['requests']:<5} p50={fmt(latency['p50'])} p95={fmt(latency['p95'])} "
+        f"p99={fmt(latency['p99'])} throughput={level['throughput']:.2f}/s errors={level['error_rate']:.1%}  "
+        f"calls/claim: {calls}"
+    )
+
+
+def build_services(args: argparse.Namespace) -> Dict[str, StubService]:
+    return {
+        "gemini": StubService(
+            LatencyModel(args.gemini_latency, args.gemini_sigma), args.gemini_error_rate, (429, 503)
+        ),
+        "serpapi": StubService(LatencyModel(args.serp_latency, args.serp_sigma), args.serp_error_rate, (503,)),
+        "paper_page": StubService(LatencyModel(args.page_latency, args.page_sigma), args.page_error_rate, (404,)),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rps", type=float, nargs="+", default=[1.0, 5.0, 10.0], help="Offered load levels")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per level")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request")
+    parser.add_argument("--claims", default=DEFAULT_CLAIMS_FILE, help="Test cases file")
+    parser.add_argument("--caches", action="store_true", help="Keep the caches enabled as configured")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for stub latency and error sampling")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's info logs")
+    for service, latency, sigma in (("gemini", 0.8, 0.5), ("serp", 0.6, 0.4), ("page", 0.3, 0.6)):
+        parser.add_argument(f"--{service}-latency", type=float, default=latency, help=f"Median {service} latency")
+        parser.add_argument(f"--{service}-sigma", type=float, default=sigma, help=f"Log-normal sigma of {service} latency")
+        parser.add_argument(f"--{service}-error-rate", type=float, default=0.0, help=f"Fraction of {service} calls failing")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    
+    claims = read_claims(args.claims)
+    if not claims:
+        sys.exit(f"No claims found in {args.claims}")
+    
+    if not args.caches:
+        for name in CACHE_SETTINGS:
+            setattr(settings, name, False)
+    
+    services = build_services(args)
+    transport = StubTransport(services, seed=args.seed)
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "duration": args.duration,
+            "claims": len(claims),
+            "caches": args.caches,
+            "seed": args.seed,
+            "stubs": {name: service.to_dict() for name, service in services.items()},
+            "settings": {
+                name: getattr(settings, name)
+                for name in (
+                    "GEMINI_MODEL", "PAPER_SEARCH_LIMIT", "FINDINGS_CONCURRENCY", "FINDINGS_STRATEGY",
+                    "KEYWORD_STRATEGY", "SEARCH_MULTI_QUERY", "SPECULATIVE_SEARCH_ENABLED", "PIPELINE_DEADLINE",
+                )
+            },
+        },
+        "levels": [],
+    }
+    
+    for rps in args.rps:
+        with tempfile.TemporaryDirectory() as scratch:
+            for name in PATH_SETTINGS:
+                setattr(settings, name, os.path.join(scratch, os.path.basename(getattr(settings, name))))
+            level = await run_level(rps, args.duration, claims, transport, args.timeout)
+        report["levels"].append(level)
+        print_level(level)
+    
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{report['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+    
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+# benchmarks/stubs.py
+import asyncio
+import json
+import math
+import random
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+
+# Services the stub transport stands in for, named as in app.core.metrics
+SERVICES = ("gemini", "serpapi", "paper_page")
+
+
+class LatencyModel:
+    """Log-normal service latency, parameterized by its median."""
+    
+    def __init__(self, median: float, sigma: float = 0.0):
+        """
+        Initialize the latency model.
+        
+        Args:
+            median: Median latency in seconds
+            sigma: Standard deviation of the underlying normal; 0 gives a constant
+                latency, 0.5 puts the p95 at about 2.3x the median
+        """
+        self.median = median
+        self.sigma = sigma
+    
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        if self.median <= 0:
+            return 0.0
+        if self.sigma <= 0:
+            return self.median
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {"median": self.median, "sigma": self.sigma}
+
+
+class StubService:
+    """Latency and failure behaviour of one stubbed external service."""
+    
+    def __init__(self, latency: LatencyModel, error_rate: float = 0.0, error_statuses: Sequence[int] = (503,)):
+        """
+        Initialize the service behaviour.
+        
+        Args:
+            latency: Response latency model
+            error_rate: Fraction of requests answered with an error status
+            error_statuses: Statuses error responses are drawn from
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.to_dict(),
+            "error_rate": self.error_rate,
+            "error_statuses": list(self.error_statuses),
+        }
+
+
+class StubTransport(httpx.AsyncBaseTransport):
+    """
+    In-process stand-in for Gemini, SerpAPI and publisher pages.
+    
+    Answers with plausible, deterministic bodies after a sampled delay, and
+    fails a configurable fraction of requests, so the pipeline can be
+    load-tested without network access or API keys.
+    """
+    
+    def __init__(self, services: Dict[str, StubService], seed: Optional[int] = None):
+        """
+        Initialize the transport.
+        
+        Args:
+            services: Behaviour per service name ("gemini", "serpapi", "paper_page")
+            seed: Seed for latency and error sampling
+        """
+        self.services = services
+        self.rng = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.statuses: Counter = Counter()
+    
+    def reset(self) -> None:
+        """Clear the call and status counters."""
+        self.calls.clear()
+        self.statuses.clear()
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host.endswith("googleapis.com"):
+            service = "gemini"
+        elif host.endswith("serpapi.com"):
+            service = "serpapi"
+        else:
+            service = "paper_page"
+        behaviour = self.services[service]
+        self.calls[service] += 1
+        
+        await asyncio.sleep(behaviour.latency.sample(self.rng))
+        
+        if behaviour.error_rate > 0 and self.rng.random() < behaviour.error_rate:
+            status = self.rng.choice(behaviour.error_statuses)
+            self.statuses[f"{service}:{status}"] += 1
+            return httpx.Response(status, json={"error": {"code": status, "message": "Stubbed failure"}})
+        
+        self.statuses[f"{service}:200"] += 1
+        if service == "gemini":
+            await request.aread()
+            prompt = json.loads(request.content)["contents"][0]["parts"][0]["text"]
+            return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": gemini_reply(prompt)}]}}]})
+        if service == "serpapi":
+            return httpx.Response(200, json={"organic_results": serp_results(request.url.params.get("q", ""))})
+        return httpx.Response(200, text=paper_page(request.url.path), headers={"content-type": "text/html"})
+
+
+def gemini_reply(prompt: str) -> str:
+    """Answer a pipeline prompt in the format the pipeline asks for."""
+    if "key search terms" in prompt:
+        match = re.search(r'claim: "(.*?)"', prompt)
+        words = re.findall(r"[A-Za-z0-9-]{3,}", match.group(1) if match else prompt)
+        return ", ".join(words[:5])
+    
+    if "JSON array with one object per paper" in prompt:
+        numbers = sorted({int(n) for n in re.findall(r"PAPER (\d+)", prompt)}) or [1]
+        return json.dumps([
+            {"paper_number": n, "relevance": "High", "key_findings": f"Paper {n} reports no effect.", "position": "Refutes"}
+            for n in numbers
+        ])
+    
+    if "PAPER TITLE" in prompt:
+        return '```json\n{"relevance": "High", "key_findings": "The study reports no effect.", "position": "Refutes"}\n```'
+    
+    return json.dumps({
+        "assessment": "Refuted",
+        "explanation": "The stubbed evidence consistently refutes the claim.",
+        "paper_analyses": [{"paper_number": 1, "relation_to_claim": "Refutes the claim"}],
+    })
+
+
+def serp_results(query: str, count: int = 10) -> List[Dict[str, Any]]:
+    """Google Scholar style organic results for a query."""
+    slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:40]
+    return [
+        {
+            "title": f"{query.title()} study {i}",
+            "link": f"https://publisher{i % 3}.example.org/{slug}/{i}",
+            # Every other paper has only a short snippet, so enrichment fetches its page
+            "snippet": f"We studied {query} in a cohort. " * (6 if i % 2 else 1),
+            "publication_info": {"authors": [{"name": "A. Author"}], "summary": f"A. Author - Journal, {2000 + i}"},
+            "cited_by": {"value": 10 * i},
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def paper_page(path: str) -> str:
+    """Publisher landing page carrying a citation_abstract meta tag."""
+    abstract = f"Abstract of {path}. " + "The results show no significant effect in the studied population. " * 3
+    return f'<html><head><meta name="citation_abstract" content="{abstract}"></head><body><p>{abstract}</p></body></html>'
@@ -0,0 +1,135 @@
+# tests/conftest.py
+import asyncio
+import os
+import types
+
+import httpx
+import pytest
+
+# Settings requires the API keys; the tests never call the real services
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("SERP_API_KEY", "test")
+
+from app.core import resilience  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    """Give every test its own circuit breakers."""
+    resilience._breakers.clear()
+    yield
+    resilience._breakers.clear()
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    """Small, deterministic retry settings; returns the list of backoff delays slept."""
+    monkeypatch.setattr(settings, "RETRY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "RETRY_BASE_DELAY", 0.001)
+    monkeypatch.setattr(settings, "RETRY_MAX_DELAY", 0.002)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_RESET_TIMEOUT", 30.0)
+    
+    delays = []
+    
+    async def record_sleep(delay):
+        delays.append(delay)
+        await asyncio.sleep(0)
+    
+    # Only resilience's backoff sleeps are skipped; the rest of asyncio is untouched
+    monkeypatch.setattr(resilience, "asyncio", types.SimpleNamespace(sleep=record_sleep))
+    return delays
+
+
+class StubPipeline:
+    """Stands in for FactCheckPipeline behind the API; `fail` maps claims to the error they raise."""
+    
+    def __init__(self):
+        self.calls = []
+        self.fail = {}
+        self.active = 0
+        self.peak = 0
+        self.closed = False
+    
+    async def fact_check_cached(self, claim, on_event=None):
+        self.calls.append(claim)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if claim in self.fail:
+                raise self.fail[claim]
+            papers = [{"title": "Paper one", "url": "https://example.org/1", "snippet": "Abstract."}]
+            if on_event is not None:
+                await on_event("keywords", {"keywords": ["stub"]})
+                await on_event("paper", {"index": 0, "paper": papers[0]})
+            result = {
+                "claim": claim,
+                "assessment": "Supported",
+                "explanation": "Stub explanation.",
+                "paper_analyses": [],
+                "references": [{"title": "Paper one", "url": "https://example.org/1"}],
+            }
+            return result, papers, False
+        finally:
+            self.active -= 1
+    
+    def generate_human_friendly_response(self, result, papers):
+        return f"Stub report for {result['claim']}"
+    
+    def cache_stats(self):
+        return {}
+    
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def stub_pipeline():
+    return StubPipeline()
+
+
+@pytest.fixture
+def api_client(stub_pipeline, monkeypatch):
+    """Client for the API backed by the stub pipeline, without running the app's lifespan."""
+    from fastapi.testclient import TestClient
+    
+    from app.main import app
+    
+    monkeypatch.setattr(app.state, "fact_check_pipeline", stub_pipeline, raising=False)
+    monkeypatch.setattr(app.state, "fact_check_pipeline_error", None, raising=False)
+    monkeypatch.setattr(app.state, "job_queue", None, raising=False)
+    monkeypatch.setattr(app.state, "batch_semaphore", asyncio.Semaphore(2), raising=False)
+    return TestClient(app)
+
+
+@pytest.fixture
+def offline_pipeline(monkeypatch, tmp_path):
+    """
+    Real pipeline whose Gemini, SERP API and paper page calls go to the benchmark stubs.
+    
+    Caches are in memory and anything written to disk lands in tmp_path.
+    Returns (pipeline, stub transport); the transport counts calls per service.
+    """
+    from benchmarks.stubs import SERVICES, LatencyModel, StubService, StubTransport
+    from app.services.fact_check_pipeline import FactCheckPipeline
+    from app.services.llm_service import LLMService
+    from app.services.search_service import SearchService
+    
+    monkeypatch.chdir(tmp_path)
+    for name, value in {
+        "RESULT_CACHE_BACKEND": "memory",
+        "STAGE_CACHE_BACKEND": "memory",
+        "ABSTRACT_CACHE_BACKEND": "memory",
+        "SEMANTIC_CACHE_ENABLED": False,
+        "PAPER_STORE_ENABLED": False,
+        "LLM_RATE_LIMIT_ENABLED": False,
+        "KEYWORD_STRATEGY": "llm",
+        "FINDINGS_STRATEGY": "per_paper",
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    
+    transport = StubTransport({service: StubService(LatencyModel(0.0)) for service in SERVICES}, seed=0)
+    client = httpx.AsyncClient(transport=transport)
+    return FactCheckPipeline(LLMService(client=client), SearchService(client=client)), transport
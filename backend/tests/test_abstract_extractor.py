@@ -0,0 +1,57 @@
+# tests/test_abstract_extractor.py
+import json
+
+from app.services.abstract_extractor import (
+    MAX_ABSTRACT_LENGTH,
+    AbstractExtractor,
+    is_html_content_type,
+)
+
+
+ABSTRACT = "We followed 12,000 adults for ten years and found that moderate coffee intake was not associated with heart disease."
+DESCRIPTION = "Publisher description of the article, long enough to count as an abstract candidate for the extractor."
+
+
+def extract(*chunks):
+    extractor = AbstractExtractor()
+    for chunk in chunks:
+        extractor.feed(chunk)
+    extractor.close()
+    return extractor
+
+
+def test_citation_abstract_beats_descriptions_and_stops_parsing():
+    extractor = AbstractExtractor()
+    extractor.feed(f'<html><head><meta name="description" content="{DESCRIPTION}">')
+    assert not extractor.done
+    extractor.feed(f'<meta name="citation_abstract" content="{ABSTRACT}">')
+    assert extractor.done
+    assert extractor.abstract() == ABSTRACT
+
+
+def test_json_ld_abstract_is_found_across_chunks():
+    block = json.dumps({"@graph": [{"@type": "ScholarlyArticle", "abstract": ABSTRACT}]})
+    extractor = extract('<script type="application/ld+json">', block[:40], block[40:], "</script>")
+    assert extractor.done
+    assert extractor.abstract() == ABSTRACT
+
+
+def test_visible_text_after_an_abstract_heading_is_the_last_resort():
+    extractor = extract(
+        "<html><body><nav>Abstract navigation link</nav><h2>Abstract</h2>",
+        f"<p>{ABSTRACT}</p><script>var abstract = 1;</script></body></html>",
+    )
+    assert not extractor.done
+    assert extractor.abstract() == ABSTRACT
+
+
+def test_short_candidates_are_ignored_and_long_ones_capped():
+    assert extract('<meta name="citation_abstract" content="Too short.">').abstract() == ""
+    long_abstract = "word " * 1000
+    assert len(extract(f'<meta name="citation_abstract" content="{long_abstract}">').abstract()) == MAX_ABSTRACT_LENGTH
+
+
+def test_only_html_pages_are_parsed():
+    assert is_html_content_type("text/html; charset=utf-8")
+    assert is_html_content_type(None)
+    assert not is_html_content_type("application/pdf")
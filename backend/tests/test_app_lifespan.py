@@ -0,0 +1,39 @@
+# tests/test_app_lifespan.py
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.exceptions import APIKeyNotFoundError
+
+
+CLAIM = "Coffee consumption increases the risk of heart disease"
+
+
+def test_one_pipeline_serves_every_request_and_is_closed_on_shutdown(stub_pipeline, monkeypatch):
+    created = []
+    
+    def create_pipeline():
+        created.append(stub_pipeline)
+        return stub_pipeline
+    
+    monkeypatch.setattr(main, "FactCheckPipeline", create_pipeline)
+    with TestClient(main.app) as client:
+        for _ in range(3):
+            assert client.post("/api/v1/fact-check", json={"claim": CLAIM}).status_code == 200
+        assert main.app.state.fact_check_pipeline is stub_pipeline
+        assert not stub_pipeline.closed
+    
+    assert len(created) == 1
+    assert len(stub_pipeline.calls) == 3
+    assert stub_pipeline.closed
+
+
+def test_missing_api_keys_are_reported_per_request(monkeypatch):
+    def create_pipeline():
+        raise APIKeyNotFoundError("GEMINI_API_KEY is not set")
+    
+    monkeypatch.setattr(main, "FactCheckPipeline", create_pipeline)
+    with TestClient(main.app) as client:
+        response = client.post("/api/v1/fact-check", json={"claim": CLAIM})
+    
+    assert response.status_code >= 500
+    assert "GEMINI_API_KEY" in response.text
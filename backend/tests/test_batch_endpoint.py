@@ -0,0 +1,45 @@
+# tests/test_batch_endpoint.py
+from app.core.config import settings
+from app.core.exceptions import SearchRequestError
+
+
+def test_duplicate_claims_are_checked_once(api_client, stub_pipeline):
+    response = api_client.post("/api/v1/fact-check/batch", json={"claims": [
+        "Coffee increases heart disease risk",
+        "coffee increases heart disease risk.",
+        "Vitamin D prevents COVID-19 infections",
+    ]})
+    body = response.json()
+    assert response.status_code == 200
+    assert body["total"] == 2 and body["succeeded"] == 2 and body["failed"] == 0
+    assert len(stub_pipeline.calls) == 2
+
+
+def test_failures_are_reported_per_claim(api_client, stub_pipeline):
+    stub_pipeline.fail["Vitamin D prevents COVID-19 infections"] = SearchRequestError("SERP API is down")
+    response = api_client.post("/api/v1/fact-check/batch", json={"claims": [
+        "Coffee increases heart disease risk",
+        "Vitamin D prevents COVID-19 infections",
+        "short",
+    ]})
+    items = {item["claim"]: item for item in response.json()["results"]}
+    assert items["Coffee increases heart disease risk"]["status_code"] == 200
+    assert items["Vitamin D prevents COVID-19 infections"]["status_code"] >= 500
+    assert items["Vitamin D prevents COVID-19 infections"]["result"] is None
+    assert items["short"]["status_code"] == 422
+    assert response.json()["failed"] == 2
+
+
+def test_claims_share_the_global_concurrency_budget(api_client, stub_pipeline):
+    claims = [f"Claim number {i} about vitamins and health" for i in range(6)]
+    response = api_client.post("/api/v1/fact-check/batch", json={"claims": claims})
+    assert response.json()["succeeded"] == 6
+    # The api_client fixture allows two claims at a time
+    assert stub_pipeline.peak == 2
+
+
+def test_oversized_batches_are_rejected(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_CLAIMS", 2)
+    claims = [f"Claim number {i} about vitamins and health" for i in range(3)]
+    response = api_client.post("/api/v1/fact-check/batch", json={"claims": claims})
+    assert response.status_code == 400
@@ -0,0 +1,76 @@
+# tests/test_benchmarks.py
+import asyncio
+import random
+
+import httpx
+
+from app.core.config import settings
+from benchmarks import run
+from benchmarks.stubs import SERVICES, LatencyModel, StubService, StubTransport
+
+
+def test_latency_model_is_constant_without_sigma_and_seeded_with_it():
+    assert LatencyModel(0.2).sample(random.Random(0)) == 0.2
+    assert LatencyModel(0.0, 0.5).sample(random.Random(0)) == 0.0
+    spread = LatencyModel(0.2, 0.5)
+    assert spread.sample(random.Random(7)) == spread.sample(random.Random(7))
+
+
+def test_stub_transport_fails_the_configured_fraction():
+    services = {service: StubService(LatencyModel(0.0)) for service in SERVICES}
+    services["serpapi"] = StubService(LatencyModel(0.0), error_rate=1.0, error_statuses=(503,))
+    transport = StubTransport(services, seed=0)
+    
+    async def fetch():
+        async with httpx.AsyncClient(transport=transport) as client:
+            serp = await client.get("https://serpapi.com/search", params={"q": "coffee"})
+            page = await client.get("https://publisher1.example.org/coffee/1")
+            return serp, page
+    
+    serp, page = asyncio.run(fetch())
+    
+    assert serp.status_code == 503
+    assert page.status_code == 200 and 'name="citation_abstract"' in page.text
+    assert transport.calls == {"serpapi": 1, "paper_page": 1}
+    assert transport.statuses == {"serpapi:503": 1, "paper_page:200": 1}
+
+
+def test_percentile_uses_the_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert run.percentile(values, 0.50) == 50.0
+    assert run.percentile(values, 0.95) == 95.0
+    assert run.percentile(values, 0.99) == 99.0
+    assert run.percentile([0.3], 0.99) == 0.3
+    assert run.percentile([], 0.5) is None
+
+
+def test_read_claims_takes_the_dash_lines(tmp_path):
+    path = tmp_path / "cases.txt"
+    path.write_text("Claims to check:\n- Coffee causes cancer\n  -  Vitamin D prevents flu \n\nnotes\n")
+    assert run.read_claims(str(path)) == ["Coffee causes cancer", "Vitamin D prevents flu"]
+
+
+def test_service_options_build_the_stubs():
+    args = run.parse_args(["--rps", "2", "--gemini-latency", "0.5", "--serp-error-rate", "0.1"])
+    services = run.build_services(args)
+    
+    assert args.rps == [2.0]
+    assert services["gemini"].latency.median == 0.5
+    assert services["gemini"].error_statuses == (429, 503)
+    assert services["serpapi"].error_rate == 0.1
+
+
+def test_run_level_reports_latency_and_calls_per_claim(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    for name in run.CACHE_SETTINGS:
+        monkeypatch.setattr(settings, name, False)
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_ENABLED", False)
+    transport = StubTransport({service: StubService(LatencyModel(0.0)) for service in SERVICES}, seed=0)
+    
+    level = asyncio.run(run.run_level(20.0, 0.2, ["Coffee consumption increases heart disease risk"], transport, 30.0))
+    
+    assert level["requests"] == level["succeeded"] == 4
+    assert level["statuses"] == {"200": 4}
+    assert level["latency"]["p50"] is not None
+    assert level["calls_per_claim"]["gemini"] >= 2
+    assert level["calls_per_claim"]["serpapi"] >= 1
@@ -0,0 +1,85 @@
+# tests/test_cache.py
+import asyncio
+import threading
+
+import pytest
+
+from app.services.cache import InMemoryCache, SQLiteCache, create_cache, make_cache_key
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make(request, tmp_path):
+    def build(max_entries=10, ttl=60.0):
+        return create_cache(request.param, max_entries, ttl, path=str(tmp_path / "cache.sqlite3"))
+    return build
+
+
+def test_make_cache_key_ignores_dict_order():
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key("claim", 1) != make_cache_key("claim", 2)
+
+
+def test_values_round_trip_and_are_counted(make):
+    cache = make()
+    assert cache.get("k") is None
+    cache.set("k", {"papers": [1, 2]})
+    assert cache.get("k") == {"papers": [1, 2]}
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_expired_entries_are_misses(make):
+    cache = make(ttl=-1.0)
+    cache.set("k", "v")
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted(make):
+    cache = make(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_async_access_matches_sync_access(make):
+    cache = make()
+    
+    async def run():
+        await cache.aset("k", [1])
+        return await cache.aget("k"), await cache.aget("missing")
+    
+    assert asyncio.run(run()) == ([1], None)
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_memory_cache_hands_out_copies():
+    cache = InMemoryCache(10, 60.0)
+    cache.set("k", {"papers": []})
+    cache.get("k")["papers"].append("mutated")
+    assert cache.get("k") == {"papers": []}
+
+
+def test_sqlite_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, 10, 60.0)
+    cache.set("k", "v")
+    cache.close()
+    assert SQLiteCache(path, 10, 60.0).get("k") == "v"
+
+
+def test_sqlite_cache_writes_run_off_the_event_loop(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), 10, 60.0)
+    threads = []
+    set_value = cache.set
+    
+    def recording_set(key, value):
+        threads.append(threading.current_thread())
+        set_value(key, value)
+    
+    cache.set = recording_set
+    asyncio.run(cache.aset("k", "v"))
+    assert threads and threads[0] is not threading.main_thread()
+    assert cache.get("k") == "v"
@@ -0,0 +1,89 @@
+# tests/test_cassette.py
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from app.core.cassette import CassetteMissError, CassetteStore, CassetteTransport, request_key
+
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini:generateContent"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CassetteStore(str(tmp_path / "cassettes.sqlite3"))
+    yield store
+    store.close()
+
+
+def upstream(calls):
+    """Mock transport echoing the request body back, gzip-encoded."""
+    def handler(request):
+        calls.append(request)
+        body = gzip.compress(b'{"echo": ' + request.content + b"}")
+        return httpx.Response(
+            200, content=body, headers={"content-encoding": "gzip", "content-type": "application/json", "set-cookie": "a=b"}
+        )
+    return httpx.MockTransport(handler)
+
+
+def post(transport, key, payload):
+    async def send():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.post(GEMINI_URL, params={"key": key}, json=payload)
+    return asyncio.run(send())
+
+
+def test_recordings_replay_offline_with_any_api_key(store):
+    calls = []
+    recorded = post(CassetteTransport(upstream(calls), store, "record"), "real-key", {"prompt": "coffee"})
+    replayed = post(CassetteTransport(upstream(calls), store, "replay"), "other-key", {"prompt": "coffee"})
+    
+    assert len(calls) == 1
+    assert replayed.status_code == 200
+    assert replayed.json() == recorded.json() == {"echo": {"prompt": "coffee"}}
+    assert "set-cookie" not in replayed.headers
+    assert store.stats() == {"hits": 1, "misses": 0, "recordings": 1}
+    (url,) = store._conn.execute("SELECT url FROM cassette").fetchone()
+    assert "real-key" not in url
+
+
+def test_unrecorded_requests_fail_in_replay(store):
+    calls = []
+    post(CassetteTransport(upstream(calls), store, "record"), "key", {"prompt": "coffee"})
+    
+    with pytest.raises(CassetteMissError, match="No recording for POST"):
+        post(CassetteTransport(upstream(calls), store, "replay"), "key", {"prompt": "tea"})
+    assert len(calls) == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_request_key_depends_on_method_url_and_body_only():
+    def request(key, body, method="POST"):
+        return httpx.Request(method, GEMINI_URL, params={"key": key}, content=body)
+    
+    assert request_key(request("a", b"x")) == request_key(request("b", b"x"))
+    assert request_key(request("a", b"x")) != request_key(request("a", b"y"))
+    assert request_key(request("a", b"x")) != request_key(request("a", b"x", method="PUT"))
+
+
+def test_replay_can_reproduce_recorded_latency(store):
+    request = httpx.Request("GET", "https://serpapi.com/search?q=coffee")
+    store.put(request_key(request), request, 200, [], b"{}", 0.5)
+    transport = CassetteTransport(httpx.MockTransport(lambda request: None), store, "replay", latency_scale=0.2)
+    
+    async def timed():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://serpapi.com/search?q=coffee")
+        return loop.time() - started
+    
+    assert asyncio.run(timed()) >= 0.1
+
+
+def test_unknown_modes_are_rejected(store):
+    with pytest.raises(ValueError, match="Unknown cassette mode"):
+        CassetteTransport(httpx.MockTransport(lambda request: None), store, "rewind")
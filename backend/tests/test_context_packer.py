@@ -0,0 +1,45 @@
+# tests/test_context_packer.py
+from app.services.context_packer import ContextPacker
+
+LONG_ABSTRACT = " ".join(f"word{i}" for i in range(400))
+
+
+def papers():
+    return [
+        {"title": "Low", "relevance": "Low", "position": "Neutral", "snippet": LONG_ABSTRACT, "key_findings": "x"},
+        {"title": "High", "relevance": "High", "position": "Supports", "snippet": LONG_ABSTRACT, "key_findings": "y"},
+        {"title": "Medium", "relevance": "Medium", "position": "Refutes", "snippet": "short abstract"},
+    ]
+
+
+def test_unlimited_budget_keeps_everything():
+    text, report = ContextPacker(0).pack(papers())
+    assert report["included"] == 3
+    assert report["dropped"] == [] and report["truncated"] == []
+    assert LONG_ABSTRACT in text
+
+
+def test_packed_context_fits_the_budget_and_keeps_numbering():
+    for budget in (400, 150, 40, 20):
+        text, report = ContextPacker(budget, min_abstract_tokens=30).pack(papers())
+        assert report["tokens"] <= budget
+    text, report = ContextPacker(150, min_abstract_tokens=30).pack(papers())
+    assert text.index("PAPER 1: Low") < text.index("PAPER 2: High") < text.index("PAPER 3: Medium")
+    assert "short abstract" in text
+
+
+def test_more_relevant_papers_get_more_abstract():
+    text, _ = ContextPacker(400, min_abstract_tokens=30).pack(papers())
+    low, high = text.split("PAPER 2:")[0], text.split("PAPER 2:")[1].split("PAPER 3:")[0]
+    assert len(high) > len(low)
+
+
+def test_least_relevant_papers_are_dropped_first():
+    _, report = ContextPacker(20).pack(papers())
+    assert report["dropped"] == [1, 3]
+
+
+def test_placeholder_findings_are_left_out():
+    text, _ = ContextPacker(0, ignored_findings=["x"]).pack(papers())
+    assert "Findings: x" not in text
+    assert "Findings: y" in text
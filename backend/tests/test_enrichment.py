@@ -0,0 +1,109 @@
+# tests/test_enrichment.py
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.cache import InMemoryCache
+from app.services.search_service import SearchService
+
+
+ABSTRACT = (
+    "We followed 12,000 adults for ten years, recording their daily coffee intake, "
+    "and found no link between coffee and heart disease."
+)
+
+
+def page(abstract=ABSTRACT):
+    return f'<html><head><meta name="citation_abstract" content="{abstract}"></head><body></body></html>'
+
+
+def paper(url):
+    return {"title": f"Paper at {url}", "snippet": "Short snippet.", "url": url}
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    """Build a SearchService whose page fetches go to `handler`, with an in-memory abstract cache."""
+    monkeypatch.setattr(settings, "PAPER_STORE_ENABLED", False)
+    monkeypatch.setattr(settings, "SEARCH_HEDGE_PROVIDER", "")
+    services = []
+    
+    def build(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service = SearchService(client=client, abstract_cache=InMemoryCache(100, 60.0))
+        services.append(service)
+        return service
+    
+    yield build
+    for service in services:
+        asyncio.run(service.client.aclose())
+
+
+def test_pages_past_the_deadline_keep_their_snippet(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICH_DEADLINE", 0.2)
+    
+    async def handler(request):
+        if request.url.host == "slow.example.org":
+            await asyncio.sleep(5)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=page())
+    
+    service = make_service(handler)
+    papers = [paper("https://fast.example.org/1"), paper("https://slow.example.org/2")]
+    
+    asyncio.run(service.enrich_papers(papers))
+    
+    assert papers[0]["snippet"] == ABSTRACT
+    assert papers[1]["snippet"] == "Short snippet."
+
+
+def test_fetches_are_limited_per_host(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICH_PER_HOST_CONCURRENCY", 2)
+    active = {}
+    peak = {}
+    
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.02)
+        active[host] -= 1
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=page())
+    
+    service = make_service(handler)
+    papers = [paper(f"https://a.example.org/{i}") for i in range(5)] + [paper("https://b.example.org/1")]
+    
+    asyncio.run(service.enrich_papers(papers))
+    
+    assert peak == {"a.example.org": 2, "b.example.org": 1}
+    assert all(item["snippet"] == ABSTRACT for item in papers)
+
+
+def test_missing_pages_are_cached_but_server_errors_are_not(make_service):
+    requests = []
+    
+    async def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(404 if request.url.path == "/gone" else 503)
+    
+    service = make_service(handler)
+    
+    async def fetch_twice(url):
+        return [await service.fetch_paper_details_async(url) for _ in range(2)]
+    
+    assert asyncio.run(fetch_twice("https://example.org/gone")) == [{}, {}]
+    assert asyncio.run(fetch_twice("https://example.org/flaky")) == [{}, {}]
+    assert requests == ["/gone", "/flaky", "/flaky"]
+
+
+def test_non_html_pages_are_not_read(make_service):
+    async def handler(request):
+        if request.url.path.endswith(".pdf"):
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, text=page())
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, text=page())
+    
+    service = make_service(handler)
+    
+    assert asyncio.run(service.fetch_paper_details_async("https://example.org/paper.pdf")) == {}
+    assert asyncio.run(service.fetch_paper_details_async("https://example.org/paper")) == {"abstract": ABSTRACT}
@@ -0,0 +1,128 @@
+# tests/test_findings.py
+import asyncio
+
+import httpx
+
+from benchmarks.stubs import LatencyModel
+from app.core.config import settings
+from app.services.fact_check_pipeline import FINDINGS_ERROR, FINDINGS_SHORT_ABSTRACT
+
+
+CLAIM = "Coffee consumption increases the risk of heart disease"
+ABSTRACT = "We followed 12,000 adults for ten years and measured their coffee intake and heart health."
+
+
+def papers(count):
+    return [{"title": f"Paper {i}", "snippet": f"{ABSTRACT} Cohort {i}.", "url": ""} for i in range(count)]
+
+
+def track_concurrency(transport):
+    """Record the peak number of Gemini requests in flight on the stub transport."""
+    state = {"active": 0, "peak": 0}
+    handle = transport.handle_async_request
+    
+    async def tracked(request):
+        gemini = request.url.host.endswith("googleapis.com")
+        if gemini:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        try:
+            return await handle(request)
+        finally:
+            if gemini:
+                state["active"] -= 1
+    
+    transport.handle_async_request = tracked
+    return state
+
+
+def test_per_paper_findings_run_concurrently_within_the_bound(offline_pipeline, monkeypatch):
+    pipeline, transport = offline_pipeline
+    monkeypatch.setattr(settings, "FINDINGS_CONCURRENCY", 2)
+    transport.services["gemini"].latency = LatencyModel(0.02)
+    state = track_concurrency(transport)
+    events = []
+    
+    async def on_event(event, data):
+        events.append(data["index"])
+    
+    enhanced = asyncio.run(pipeline.extract_paper_findings(papers(5), CLAIM, on_event))
+    
+    assert state["peak"] == 2
+    assert transport.calls["gemini"] == 5
+    assert [paper["title"] for paper in enhanced] == [f"Paper {i}" for i in range(5)]
+    assert all(paper["key_findings"] == "The study reports no effect." for paper in enhanced)
+    assert sorted(events) == [0, 1, 2, 3, 4]
+
+
+def test_short_abstracts_and_failed_calls_only_affect_their_paper(offline_pipeline, fast_retries):
+    pipeline, transport = offline_pipeline
+    handle = transport.handle_async_request
+    
+    async def failing_for_paper_two(request):
+        await request.aread()
+        if b"Cohort 2." in request.content:
+            return httpx.Response(400, text="bad request")
+        return await handle(request)
+    
+    transport.handle_async_request = failing_for_paper_two
+    batch = papers(3) + [{"title": "Stub", "snippet": "Too short.", "url": ""}]
+    
+    enhanced = asyncio.run(pipeline.extract_paper_findings(batch, CLAIM))
+    
+    assert enhanced[2]["key_findings"] == FINDINGS_ERROR
+    assert enhanced[3]["key_findings"] == FINDINGS_SHORT_ABSTRACT
+    assert enhanced[0]["position"] == enhanced[1]["position"] == "Refutes"
+
+
+def test_batched_findings_use_one_gemini_call(offline_pipeline, monkeypatch):
+    pipeline, transport = offline_pipeline
+    monkeypatch.setattr(settings, "FINDINGS_STRATEGY", "batched")
+    
+    enhanced = asyncio.run(pipeline.extract_paper_findings(papers(4), CLAIM))
+    
+    assert transport.calls["gemini"] == 1
+    assert [paper["key_findings"] for paper in enhanced] == [f"Paper {n} reports no effect." for n in range(1, 5)]
+
+
+def test_papers_missing_from_the_batch_fall_back_to_per_paper_calls(offline_pipeline, monkeypatch):
+    pipeline, transport = offline_pipeline
+    monkeypatch.setattr(settings, "FINDINGS_STRATEGY", "batched")
+    handle = transport.handle_async_request
+    
+    async def drop_paper_three(request):
+        response = await handle(request)
+        await response.aread()
+        body = response.json()
+        text = body["candidates"][0]["content"]["parts"][0]["text"]
+        if text.startswith("["):
+            text = text.replace('"paper_number": 3', '"paper_number": 99')
+            body["candidates"][0]["content"]["parts"][0]["text"] = text
+        return httpx.Response(200, json=body)
+    
+    transport.handle_async_request = drop_paper_three
+    
+    enhanced = asyncio.run(pipeline.extract_paper_findings(papers(4), CLAIM))
+    
+    # One batched call plus one per-paper call for the paper it left out
+    assert transport.calls["gemini"] == 2
+    assert enhanced[2]["key_findings"] == "The study reports no effect."
+    assert enhanced[3]["key_findings"] == "Paper 4 reports no effect."
+
+
+def test_failed_batch_falls_back_for_every_paper(offline_pipeline, monkeypatch, fast_retries):
+    pipeline, transport = offline_pipeline
+    monkeypatch.setattr(settings, "FINDINGS_STRATEGY", "batched")
+    handle = transport.handle_async_request
+    
+    async def fail_batches(request):
+        await request.aread()
+        if b"JSON array with one object per paper" in request.content:
+            return httpx.Response(400, text="bad request")
+        return await handle(request)
+    
+    transport.handle_async_request = fail_batches
+    
+    enhanced = asyncio.run(pipeline.extract_paper_findings(papers(3), CLAIM))
+    
+    assert all(paper["key_findings"] == "The study reports no effect." for paper in enhanced)
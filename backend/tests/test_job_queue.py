@@ -0,0 +1,93 @@
+# tests/test_job_queue.py
+import asyncio
+
+import pytest
+
+from app.core.exceptions import JobQueueFullError
+from app.services.job_queue import JOB_FAILED, JOB_QUEUED, JOB_SUCCEEDED, InMemoryJobStore, JobQueue
+
+
+class StubPipeline:
+    """Pipeline stand-in whose checks finish when `release` is set."""
+    
+    def __init__(self):
+        self.release = asyncio.Event()
+    
+    async def fact_check_cached(self, claim):
+        await self.release.wait()
+        return {"claim": claim, "verdict": "True"}, [], False
+
+
+class SlowStore(InMemoryJobStore):
+    """Job store whose writes yield to the event loop, as a remote store would."""
+    
+    async def save(self, job):
+        await asyncio.sleep(0)
+        await super().save(job)
+
+
+async def wait_for_status(store, job_id, status):
+    for _ in range(100):
+        job = await store.get(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0)
+    raise AssertionError(f"Job never reached {status}")
+
+
+def test_jobs_run_to_completion():
+    async def run():
+        pipeline = StubPipeline()
+        queue = JobQueue(pipeline, InMemoryJobStore(60, 100), workers=1, max_size=10)
+        queue.start()
+        job = await queue.submit("water is wet")
+        assert job["status"] == JOB_QUEUED
+        pipeline.release.set()
+        done = await wait_for_status(queue.store, job["job_id"], JOB_SUCCEEDED)
+        await queue.stop()
+        return done
+    
+    job = asyncio.run(run())
+    assert job["result"]["claim"] == "water is wet"
+    assert job["finished_at"] is not None
+
+
+def test_concurrent_submissions_cannot_overfill_the_queue():
+    async def run():
+        queue = JobQueue(StubPipeline(), SlowStore(60, 100), workers=1, max_size=1)
+        results = await asyncio.gather(queue.submit("a"), queue.submit("b"), return_exceptions=True)
+        return queue, results
+    
+    queue, results = asyncio.run(run())
+    accepted = [result for result in results if isinstance(result, dict)]
+    rejected = [result for result in results if isinstance(result, JobQueueFullError)]
+    assert len(accepted) == 1 and len(rejected) == 1
+    assert queue.pending() == 1
+    statuses = sorted(job["status"] for job in queue.store._jobs.values())
+    assert statuses == [JOB_FAILED, JOB_QUEUED]
+
+
+def test_full_queue_rejects_before_saving():
+    async def run():
+        queue = JobQueue(StubPipeline(), InMemoryJobStore(60, 100), workers=1, max_size=1)
+        await queue.submit("a")
+        with pytest.raises(JobQueueFullError):
+            await queue.submit("b")
+        return queue
+    
+    assert len(asyncio.run(run()).store._jobs) == 1
+
+
+def test_stop_fails_running_and_queued_jobs():
+    async def run():
+        queue = JobQueue(StubPipeline(), InMemoryJobStore(60, 100), workers=1, max_size=10)
+        queue.start()
+        running = await queue.submit("a")
+        queued = await queue.submit("b")
+        await wait_for_status(queue.store, running["job_id"], "running")
+        await queue.stop()
+        return await queue.store.get(running["job_id"]), await queue.store.get(queued["job_id"])
+    
+    running, queued = asyncio.run(run())
+    assert running["status"] == JOB_FAILED and "running" in running["error"]
+    assert queued["status"] == JOB_FAILED and "before the job ran" in queued["error"]
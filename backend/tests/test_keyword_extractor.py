@@ -0,0 +1,44 @@
+# tests/test_keyword_extractor.py
+import asyncio
+
+from app.core.config import settings
+from app.services.keyword_extractor import LocalKeywordExtractor
+
+
+def test_causal_claims_combine_cause_verb_and_effect():
+    keywords, confidence = LocalKeywordExtractor().extract("Coffee consumption increases the risk of heart disease")
+    
+    assert keywords[:2] == ["coffee consumption increases risk", "coffee consumption"]
+    assert "heart disease" in keywords
+    assert confidence == 1.0
+
+
+def test_dropped_negations_lower_the_confidence():
+    keywords, confidence = LocalKeywordExtractor().extract("Vitamin D does not prevent COVID-19 infections")
+    
+    assert "not" not in " ".join(keywords)
+    assert confidence < settings.KEYWORD_LOCAL_MIN_CONFIDENCE
+
+
+def test_vague_claims_have_low_confidence():
+    assert LocalKeywordExtractor().extract("Health") == (["health"], 0.25)
+    assert LocalKeywordExtractor().extract("It is what it is") == ([], 0.0)
+
+
+def test_keywords_are_capped():
+    claim = "Regular exercise improves sleep quality in older adults, according to many studies about diet and protein"
+    keywords, _ = LocalKeywordExtractor(max_keywords=3).extract(claim)
+    
+    assert keywords == ["regular exercise improves sleep quality", "regular exercise", "sleep quality"]
+
+
+def test_hybrid_strategy_only_asks_gemini_when_unsure(offline_pipeline, monkeypatch):
+    pipeline, transport = offline_pipeline
+    monkeypatch.setattr(settings, "KEYWORD_STRATEGY", "hybrid")
+    
+    confident = asyncio.run(pipeline.extract_keywords("Coffee consumption increases the risk of heart disease"))
+    assert confident[0] == "coffee consumption increases risk"
+    assert transport.calls["gemini"] == 0
+    
+    asyncio.run(pipeline.extract_keywords("Vitamin D does not prevent COVID-19 infections"))
+    assert transport.calls["gemini"] == 1
@@ -0,0 +1,107 @@
+# tests/test_llm_service.py
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import LLMRateLimitError, LLMRequestError, SearchRequestError
+from app.services.llm_service import LLMService
+from app.services.search_providers import SerpApiProvider
+
+
+def gemini_response(text):
+    return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+@pytest.fixture(autouse=True)
+def no_quota_or_coalescing(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_SINGLE_FLIGHT_ENABLED", False)
+
+
+def test_concurrent_gemini_calls_overlap():
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        prompt = json.loads(request.content)["contents"][0]["parts"][0]["text"]
+        return gemini_response(prompt.upper())
+    
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = LLMService(client=client)
+            started = time.perf_counter()
+            replies = await asyncio.gather(*(service.call_gemini_api_async(f"prompt {i}") for i in range(5)))
+            return replies, time.perf_counter() - started
+    
+    replies, elapsed = asyncio.run(run())
+    assert replies == [f"PROMPT {i}" for i in range(5)]
+    # Five 50ms calls finish together rather than one after another
+    assert elapsed < 0.2
+
+
+def test_throttled_gemini_call_raises_rate_limit_error(fast_retries):
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(429, headers={"Retry-After": "12"}))
+        async with httpx.AsyncClient(transport=transport) as client:
+            await LLMService(client=client).call_gemini_api_async("prompt")
+    
+    with pytest.raises(LLMRateLimitError) as raised:
+        asyncio.run(run())
+    assert raised.value.retry_after == 12.0
+
+
+def test_gemini_errors_and_empty_replies_raise_request_errors(fast_retries):
+    async def call(response):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: response)) as client:
+            await LLMService(client=client).call_gemini_api_async("prompt")
+    
+    with pytest.raises(LLMRequestError):
+        asyncio.run(call(httpx.Response(400, text="bad request")))
+    with pytest.raises(LLMRequestError):
+        asyncio.run(call(httpx.Response(200, json={"candidates": []})))
+
+
+def test_service_only_closes_a_client_it_created():
+    async def run():
+        shared = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: gemini_response("ok")))
+        await LLMService(client=shared).aclose()
+        owned = LLMService()
+        owned_client = owned.client
+        await owned.aclose()
+        return shared.is_closed, owned_client.is_closed
+    
+    assert asyncio.run(run()) == (False, True)
+
+
+def test_serpapi_results_are_parsed_into_papers():
+    def handler(request):
+        assert request.url.params["q"] == "coffee heart"
+        return httpx.Response(200, json={"organic_results": [{
+            "title": "Coffee and the heart",
+            "link": "https://example.org/coffee",
+            "snippet": "A cohort study.",
+            "cited_by": {"value": 42},
+            "publication_info": {"authors": [{"name": "A. Author"}, "B. Author"], "summary": "Journal, 2020"},
+        }]})
+    
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await SerpApiProvider("key", lambda: client).search("coffee heart", 5)
+    
+    [paper] = asyncio.run(run())
+    assert paper["title"] == "Coffee and the heart"
+    assert paper["url"] == "https://example.org/coffee"
+    assert paper["authors"] == ["A. Author", "B. Author"]
+    assert paper["citation_count"] == 42
+
+
+def test_serpapi_failures_raise_search_errors(fast_retries):
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(401, text="invalid key"))
+        async with httpx.AsyncClient(transport=transport) as client:
+            await SerpApiProvider("key", lambda: client).search("coffee", 5)
+    
+    with pytest.raises(SearchRequestError):
+        asyncio.run(run())
@@ -0,0 +1,78 @@
+# tests/test_metrics.py
+import asyncio
+
+import httpx
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest
+
+from app.core.metrics import (
+    EXTERNAL_REQUESTS,
+    STAGE_LATENCY,
+    CacheStatsCollector,
+    InstrumentedTransport,
+    observe_latency,
+    service_for_host,
+)
+
+
+def sample(metric, **labels):
+    for family in metric.collect():
+        for s in family.samples:
+            if s.name.endswith(("_total", "_count")) and s.labels == labels:
+                return s.value
+    return 0.0
+
+
+def test_cache_collector_labels_sizes_by_kind():
+    registry = CollectorRegistry()
+    registry.register(CacheStatsCollector(lambda: {
+        "result": {"hits": 3, "misses": 1},
+        "paper_store": {"hits": 2, "misses": 5, "papers": 40},
+        "semantic": {"hits": 1, "evidence_hits": 2, "misses": 4, "claims": 9},
+    }))
+    
+    assert registry.get_sample_value("factcheck_cache_lookups_total", {"layer": "result", "result": "hit"}) == 3
+    assert registry.get_sample_value(
+        "factcheck_cache_lookups_total", {"layer": "semantic", "result": "evidence_hit"}
+    ) == 2
+    assert registry.get_sample_value("factcheck_cache_entries", {"layer": "paper_store", "kind": "papers"}) == 40
+    assert registry.get_sample_value("factcheck_cache_entries", {"layer": "semantic", "kind": "claims"}) == 9
+    # Counters are not sizes
+    assert b'kind="hits"' not in generate_latest(registry)
+
+
+def test_observe_latency_records_failures_too():
+    @observe_latency("test_stage")
+    async def fail():
+        raise ValueError("boom")
+    
+    before = sample(STAGE_LATENCY, stage="test_stage")
+    with pytest.raises(ValueError):
+        asyncio.run(fail())
+    assert sample(STAGE_LATENCY, stage="test_stage") == before + 1
+
+
+def test_paper_hosts_share_one_service_label():
+    assert service_for_host("generativelanguage.googleapis.com") == "gemini"
+    assert service_for_host("serpapi.com") == "serpapi"
+    assert service_for_host("www.nature.com") == "paper_page"
+
+
+def test_instrumented_transport_counts_requests_by_status():
+    transport = InstrumentedTransport(httpx.MockTransport(lambda request: httpx.Response(503, content=b"busy")))
+    before = sample(EXTERNAL_REQUESTS, service="serpapi", status="503")
+    
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://serpapi.com/search")
+            return response.content
+    
+    assert asyncio.run(run()) == b"busy"
+    assert sample(EXTERNAL_REQUESTS, service="serpapi", status="503") == before + 1
+
+
+def test_metrics_endpoint_serves_prometheus_text(api_client):
+    response = api_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "factcheck_pipeline_stage_duration_seconds" in response.text
@@ -0,0 +1,78 @@
+# tests/test_paper_store.py
+import asyncio
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services.paper_store import PaperStore
+from app.services.search_service import SearchService
+
+
+def paper(title, snippet="", url=""):
+    return {"title": title, "snippet": snippet, "url": url}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.jsonl"))
+    store.add([
+        paper("Coffee consumption and cardiovascular disease", "A cohort study of coffee drinkers."),
+        paper("Sleep duration and memory", "Short sleep impairs memory consolidation."),
+        paper("Tea, coffee and mortality", "Moderate intake lowers all-cause mortality."),
+    ])
+    yield store
+    store.close()
+
+
+def test_title_matches_rank_first(store):
+    titles = [p["title"] for p in store.search("coffee cardiovascular", 3)]
+    assert titles[0] == "Coffee consumption and cardiovascular disease"
+    assert "Sleep duration and memory" not in titles
+
+
+def test_min_coverage_requires_most_query_terms(store):
+    assert [p["title"] for p in store.search("coffee cardiovascular", 3, min_coverage=1.0)] == [
+        "Coffee consumption and cardiovascular disease"
+    ]
+
+
+def test_search_counts_hits_and_misses(store):
+    store.search("coffee", 3, min_results=2)
+    store.search("coffee", 3, min_results=3)
+    store.search("volcanoes", 3)
+    assert store.stats() == {"hits": 1, "misses": 2, "papers": 3}
+
+
+def test_readding_a_paper_replaces_it_and_survives_a_restart(store, tmp_path):
+    assert store.add([paper("Sleep duration and memory", "Updated abstract about naps.")]) == 1
+    assert store.add([paper("Sleep duration and memory", "Updated abstract about naps.")]) == 0
+    store.close()
+    
+    reloaded = PaperStore(str(tmp_path / "papers.jsonl"))
+    assert len(reloaded) == 3
+    assert reloaded.search("naps", 1)[0]["snippet"] == "Updated abstract about naps."
+    reloaded.close()
+
+
+def test_local_search_runs_off_the_event_loop(store, monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_SEARCH_MIN_RESULTS", 2)
+    monkeypatch.setattr(settings, "LOCAL_SEARCH_MIN_COVERAGE", 0.0)
+    service = SearchService.__new__(SearchService)
+    service.paper_store = store
+    threads = []
+    search = store.search
+    
+    def recording_search(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return search(*args, **kwargs)
+    
+    store.search = recording_search
+    
+    async def run():
+        return await service._search_local(["coffee"], 3), await service._search_local(["sleep"], 3)
+    
+    found, missing = asyncio.run(run())
+    assert len(found) == 2 and missing is None
+    assert threads and all(thread is not threading.main_thread() for thread in threads)
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
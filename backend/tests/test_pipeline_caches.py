@@ -0,0 +1,87 @@
+# tests/test_pipeline_caches.py
+import asyncio
+
+import httpx
+
+
+CLAIM = "Coffee consumption increases the risk of heart disease"
+
+
+def test_repeated_claims_are_served_from_the_result_cache(offline_pipeline):
+    pipeline, transport = offline_pipeline
+    
+    async def run():
+        first = await pipeline.fact_check_cached(CLAIM)
+        calls = dict(transport.calls)
+        second = await pipeline.fact_check_cached("  coffee consumption increases the risk of heart disease. ")
+        return first, second, calls
+    
+    (result, papers, hit), (cached, cached_papers, cached_hit), calls = asyncio.run(run())
+    
+    assert not hit and cached_hit
+    assert dict(transport.calls) == calls
+    assert cached["assessment"] == result["assessment"]
+    # Each caller sees its own wording of the claim
+    assert cached["claim"] == "  coffee consumption increases the risk of heart disease. "
+    assert cached_papers == papers
+
+
+def test_degraded_results_are_not_cached(offline_pipeline, monkeypatch, fast_retries):
+    pipeline, transport = offline_pipeline
+    handle = transport.handle_async_request
+    failing = {"analysis": True}
+    
+    async def fail_analysis(request):
+        await request.aread()
+        if failing["analysis"] and b"paper_analyses" in request.content:
+            return httpx.Response(400, text="bad request")
+        return await handle(request)
+    
+    transport.handle_async_request = fail_analysis
+    
+    async def run():
+        _, _, first_hit = await pipeline.fact_check_cached(CLAIM)
+        failing["analysis"] = False
+        result, _, second_hit = await pipeline.fact_check_cached(CLAIM)
+        return first_hit, second_hit, result
+    
+    first_hit, second_hit, result = asyncio.run(run())
+    assert not first_hit and not second_hit
+    assert result["assessment"] == "Refuted"
+
+
+def test_keywords_searches_and_findings_are_reused_across_claims(offline_pipeline):
+    pipeline, transport = offline_pipeline
+    
+    async def run():
+        keywords = await pipeline.extract_keywords(CLAIM)
+        await pipeline.extract_keywords(CLAIM)
+        papers = await pipeline.search_papers(["coffee", "heart"], 5)
+        again = await pipeline.search_papers([" Coffee", "HEART "], 5)
+        calls = dict(transport.calls)
+        findings = await pipeline.extract_paper_findings([dict(paper) for paper in papers[:2]], CLAIM)
+        reused = await pipeline.extract_paper_findings([dict(paper) for paper in papers[:2]], CLAIM)
+        return keywords, papers, again, calls, findings, reused
+    
+    keywords, papers, again, calls, findings, reused = asyncio.run(run())
+    
+    assert keywords and again == papers
+    stats = pipeline.cache_stats()
+    assert stats["keywords"] == {"hits": 1, "misses": 1}
+    assert stats["search"] == {"hits": 1, "misses": 1}
+    assert stats["findings"] == {"hits": 2, "misses": 2}
+    # Only the first findings pass called Gemini again
+    assert transport.calls["gemini"] == calls["gemini"] + 2
+    assert [paper["key_findings"] for paper in reused] == [paper["key_findings"] for paper in findings]
+
+
+def test_findings_are_cached_per_claim(offline_pipeline):
+    pipeline, transport = offline_pipeline
+    paper = {"title": "Coffee study", "url": "https://example.org/1", "snippet": "A long enough abstract " * 5}
+    
+    async def run():
+        await pipeline.extract_paper_findings([dict(paper)], CLAIM)
+        await pipeline.extract_paper_findings([dict(paper)], "Tea prevents heart disease in older adults")
+    
+    asyncio.run(run())
+    assert transport.calls["gemini"] == 2
@@ -0,0 +1,112 @@
+# tests/test_rate_limiter.py
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import (
+    PRIORITY_ANALYSIS,
+    PRIORITY_FINDINGS,
+    PRIORITY_KEYWORDS,
+    TokenBucketLimiter,
+    estimate_tokens,
+)
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        # One request per 10ms once the initial request is spent
+        limiter = TokenBucketLimiter(requests_per_minute=6000, tokens_per_minute=10 ** 9)
+        limiter._requests = 0.0
+        order = []
+        
+        async def call(name, priority):
+            await limiter.acquire(1, priority)
+            order.append(name)
+        
+        tasks = []
+        for name, priority in (
+            ("findings-1", PRIORITY_FINDINGS),
+            ("keywords", PRIORITY_KEYWORDS),
+            ("findings-2", PRIORITY_FINDINGS),
+            ("analysis", PRIORITY_ANALYSIS),
+        ):
+            tasks.append(asyncio.create_task(call(name, priority)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+    
+    assert asyncio.run(run()) == ["analysis", "keywords", "findings-1", "findings-2"]
+
+
+def test_cancelled_waiter_does_not_block_the_queue():
+    async def run():
+        limiter = TokenBucketLimiter(requests_per_minute=6000, tokens_per_minute=10 ** 9)
+        limiter._requests = 0.0
+        first = asyncio.create_task(limiter.acquire(1, PRIORITY_ANALYSIS))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(limiter.acquire(1, PRIORITY_FINDINGS))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1.0)
+        return limiter._waiters
+    
+    assert asyncio.run(run()) == []
+
+
+def test_throttling_halves_the_rate_once_per_burst_and_pauses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.services.rate_limiter.time.monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(requests_per_minute=60, tokens_per_minute=6000, min_rate_fraction=0.2)
+    
+    limiter.on_throttled(retry_after=5.0)
+    limiter.on_throttled()
+    assert limiter.rate_fraction == pytest.approx(0.5)
+    assert limiter._requests <= 0
+    assert limiter._time_until_available(1) >= 5.0
+    
+    for _ in range(5):
+        now[0] += 1.0
+        limiter.on_throttled()
+    assert limiter.rate_fraction == pytest.approx(0.2)
+
+
+def test_successes_restore_the_rate_additively():
+    limiter = TokenBucketLimiter(requests_per_minute=60, tokens_per_minute=6000, increase=0.1)
+    limiter.rate_fraction = 0.5
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.rate_fraction == pytest.approx(0.8)
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.rate_fraction == 1.0
+
+
+def test_reported_usage_corrects_the_token_bucket():
+    limiter = TokenBucketLimiter(requests_per_minute=60, tokens_per_minute=1000)
+    limiter._tokens = 500.0
+    limiter.record_usage(estimated=300, actual=100)
+    assert limiter._tokens == pytest.approx(700.0)
+
+
+@pytest.mark.parametrize("requests_per_minute,tokens_per_minute", [(0, 10 ** 6), (6000, 0), (0, 0)])
+def test_zero_quota_means_unlimited(requests_per_minute, tokens_per_minute):
+    async def run():
+        limiter = TokenBucketLimiter(requests_per_minute, tokens_per_minute)
+        # Neither bucket may make these wait: the limited one is deep enough, the other is unlimited
+        for _ in range(50):
+            await asyncio.wait_for(limiter.acquire(10 ** 4), 1.0)
+        limiter.record_usage(estimated=10 ** 4, actual=2 * 10 ** 4)
+    
+    asyncio.run(run())
+
+
+def test_unlimited_quota_still_honours_retry_after():
+    limiter = TokenBucketLimiter(0, 0)
+    limiter.on_throttled(retry_after=5.0)
+    assert limiter._time_until_available(1) >= 4.0
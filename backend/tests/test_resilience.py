@@ -0,0 +1,248 @@
+# tests/test_resilience.py
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.cassette import CassetteMissError
+from app.core.exceptions import CircuitOpenError, PipelineTimeoutError
+from app.core.resilience import (
+    CircuitBreaker,
+    bounded_timeout,
+    deadline_scope,
+    get_circuit_breaker,
+    remaining_time,
+    send_with_retries,
+)
+
+
+def scripted_client(responses, timeout=10.0):
+    """
+    Client whose transport answers with `responses` in turn.
+    
+    An int is a status code, an exception instance is raised and a float is a
+    delay in seconds that honours the request's read timeout the way a real
+    server would: the call raises ReadTimeout if the timeout is shorter.
+    """
+    calls = []
+    
+    async def handler(request):
+        calls.append(request)
+        step = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(step, httpx.RequestError):
+            # Raised as httpx would, with the request attached
+            raise type(step)(str(step), request=request)
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, float):
+            read_timeout = request.extensions["timeout"]["read"]
+            if read_timeout is not None and read_timeout < step:
+                await asyncio.sleep(read_timeout)
+                raise httpx.ReadTimeout("timed out", request=request)
+            await asyncio.sleep(step)
+            return httpx.Response(200)
+        headers = {"Retry-After": "7"} if step == 429 else {}
+        return httpx.Response(step, headers=headers)
+    
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), timeout=timeout)
+    
+    async def send():
+        return await client.get("https://provider.test/", timeout=bounded_timeout(client.timeout, remaining_time()))
+    
+    return client, send, calls
+
+
+def test_breaker_opens_after_threshold_and_recovers_through_half_open(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30.0)
+    
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    # After the reset timeout a single trial call is let through
+    now[0] += 30.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_half_open_trial_reopens_the_circuit(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    
+    now[0] += 10.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    now[0] += 5.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_trial_lets_another_call_through(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    now[0] += 10.0
+    
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_retries_transient_statuses_until_success(fast_retries):
+    client, send, calls = scripted_client([503, 502, 200])
+    response = asyncio.run(send_with_retries("provider", send))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert len(fast_retries) == 2
+    assert get_circuit_breaker("provider").state == CircuitBreaker.CLOSED
+
+
+def test_returns_last_response_when_attempts_run_out(fast_retries):
+    client, send, calls = scripted_client([500])
+    response = asyncio.run(send_with_retries("provider", send))
+    assert response.status_code == 500
+    assert len(calls) == 3
+
+
+def test_does_not_retry_client_errors(fast_retries):
+    client, send, calls = scripted_client([400])
+    response = asyncio.run(send_with_retries("provider", send))
+    assert response.status_code == 400
+    assert len(calls) == 1
+    assert fast_retries == []
+
+
+def test_raises_transport_error_after_last_attempt(fast_retries):
+    client, send, calls = scripted_client([httpx.ConnectError("refused")])
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(send_with_retries("provider", send))
+    assert len(calls) == 3
+
+
+def test_backoff_waits_at_least_retry_after(fast_retries):
+    client, send, calls = scripted_client([429, 200])
+    response = asyncio.run(send_with_retries("provider", send))
+    assert response.status_code == 200
+    assert fast_retries == [7.0]
+
+
+def test_throttling_does_not_open_the_circuit(fast_retries):
+    client, send, calls = scripted_client([429])
+    for _ in range(3):
+        asyncio.run(send_with_retries("provider", send))
+    assert get_circuit_breaker("provider").state == CircuitBreaker.CLOSED
+
+
+def test_server_errors_open_the_circuit(fast_retries):
+    client, send, calls = scripted_client([503])
+    asyncio.run(send_with_retries("provider", send))
+    assert get_circuit_breaker("provider").state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(send_with_retries("provider", send))
+    assert len(calls) == 3
+
+
+def test_retry_is_skipped_when_backoff_would_outlive_the_deadline(fast_retries):
+    client, send, calls = scripted_client([429, 200])
+    
+    async def run():
+        with deadline_scope(1.0):
+            return await send_with_retries("provider", send)
+    
+    assert asyncio.run(run()).status_code == 429
+    assert len(calls) == 1
+
+
+def test_expired_deadline_stops_before_calling(fast_retries):
+    client, send, calls = scripted_client([200])
+    
+    async def run():
+        with deadline_scope(0):
+            return await send_with_retries("provider", send)
+    
+    with pytest.raises(PipelineTimeoutError):
+        asyncio.run(run())
+    assert calls == []
+
+
+def test_deadline_truncated_timeouts_do_not_count_against_the_provider(fast_retries):
+    client, send, calls = scripted_client([0.2])
+    
+    async def run():
+        with deadline_scope(0.05):
+            return await send_with_retries("provider", send, timeout=client.timeout)
+    
+    for _ in range(5):
+        with pytest.raises(PipelineTimeoutError):
+            asyncio.run(run())
+    # One attempt per call: the caller ran out of time, so there is nothing to retry
+    assert len(calls) == 5
+    assert get_circuit_breaker("provider").state == CircuitBreaker.CLOSED
+    
+    # A caller with time to spare still gets through
+    assert asyncio.run(send_with_retries("provider", send, timeout=client.timeout)).status_code == 200
+
+
+def test_provider_timeouts_count_against_the_provider(fast_retries):
+    client, send, calls = scripted_client([0.2], timeout=0.05)
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(send_with_retries("provider", send, timeout=client.timeout))
+    assert len(calls) == 3
+    assert get_circuit_breaker("provider").state == CircuitBreaker.OPEN
+
+
+def test_cassette_misses_are_not_retried(fast_retries):
+    client, send, calls = scripted_client([CassetteMissError("not recorded")])
+    for _ in range(5):
+        with pytest.raises(CassetteMissError):
+            asyncio.run(send_with_retries("provider", send))
+    assert len(calls) == 5
+    assert get_circuit_breaker("provider").state == CircuitBreaker.CLOSED
+
+
+def test_bounded_timeout_caps_every_phase():
+    timeout = bounded_timeout(httpx.Timeout(10.0, connect=2.0), 3.0)
+    assert (timeout.connect, timeout.read, timeout.write, timeout.pool) == (2.0, 3.0, 3.0, 3.0)
+    assert bounded_timeout(httpx.Timeout(10.0), None).read == 10.0
+
+
+def test_nested_deadline_scopes_only_shorten():
+    with deadline_scope(10.0):
+        with deadline_scope(60.0):
+            assert remaining_time() <= 10.0
+        with deadline_scope(1.0):
+            assert remaining_time() <= 1.0
+    assert remaining_time() is None
+
+
+def test_connect_timeouts_under_a_loose_deadline_count_against_the_provider(fast_retries):
+    client, send, calls = scripted_client(
+        [httpx.ConnectTimeout("connect timed out")], timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+    
+    async def run():
+        with deadline_scope(20.0):
+            return await send_with_retries("provider", send, timeout=client.timeout)
+    
+    with pytest.raises(httpx.ConnectTimeout):
+        asyncio.run(run())
+    assert len(calls) == 3
+    assert get_circuit_breaker("provider").state == CircuitBreaker.OPEN
@@ -0,0 +1,47 @@
+# tests/test_search_fusion.py
+import pytest
+
+from app.core.config import settings
+from app.services.search_service import SearchService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_FUSION_RRF_K", 60)
+    monkeypatch.setattr(settings, "SEARCH_FUSION_CITATION_WEIGHT", 0.0)
+    # fuse_results needs no clients, caches or providers
+    return SearchService.__new__(SearchService)
+
+
+def paper(title, url="", snippet="", citations=0):
+    return {"title": title, "url": url, "snippet": snippet, "citation_count": citations}
+
+
+def test_papers_found_by_several_queries_rank_first(service):
+    fused = service.fuse_results(
+        [
+            [paper("Only in first"), paper("Shared Paper")],
+            [paper("Only in second"), paper("shared paper!")],
+        ],
+        limit=3,
+    )
+    assert [p["title"] for p in fused] == ["Shared Paper", "Only in first", "Only in second"]
+
+
+def test_duplicates_merge_by_url_and_keep_the_richest_version(service):
+    fused = service.fuse_results(
+        [
+            [paper("A", url="https://www.example.org/a/", snippet="short", citations=3)],
+            [paper("A (preprint)", url="http://example.org/a", snippet="a much longer abstract", citations=10)],
+        ],
+        limit=5,
+    )
+    assert len(fused) == 1
+    assert fused[0]["snippet"] == "a much longer abstract"
+    assert fused[0]["citation_count"] == 10
+
+
+def test_citation_bonus_breaks_ties(service, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_FUSION_CITATION_WEIGHT", 0.01)
+    fused = service.fuse_results([[paper("Rarely cited", citations=1)], [paper("Often cited", citations=500)]], limit=2)
+    assert [p["title"] for p in fused] == ["Often cited", "Rarely cited"]
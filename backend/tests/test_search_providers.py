@@ -0,0 +1,99 @@
+# tests/test_search_providers.py
+import asyncio
+import json
+
+import pytest
+
+from app.core.exceptions import SearchRequestError
+from app.services.search_providers import (
+    HedgedSearchProvider,
+    LocalFixtureProvider,
+    SearchProvider,
+    create_search_provider,
+)
+
+
+class FakeProvider(SearchProvider):
+    """Provider answering after `delay` seconds, or raising `error`."""
+    
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+    
+    async def search(self, query, limit):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return [{"title": f"{self.name} result", "snippet": query, "url": ""}]
+
+
+def hedged_search(primary, secondary, delay=0.05):
+    provider = HedgedSearchProvider(primary, secondary, delay)
+    return provider, asyncio.run(provider.search("coffee heart", 5))
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = FakeProvider("primary"), FakeProvider("secondary")
+    provider, results = hedged_search(primary, secondary)
+    
+    assert results[0]["title"] == "primary result"
+    assert secondary.calls == 0
+    assert provider.hedges == 0
+
+
+def test_secondary_wins_when_the_primary_is_slow():
+    primary, secondary = FakeProvider("primary", delay=1.0), FakeProvider("secondary")
+    provider, results = hedged_search(primary, secondary)
+    
+    assert results[0]["title"] == "secondary result"
+    assert provider.hedges == provider.hedge_wins == 1
+    assert primary.cancelled
+
+
+def test_primary_failure_hedges_right_away():
+    primary = FakeProvider("primary", error=SearchRequestError("SERP API returned 500"))
+    secondary = FakeProvider("secondary")
+    provider, results = hedged_search(primary, secondary, delay=5.0)
+    
+    assert results[0]["title"] == "secondary result"
+    assert provider.hedges == 1
+
+
+def test_first_error_is_raised_when_both_providers_fail():
+    primary = FakeProvider("primary", error=SearchRequestError("primary down"))
+    secondary = FakeProvider("secondary", error=SearchRequestError("secondary down"))
+    
+    with pytest.raises(SearchRequestError, match="primary down"):
+        hedged_search(primary, secondary)
+
+
+def test_fixture_provider_ranks_by_matching_terms(tmp_path):
+    path = tmp_path / "papers.json"
+    path.write_text(json.dumps([
+        {"title": "Tea and sleep", "snippet": "A sleep study."},
+        {"title": "Coffee and heart disease", "snippet": "A heart cohort."},
+        {"title": "Coffee and sleep", "snippet": "A coffee trial."},
+    ]))
+    provider = LocalFixtureProvider(str(path))
+    
+    results = asyncio.run(provider.search("coffee heart disease", 5))
+    
+    assert [paper["title"] for paper in results] == ["Coffee and heart disease", "Coffee and sleep"]
+    assert results[0]["citation_count"] == 0
+
+
+def test_create_search_provider_rejects_bad_configuration(tmp_path):
+    with pytest.raises(ValueError, match="Unknown search provider"):
+        create_search_provider("bing", "", lambda: None)
+    with pytest.raises(ValueError, match="PAPER_STORE_ENABLED"):
+        create_search_provider("paper_store", "", lambda: None)
+    with pytest.raises(SearchRequestError):
+        create_search_provider("fixture", "", lambda: None, fixture_path=str(tmp_path / "missing.json"))
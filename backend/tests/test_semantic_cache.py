@@ -0,0 +1,114 @@
+# tests/test_semantic_cache.py
+import asyncio
+
+from app.services.semantic_cache import HashedTermEmbedder, SemanticClaimCache, VectorIndex
+
+
+def make_cache(path=""):
+    embedder = HashedTermEmbedder(1024)
+    return SemanticClaimCache(embedder, VectorIndex(embedder.dim, embedder.name, path), 0.9, 0.7)
+
+
+def test_opposite_direction_claims_only_share_evidence():
+    cache = make_cache()
+    cache.add("coffee increases the risk of cardiovascular disease", {"key": "k", "keywords": []})
+    result, evidence = cache.lookup("coffee decreases the risk of cardiovascular disease")
+    assert result is None
+    assert evidence is not None
+
+
+def test_negated_claims_never_share_results():
+    cache = make_cache()
+    cache.add("vaccines cause autism", {"key": "k", "keywords": []})
+    result, _ = cache.lookup("vaccines do not cause autism")
+    assert result is None
+
+
+def test_rewordings_with_the_same_content_words_share_results():
+    cache = make_cache()
+    cache.add("exercise improves memory", {"key": "k", "keywords": []})
+    result, _ = cache.lookup("exercise improves the memory")
+    assert result is not None and result["key"] == "k"
+
+
+def test_torn_index_lines_are_skipped_without_losing_other_rows(tmp_path):
+    path = str(tmp_path / "index")
+    embedder = HashedTermEmbedder(64)
+    index = VectorIndex(embedder.dim, embedder.name, path)
+    for claim in ("sugar causes hyperactivity", "coffee stunts growth", "earth orbits the sun"):
+        index.add(embedder.embed(claim), {"id": claim})
+    index.close()
+    
+    lines = (tmp_path / "index.jsonl").read_text().splitlines()
+    lines[2] = lines[2][:8]
+    (tmp_path / "index.jsonl").write_text("\n".join(lines) + "\n")
+    
+    index = VectorIndex(embedder.dim, embedder.name, path)
+    assert len(index) == 2
+    score, metadata = index.search(embedder.embed("earth orbits the sun"))[0]
+    assert metadata["id"] == "earth orbits the sun"
+    assert score > 0.99
+    
+    # The rewritten files append cleanly
+    index.add(embedder.embed("coffee stunts growth"), {"id": "coffee stunts growth"})
+    index.close()
+    assert len(VectorIndex(embedder.dim, embedder.name, path)) == 3
+
+
+def test_oldest_claims_are_evicted_and_the_files_compacted(tmp_path):
+    path = str(tmp_path / "index")
+    embedder = HashedTermEmbedder(64)
+    index = VectorIndex(embedder.dim, embedder.name, path, max_entries=2)
+    claims = ["sugar causes hyperactivity", "coffee stunts growth", "earth orbits the sun", "vaccines cause autism"]
+    for claim in claims:
+        index.add(embedder.embed(claim), {"id": claim})
+    # Re-adding refreshes a claim, so it outlives older ones
+    index.add(embedder.embed(claims[2]), {"id": claims[2]})
+    index.add(embedder.embed("fish feel pain"), {"id": "fish feel pain"})
+    
+    assert len(index) == 2
+    assert {metadata["id"] for _, metadata in index.search(embedder.embed(claims[2]), k=5)} == {
+        claims[2], "fish feel pain"
+    }
+    assert len(index._metadata) <= 2 * len(index)
+    index.close()
+    
+    reloaded = VectorIndex(embedder.dim, embedder.name, path, max_entries=2)
+    assert sorted(reloaded._row_by_id) == sorted([claims[2], "fish feel pain"])
+    assert len((tmp_path / "index.jsonl").read_text().splitlines()) <= 1 + 2 * len(reloaded)
+
+
+def test_reloading_with_a_smaller_bound_keeps_the_newest_claims(tmp_path):
+    path = str(tmp_path / "index")
+    embedder = HashedTermEmbedder(64)
+    index = VectorIndex(embedder.dim, embedder.name, path)
+    for claim in ("sugar causes hyperactivity", "coffee stunts growth", "earth orbits the sun"):
+        index.add(embedder.embed(claim), {"id": claim})
+    index.close()
+    
+    index = VectorIndex(embedder.dim, embedder.name, path, max_entries=1)
+    assert list(index._row_by_id) == ["earth orbits the sun"]
+    assert len((tmp_path / "index.jsonl").read_text().splitlines()) == 2
+
+
+def test_match_counts_hits_evidence_hits_and_misses():
+    cache = make_cache()
+    cache.add("exercise improves memory", {"key": "stored", "keywords": ["exercise"]})
+    cache.add("sugar causes hyperactivity", {"key": "expired", "keywords": ["sugar"]})
+    results = {"stored": {"result": "cached"}}
+    
+    async def load_result(key):
+        return results.get(key)
+    
+    async def run():
+        return [
+            await cache.match("exercise improves the memory", load_result),
+            await cache.match("sugar causes hyperactivity", load_result),
+            await cache.match("earth orbits the sun", load_result),
+        ]
+    
+    reused, expired, missed = asyncio.run(run())
+    assert reused[0] == {"result": "cached"}
+    assert expired[0] is None and expired[1]["keywords"] == ["sugar"]
+    assert missed == (None, None)
+    assert cache.stats() == {"hits": 1, "evidence_hits": 1, "misses": 1, "claims": 2}
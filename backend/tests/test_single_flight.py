@@ -0,0 +1,110 @@
+# tests/test_single_flight.py
+import asyncio
+
+import pytest
+
+from app.core.exceptions import PipelineTimeoutError
+from app.core.resilience import deadline_scope, remaining_time
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+    
+    async def run():
+        flights = SingleFlight()
+        
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        return results, flights.in_flight()
+    
+    results, in_flight = asyncio.run(run())
+    assert results == ["result"] * 5
+    assert calls == [1]
+    assert in_flight == 0
+
+
+def test_shared_call_does_not_inherit_the_leaders_deadline():
+    async def run():
+        flights = SingleFlight()
+        
+        async def work():
+            seen = remaining_time()
+            await asyncio.sleep(0.1)
+            return seen
+        
+        async def caller(budget):
+            with deadline_scope(budget):
+                return await flights.do("key", work)
+        
+        leader = asyncio.create_task(caller(0.02))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(caller(5.0))
+        with pytest.raises(PipelineTimeoutError):
+            await leader
+        return await follower
+    
+    assert asyncio.run(run()) is None
+
+
+def test_shared_call_runs_within_max_duration():
+    async def run():
+        flights = SingleFlight(max_duration=30.0)
+        
+        async def work():
+            return remaining_time()
+        
+        with deadline_scope(0.5):
+            return await flights.do("key", work)
+    
+    assert 0.5 < asyncio.run(run()) <= 30.0
+
+
+def test_shared_call_is_cancelled_when_every_waiter_gives_up():
+    cancelled = []
+    
+    async def run():
+        flights = SingleFlight()
+        
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        
+        async def caller(budget):
+            with deadline_scope(budget):
+                return await flights.do("key", work)
+        
+        results = await asyncio.gather(caller(0.01), caller(0.05), return_exceptions=True)
+        await asyncio.sleep(0)
+        return results, flights.in_flight()
+    
+    results, in_flight = asyncio.run(run())
+    assert all(isinstance(result, PipelineTimeoutError) for result in results)
+    assert cancelled == [True]
+    assert in_flight == 0
+
+
+def test_shared_call_outlives_the_leader_while_others_wait():
+    async def run():
+        flights = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+        
+        async def caller(budget):
+            with deadline_scope(budget):
+                return await flights.do("key", work)
+        
+        return await asyncio.gather(caller(0.01), caller(5.0), return_exceptions=True)
+    
+    leader, follower = asyncio.run(run())
+    assert isinstance(leader, PipelineTimeoutError)
+    assert follower == "done"
@@ -0,0 +1,81 @@
+# tests/test_speculative_search.py
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.fact_check_pipeline import FactCheckPipeline
+from app.services.keyword_extractor import LocalKeywordExtractor
+from app.services.search_service import SearchService
+
+
+CLAIM = "Coffee consumption increases the risk of heart disease"
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "KEYWORD_STRATEGY", "llm")
+    monkeypatch.setattr(settings, "SPECULATIVE_SEARCH_MIN_OVERLAP", 0.5)
+    
+    def build(llm_keywords):
+        # Only the pieces the stage graph touches; no clients or caches
+        pipeline = FactCheckPipeline.__new__(FactCheckPipeline)
+        pipeline.keyword_extractor = LocalKeywordExtractor()
+        pipeline.search_service = SearchService.__new__(SearchService)
+        pipeline.searches = []
+        
+        async def extract_keywords(claim):
+            return llm_keywords
+        
+        async def search_papers(keywords, limit):
+            pipeline.searches.append(list(keywords))
+            return [{"title": " ".join(keywords), "url": "", "snippet": ""}]
+        
+        async def passthrough(papers, *args):
+            return papers
+        
+        async def analyze_with_llm(claim, papers):
+            return {"assessment": "Supported"}
+        
+        pipeline.extract_keywords = extract_keywords
+        pipeline.search_papers = search_papers
+        pipeline.enrich_papers = passthrough
+        pipeline.extract_paper_findings = passthrough
+        pipeline.analyze_with_llm = analyze_with_llm
+        return pipeline
+    
+    return build
+
+
+def test_speculative_search_is_off_by_default():
+    assert type(settings).model_fields["SPECULATIVE_SEARCH_ENABLED"].default is False
+
+
+def test_disabled_speculation_searches_once_with_the_llm_keywords(make_pipeline, monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_SEARCH_ENABLED", False)
+    pipeline = make_pipeline(["caffeine", "cardiovascular risk"])
+    asyncio.run(pipeline.fact_check(CLAIM))
+    assert pipeline.searches == [["caffeine", "cardiovascular risk"]]
+
+
+def test_overlapping_llm_keywords_reuse_the_speculative_search(make_pipeline, monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_SEARCH_ENABLED", True)
+    local_keywords, _ = LocalKeywordExtractor().extract(CLAIM)
+    pipeline = make_pipeline(local_keywords)
+    result, _ = asyncio.run(pipeline.fact_check(CLAIM))
+    assert pipeline.searches == [local_keywords]
+    assert result["degraded_stages"] == []
+
+
+def test_differing_llm_keywords_are_searched_and_fused(make_pipeline, monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_SEARCH_ENABLED", True)
+    pipeline = make_pipeline(["caffeine", "cardiovascular mortality"])
+    _, papers = asyncio.run(pipeline.fact_check(CLAIM))
+    assert len(pipeline.searches) == 2
+    assert len(papers) == 2
+
+
+def test_keyword_overlap_ignores_stopwords_and_case(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_SEARCH_MIN_OVERLAP", 0.5)
+    assert not FactCheckPipeline._keywords_differ(["Coffee and heart disease"], ["coffee", "heart disease"])
+    assert FactCheckPipeline._keywords_differ(["coffee"], ["vaccines autism"])
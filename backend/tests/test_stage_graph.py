@@ -0,0 +1,70 @@
+# tests/test_stage_graph.py
+import asyncio
+
+import pytest
+
+from app.core.exceptions import PipelineTimeoutError
+from app.core.resilience import remaining_time
+from app.services.stage_graph import Stage, StageGraph
+
+
+def test_stages_run_after_their_dependencies():
+    async def source(inputs):
+        return 2
+    
+    async def double(inputs):
+        return inputs["source"] * 2
+    
+    async def add(inputs):
+        return inputs["source"] + inputs["double"]
+    
+    graph = StageGraph([
+        Stage("add", add, depends_on=["source", "double"]),
+        Stage("double", double, depends_on=["source"]),
+        Stage("source", source),
+    ])
+    assert asyncio.run(graph.run()) == {"source": 2, "double": 4, "add": 6}
+    assert graph.degraded == []
+
+
+def test_invalid_graphs_are_rejected():
+    async def noop(inputs):
+        return None
+    
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", noop, depends_on=["missing"])])
+    with pytest.raises(ValueError):
+        StageGraph([Stage("a", noop, depends_on=["b"]), Stage("b", noop, depends_on=["a"])])
+
+
+def test_timed_out_stage_uses_its_fallback():
+    errors = []
+    
+    async def slow(inputs):
+        await asyncio.sleep(1.0)
+    
+    def fallback(inputs, error):
+        errors.append(error)
+        return "degraded"
+    
+    graph = StageGraph([Stage("slow", slow, timeout=0.01, fallback=fallback)])
+    assert asyncio.run(graph.run()) == {"slow": "degraded"}
+    assert graph.degraded == ["slow"]
+    assert isinstance(errors[0], PipelineTimeoutError)
+
+
+def test_failure_without_fallback_aborts_the_run():
+    async def broken(inputs):
+        raise RuntimeError("boom")
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(StageGraph([Stage("broken", broken)]).run())
+
+
+def test_stage_budget_leaves_the_reserve_and_is_the_stages_deadline():
+    async def observe(inputs):
+        return remaining_time()
+    
+    graph = StageGraph([Stage("observe", observe, reserve=4.0)])
+    seen = asyncio.run(graph.run(deadline=5.0))["observe"]
+    assert 0 < seen <= 1.0
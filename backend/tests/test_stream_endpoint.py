@@ -0,0 +1,40 @@
+# tests/test_stream_endpoint.py
+import json
+
+from app.core.exceptions import LLMRequestError
+
+
+CLAIM = "Coffee increases heart disease risk"
+
+
+def read_events(response):
+    """Parse a text/event-stream body into (event, data) pairs."""
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_progress_is_streamed_before_the_result(api_client):
+    response = api_client.post("/api/v1/fact-check/stream", json={"claim": CLAIM})
+    events = read_events(response)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [event for event, _ in events] == ["start", "keywords", "paper", "result"]
+    assert events[0][1] == {"claim": CLAIM}
+    result = events[-1][1]
+    assert result["assessment"] == "Supported"
+    assert result["human_friendly_response"] == f"Stub report for {CLAIM}"
+    assert result["papers"][0]["title"] == "Paper one"
+
+
+def test_failures_end_the_stream_with_an_error_event(api_client, stub_pipeline):
+    stub_pipeline.fail[CLAIM] = LLMRequestError("Gemini returned 500")
+    response = api_client.post("/api/v1/fact-check/stream", json={"claim": CLAIM})
+    events = read_events(response)
+    
+    assert [event for event, _ in events] == ["start", "error"]
+    assert events[-1][1]["status_code"] >= 500
+    assert "Gemini returned 500" in events[-1][1]["detail"]